@@ -0,0 +1,6 @@
+"""
+Benchmark suite to measure the slash commands end to end with a fake Discord client,
+a local OpenAI compatible stub and a temporary SQLite database.
+
+Run it with: python -m benchmarks.harness --games 1 10 100
+"""
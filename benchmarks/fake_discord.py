@@ -0,0 +1,344 @@
+"""
+In-process fake of the Discord objects used by the commands. Every call which would be
+a request to the Discord API is counted for the running command. Views and modals sent
+to a fake user are answered automatically with the prepared answers of the user, so the
+real command functions run without a Discord connection.
+"""
+
+import asyncio
+import itertools
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import discord
+from discord.ui.select import BaseSelect
+
+_ids = itertools.count(10_000)
+
+
+@dataclass
+class CommandStats:
+    """
+    Class to collect the measurement of one command execution.
+    """
+
+    name: str
+    duration: float = 0.0
+    queries: int = 0
+    api_calls: int = 0
+
+
+current_stats: ContextVar[CommandStats | None] = ContextVar("current_stats", default=None)
+
+
+def count_api_call() -> None:
+    """
+    Function counts a Discord API call for the running command.
+    """
+    stats = current_stats.get()
+    if stats is not None:
+        stats.api_calls += 1
+
+
+class FakeMessage:
+    """
+    Fake Discord message.
+    """
+
+    def __init__(self, channel: "FakeChannel", content: str | None, embed=None):
+        self.id = next(_ids)
+        self.channel = channel
+        self.content = content
+        self.embeds = [embed] if embed is not None else []
+
+    async def edit(self, **kwargs) -> None:
+        """
+        Changes the content or the embed of the message.
+        """
+        count_api_call()
+        if "embed" in kwargs:
+            self.embeds = [kwargs["embed"]]
+        self.content = kwargs.get("content", self.content)
+
+
+class FakeChannel:
+    """
+    Fake Discord text channel which keeps all sent messages.
+    """
+
+    def __init__(self, channel_id: int | None = None):
+        self.id = channel_id or next(_ids)
+        self.messages: dict[int, FakeMessage] = {}
+
+    async def send(self, content: str | None = None, embed=None, **_) -> FakeMessage:
+        """
+        Sends a message into the channel.
+        """
+        count_api_call()
+        message = FakeMessage(self, content, embed)
+        self.messages[message.id] = message
+        return message
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        """
+        Returns a sent message.
+        """
+        count_api_call()
+        return self.messages[message_id]
+
+    async def delete_messages(self, messages: list[FakeMessage]) -> None:
+        """
+        Deletes the handed over messages.
+        """
+        count_api_call()
+        for message in messages:
+            self.messages.pop(message.id, None)
+
+
+@dataclass
+class FakeRole:
+    """
+    Fake Discord role.
+    """
+
+    id: int
+
+
+@dataclass
+class FakeGuild:
+    """
+    Fake Discord guild.
+    """
+
+    id: int = 1
+
+
+@dataclass
+class FakeMember:
+    """
+    Fake Discord member with the answers for views and modals sent to this member. The
+    answers are looked up by the placeholder of a select menu, the label of a button
+    or the label of a text input.
+    """
+
+    name: str
+    id: int = field(default_factory=lambda: next(_ids))
+    roles: list[FakeRole] = field(default_factory=list)
+    answers: dict[str, object] = field(default_factory=dict)
+    direct_messages: list[str] = field(default_factory=list)
+
+    @property
+    def mention(self) -> str:
+        """
+        Returns the mention of the member.
+        """
+        return f"<@{self.id}>"
+
+    async def send(self, content: str) -> None:
+        """
+        Sends a direct message to the member.
+        """
+        count_api_call()
+        self.direct_messages.append(content)
+
+
+class FakeBot:
+    """
+    Fake Discord bot with a channel cache.
+    """
+
+    def __init__(self):
+        self.channels: dict[int, FakeChannel] = {}
+
+    def add_channel(self, channel: FakeChannel) -> FakeChannel:
+        """
+        Adds a channel to the cache of the bot.
+        """
+        self.channels[channel.id] = channel
+        return channel
+
+    def get_channel(self, channel_id: int) -> FakeChannel | None:
+        """
+        Returns a cached channel.
+        """
+        return self.channels.get(channel_id)
+
+    async def fetch_channel(self, channel_id: int) -> FakeChannel:
+        """
+        Returns a channel with an API call.
+        """
+        count_api_call()
+        if channel_id not in self.channels:
+            raise discord.NotFound(FakeHttpResponse(404), "Unknown Channel")
+        return self.channels[channel_id]
+
+
+@dataclass
+class FakeHttpResponse:
+    """
+    Fake HTTP response to create Discord HTTP exceptions.
+    """
+
+    status: int
+    reason: str = "Fake"
+
+
+class FakeResponse:
+    """
+    Fake interaction response. Views and modals are answered by the user of the
+    interaction in the background.
+    """
+
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self) -> bool:
+        """
+        Returns whether the interaction is already answered.
+        """
+        return self.done
+
+    async def defer(self, **_) -> None:
+        """
+        Defers the interaction.
+        """
+        count_api_call()
+        self.done = True
+
+    async def send_message(self, *_, view=None, **__) -> None:
+        """
+        Answers the interaction with a message.
+        """
+        count_api_call()
+        self.done = True
+        self.interaction.answer(view)
+
+    async def edit_message(self, view=None, **_) -> None:
+        """
+        Answers a component interaction by editing its message.
+        """
+        count_api_call()
+        self.done = True
+        if view is not None:
+            view.to_components()
+
+    async def send_modal(self, modal: discord.ui.Modal) -> None:
+        """
+        Answers the interaction with a modal.
+        """
+        count_api_call()
+        self.done = True
+        self.interaction.answer(modal)
+
+
+class FakeFollowup:
+    """
+    Fake followup webhook of an interaction.
+    """
+
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+
+    async def send(
+        self, content: str | None = None, view=None, embed=None, ephemeral=False, **_
+    ) -> FakeMessage:
+        """
+        Sends a followup message. Public messages are kept in the channel.
+        """
+        count_api_call()
+        self.interaction.answer(view)
+        channel = self.interaction.channel
+        message = FakeMessage(channel, content, embed)
+        if not ephemeral:
+            channel.messages[message.id] = message
+        return message
+
+
+class FakeInteraction:  # pylint: disable=too-many-instance-attributes
+    """
+    Fake Discord interaction of a member in a channel. Views and modals sent with the
+    interaction are answered by the member with its prepared answers.
+    """
+
+    def __init__(self, user: FakeMember, channel: FakeChannel, guild: FakeGuild):
+        self.id = next(_ids)
+        self.user = user
+        self.channel = channel
+        self.channel_id = channel.id
+        self.guild = guild
+        self.command = None
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.answer_tasks: set[asyncio.Task] = set()
+
+    def component_interaction(self) -> "FakeInteraction":
+        """
+        Returns a new interaction of the same user for a component or modal.
+        """
+        interaction = FakeInteraction(self.user, self.channel, self.guild)
+        interaction.answer_tasks = self.answer_tasks
+        return interaction
+
+    def answer(self, item: discord.ui.View | discord.ui.Modal | None) -> None:
+        """
+        Starts answering the handed over view or modal in the background.
+        """
+        if item is None:
+            return
+        item.to_components()
+        if isinstance(item, discord.ui.Modal):
+            coro = self.answer_modal(item)
+        else:
+            coro = self.answer_view(item)
+        task = asyncio.create_task(coro)
+        self.answer_tasks.add(task)
+        task.add_done_callback(self.answer_tasks.discard)
+
+    async def answer_modal(self, modal: discord.ui.Modal) -> None:
+        """
+        Fills the text inputs of the modal with the answers of the user and submits it.
+        """
+        for item in modal.children:
+            if isinstance(item, discord.ui.TextInput):
+                label = item._underlying.label  # pylint: disable=protected-access
+                item._value = str(self.user.answers.get(label, ""))  # pylint: disable=protected-access
+        await modal.on_submit(self.component_interaction())
+        modal.stop()
+
+    async def answer_view(self, view: discord.ui.View) -> None:
+        """
+        Selects the prepared values or clicks the prepared button of the view. If the
+        value of a select menu is not on the current page, the next page is loaded.
+        """
+        while not view.is_finished():
+            item = self.find_answered_item(view)
+            if item is None:
+                return
+            if isinstance(item, discord.ui.Button):
+                await item.callback(self.component_interaction())
+                continue
+            answer = self.user.answers[item.placeholder]
+            if isinstance(item, discord.ui.UserSelect):
+                item._values = list(answer)  # pylint: disable=protected-access
+            elif str(answer) in [option.value for option in item.options]:
+                item._values = [str(answer)]  # pylint: disable=protected-access
+            else:
+                next_button = getattr(view, "button_next", None)
+                if next_button is None or next_button.disabled:
+                    return
+                await next_button.callback(self.component_interaction())
+                continue
+            await item.callback(self.component_interaction())
+            await asyncio.sleep(0)
+
+    def find_answered_item(self, view: discord.ui.View) -> discord.ui.Item | None:
+        """
+        Returns the first select menu or button of the view the user has an answer for.
+        """
+        for item in view.children:
+            if isinstance(item, BaseSelect) and item.placeholder in self.user.answers:
+                return item
+        for item in view.children:
+            if isinstance(item, discord.ui.Button) and item.label in self.user.answers:
+                return item
+        return None
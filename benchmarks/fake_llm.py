@@ -0,0 +1,81 @@
+"""
+Local OpenAI compatible stub for the chat completions endpoint. Every request is
+answered after a configurable latency with a story of several paragraphs, so the
+benchmark measures the application and not the LLM provider.
+"""
+
+import asyncio
+import itertools
+import time
+from aiohttp import web
+
+STORY_PARAGRAPHS = (
+    "The fog lies heavy over the empty streets and the survivors move in silence.",
+    "A radio crackles in the distance, a voice repeats coordinates nobody knows.",
+    "Behind the church the group finds a car with half a tank of fuel and a map.",
+    "Night falls and the fire in the old hospital is the only light for miles.",
+)
+
+
+class FakeLlmServer:
+    """
+    OpenAI compatible HTTP stub on a free local port.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self._ids = itertools.count(1)
+        self._runner: web.AppRunner | None = None
+        self.port = 0
+
+    @property
+    def base_url(self) -> str:
+        """
+        Returns the base URL for the OpenAI client.
+        """
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        """
+        Answers a chat completion request with a fixed story after the latency.
+        """
+        payload = await request.json()
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        content = "\n\n".join(STORY_PARAGRAPHS)
+        return web.json_response(
+            {
+                "id": f"chatcmpl-{next(self._ids)}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", "fake"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+        )
+
+    async def start(self) -> None:
+        """
+        Starts the stub on a free local port.
+        """
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+
+    async def stop(self) -> None:
+        """
+        Stops the stub.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
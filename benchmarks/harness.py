@@ -0,0 +1,366 @@
+"""
+End-to-end benchmark of the game commands. Every game is played by its own fake
+storyteller and two fake players in a separate channel: create the game, select the
+characters, start, inspect, reset and restart it, keep telling the story and inspect
+it again. The games run concurrently at each level against a new temporary SQLite
+database and the local LLM stub. For every command the latency, the executed SQL
+statements and the Discord API calls are reported.
+
+Usage: python -m benchmarks.harness --games 1 10 100 --latency 0.5
+"""
+
+import re
+import sys
+import time
+import json
+import asyncio
+import argparse
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from sqlalchemy import event
+import src
+from src.character import select_character
+from src.game import create_game, setup_game, reset_game, info_game, keep_telling_schedule
+from src.command_runner import run_deferred
+from src.llm_handler import preload_openai
+from src.loop_watchdog import percentile
+from .fake_discord import (
+    CommandStats,
+    FakeBot,
+    FakeChannel,
+    FakeGuild,
+    FakeInteraction,
+    FakeMember,
+    current_stats,
+)
+from .fake_llm import FakeLlmServer
+
+PLAYERS_PER_GAME = 2
+
+
+@dataclass
+class CommandReport:
+    """
+    Class with the aggregated measurement of one command.
+    """
+
+    command: str
+    count: int
+    p50_ms: float
+    p95_ms: float
+    queries: float
+    api_calls: float
+
+
+@dataclass
+class LevelReport:
+    """
+    Class with the result of all games of one concurrency level.
+    """
+
+    games: int
+    verified_games: int
+    duration_s: float
+    llm_requests: int
+    commands: list[CommandReport]
+
+
+def summarize(stats: list[CommandStats]) -> list[CommandReport]:
+    """
+    Function aggregates the measurements per command.
+
+    Args:
+        stats (list[CommandStats]): Measurement of every command execution
+
+    Returns:
+        list[CommandReport]: Aggregated measurement per command
+    """
+    grouped: dict[str, list[CommandStats]] = defaultdict(list)
+    for stat in stats:
+        grouped[stat.name].append(stat)
+    return [
+        CommandReport(
+            command=name,
+            count=len(items),
+            p50_ms=percentile([item.duration for item in items], 50) * 1000,
+            p95_ms=percentile([item.duration for item in items], 95) * 1000,
+            queries=sum(item.queries for item in items) / len(items),
+            api_calls=sum(item.api_calls for item in items) / len(items),
+        )
+        for name, items in grouped.items()
+    ]
+
+
+def game_id_from_channel(channel: FakeChannel) -> int | None:
+    """
+    Function reads the game id from the footer of the game embed in the channel.
+
+    Args:
+        channel (FakeChannel): Channel of the game
+
+    Returns:
+        int | None: Game id or None if no game embed was sent
+    """
+    for message in channel.messages.values():
+        for embed in message.embeds:
+            match = re.match(r"Game-ID: (\d+)", embed.footer.text or "")
+            if match:
+                return int(match.group(1))
+    return None
+
+
+class Benchmark:
+    """
+    Benchmark environment with the app configuration, the fake Discord bot and the
+    measurement of all executed commands.
+    """
+
+    def __init__(self, config: src.Configuration, genre_id: int):
+        self.config = config
+        self.genre_id = genre_id
+        self.bot = FakeBot()
+        self.guild = FakeGuild()
+        self.stats: list[CommandStats] = []
+        config.dc_bot = self.bot
+        event.listen(config.engine.sync_engine, "before_cursor_execute", self.count_query)
+
+    @staticmethod
+    def count_query(*_) -> None:
+        """
+        Function counts an executed SQL statement for the running command.
+        """
+        stats = current_stats.get()
+        if stats is not None:
+            stats.queries += 1
+
+    async def measure(self, name: str, interaction: FakeInteraction, handler, *args) -> None:
+        """
+        Function executes the command handler like the bot, deferred as background
+        task, and stores the measurement of the command.
+
+        Args:
+            name (str): Name of the command in the report
+            interaction (FakeInteraction): Interaction of the command
+            handler (Callable): Command handler
+            *args: Further arguments for the command handler
+        """
+        stats = CommandStats(name)
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            task = await run_deferred(self.config, interaction, handler, *args)
+            await task
+            await asyncio.gather(*interaction.answer_tasks)
+        finally:
+            stats.duration = time.perf_counter() - start
+            current_stats.reset(token)
+        self.stats.append(stats)
+
+    async def play_game(self, index: int, character_ids: list[int], turns: int) -> bool:
+        """
+        Function plays one game from the creation to the told stories.
+
+        Args:
+            index (int): Number of the game
+            character_ids (list[int]): Free characters for the players of the game
+            turns (int): Number of story parts told by the players
+
+        Returns:
+            bool: Game is running and has told stories
+        """
+        channel = self.bot.add_channel(FakeChannel())
+        players = [
+            FakeMember(
+                f"player-{index}-{number}",
+                answers={
+                    src.StoryType.FICTION.text: True,
+                    "Additional text": "The group searches the old hospital.",
+                },
+            )
+            for number in range(PLAYERS_PER_GAME)
+        ]
+        storyteller = FakeMember(
+            f"storyteller-{index}",
+            answers={
+                "Select up to 6 user for the game": players,
+                "Select a genre...": self.genre_id,
+                "Game name": f"Benchmark {index}",
+                "Game description": "A game of the benchmark.",
+                "Select the destination status...": src.GameStatus.RUNNING.value,
+                src.StartCondition.S_ZOMBIE.text: True,
+                "Start location": "Berlin",
+            },
+        )
+
+        def interaction(user: FakeMember) -> FakeInteraction:
+            return FakeInteraction(user, channel, self.guild)
+
+        await self.measure("create_game", interaction(storyteller), create_game)
+        game_id = game_id_from_channel(channel)
+        if game_id is None:
+            return False
+        for player, character_id in zip(players, character_ids):
+            player.answers["Select a game..."] = game_id
+            await self.measure(
+                "select_character", interaction(player), select_character, game_id, character_id
+            )
+        await self.measure("setup_game", interaction(storyteller), setup_game, game_id)
+        await self.measure("info_game", interaction(storyteller), info_game, game_id)
+        await self.measure("reset_game", interaction(storyteller), reset_game, game_id)
+        await self.measure("setup_game", interaction(storyteller), setup_game, game_id)
+        for turn in range(turns):
+            await self.measure(
+                "keep_telling", interaction(players[turn % len(players)]), keep_telling_schedule
+            )
+        await self.measure("info_game", interaction(storyteller), info_game, game_id)
+
+        game = await src.get_object_by_id(self.config, src.GAME, game_id)
+        return game.status is src.GameStatus.RUNNING and game.stories_told > 0
+
+
+async def seed_database(config: src.Configuration, games: int) -> tuple[int, list[int]]:
+    """
+    Function creates the genre with events and inspirational words and the free
+    characters for all players.
+
+    Args:
+        config (Configuration): App configuration
+        games (int): Number of benchmark games
+
+    Returns:
+        tuple[int, list[int]]: Id of the genre and ids of the characters
+    """
+    genre = src.GENRE(
+        name="Benchmark Zombie",
+        storytelling_style="dark",
+        atmosphere="tense",
+        language="english",
+        events=[src.EVENT(text=f"Event {number}", chance=10) for number in range(5)],
+        inspirational_words=[
+            src.INSPIRATIONALWORD(text=f"Word {number}", chance=10) for number in range(5)
+        ],
+    )
+    characters = [
+        src.CHARACTER(
+            name=f"Character {number}",
+            age=30,
+            background="Grew up in a small town.",
+            description="Tall and quiet.",
+            summary="A quiet survivor.",
+        )
+        for number in range(games * PLAYERS_PER_GAME)
+    ]
+    await src.update_db_objs(config, [genre, *characters])
+    return genre.id, [character.id for character in characters]
+
+
+async def run_level(games: int, latency: float, turns: int) -> LevelReport:
+    """
+    Function plays the handed over number of games concurrently against a new
+    temporary database and the LLM stub.
+
+    Args:
+        games (int): Number of concurrent games
+        latency (float): Response time of the LLM stub in seconds
+        turns (int): Number of story parts told per game
+
+    Returns:
+        LevelReport: Measurement of the level
+    """
+    llm = FakeLlmServer(latency)
+    await llm.start()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = src.environ.to_config(
+            src.EnvConfiguration,
+            environ={
+                "TT_DC_BOT_TOKEN": "benchmark",
+                "TT_DB_DB_URL": f"sqlite+aiosqlite:///{Path(tmp_dir) / 'benchmark.db'}",
+                "TT_BASE_URL": llm.base_url,
+                "TT_API_KEY": "benchmark",
+                "TT_MODEL": "benchmark",
+            },
+        )
+        config = src.Configuration(env)
+        config.logger = src.logger
+        try:
+            await src.sync_db(config.engine)
+            await preload_openai()
+            genre_id, character_ids = await seed_database(config, games)
+            benchmark = Benchmark(config, genre_id)
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(
+                    benchmark.play_game(
+                        index,
+                        character_ids[index * PLAYERS_PER_GAME:(index + 1) * PLAYERS_PER_GAME],
+                        turns,
+                    )
+                    for index in range(games)
+                )
+            )
+            duration = time.perf_counter() - start
+        finally:
+            await config.background_tasks.cancel_all()
+            await config.engine.dispose()
+            await llm.stop()
+    return LevelReport(
+        games=games,
+        verified_games=sum(results),
+        duration_s=duration,
+        llm_requests=llm.requests,
+        commands=summarize(benchmark.stats),
+    )
+
+
+def format_report(report: LevelReport) -> str:
+    """
+    Function formats the measurement of a level as table.
+
+    Args:
+        report (LevelReport): Measurement of the level
+
+    Returns:
+        str: Table with one line per command
+    """
+    lines = [
+        f"{report.games} concurrent games: {report.verified_games} verified, "
+        + f"{report.duration_s:.2f} s, {report.llm_requests} LLM requests",
+        f"{'command':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'queries':>10}{'api calls':>11}",
+    ]
+    lines.extend(
+        f"{command.command:<18}{command.count:>7}{command.p50_ms:>10.1f}"
+        + f"{command.p95_ms:>10.1f}{command.queries:>10.1f}{command.api_calls:>11.1f}"
+        for command in report.commands
+    )
+    return "\n".join(lines)
+
+
+async def main(args: argparse.Namespace) -> None:
+    """
+    Function runs all concurrency levels and prints the report.
+
+    Args:
+        args (argparse.Namespace): Command line arguments
+    """
+    reports = []
+    for games in args.games:
+        report = await run_level(games, args.latency, args.turns)
+        reports.append(report)
+        print(format_report(report), end="\n\n")
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps([asdict(report) for report in reports], indent=2), encoding="utf-8"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of the game commands.")
+    parser.add_argument("--games", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--latency", type=float, default=0.5, help="LLM latency in seconds")
+    parser.add_argument("--turns", type=int, default=3, help="Story parts per game")
+    parser.add_argument("--json", help="File to store the results as JSON")
+    src.logger.remove()
+    src.logger.add(sys.stderr, level="WARNING")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,151 @@
+"""
+Benchmark of the content import. A genre pack of the handed over size is generated as
+multi-document YAML file and parsed with the pure Python and the libyaml safe loader.
+Every parser runs once on the event loop and once in a worker thread, while the loop
+watchdog measures how long the event loop is blocked.
+
+Usage: python -m benchmarks.yaml_import --size-mb 50
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+import yaml
+import src
+from src.file_utils import GENRE_SCHEMA, parse_yaml_file
+from src.loop_watchdog import LoopWatchdog, LoopWatchdogConfiguration
+
+GENRES_PER_DOCUMENT = 50
+
+
+@dataclass
+class ImportReport:
+    """
+    Class with the measurement of one parser.
+    """
+
+    loader: str
+    off_loop: bool
+    entries: int
+    duration_s: float
+    max_lag_ms: float
+
+
+def write_genre_pack(file_path: Path, size_mb: float) -> int:
+    """
+    Function writes a genre pack with documents of genres until the file has the
+    handed over size.
+
+    Args:
+        file_path (Path): Destination file
+        size_mb (float): Size of the file in megabytes
+
+    Returns:
+        int: Number of written genres
+    """
+    genres = 0
+    with file_path.open("w", encoding="utf-8") as file:
+        while file.tell() < size_mb * 1024 * 1024:
+            file.write("---\n")
+            for _ in range(GENRES_PER_DOCUMENT):
+                file.write(
+                    f"- name: Genre {genres}\n  storytelling-type: Roman\n"
+                    + "  atmosphere: düster\n  language: deutsch\n"
+                    + "  inspirational-words:\n    - chance: 50\n      words: ["
+                    + ", ".join(f"Wort{genres}x{word}" for word in range(40))
+                    + "]\n  events:\n    - chance: 10\n      event:\n"
+                    + "".join(
+                        f"        - Ereignis {event} der Gruppe in Genre {genres}.\n"
+                        for event in range(10)
+                    )
+                )
+                genres += 1
+    return genres
+
+
+async def measure(file_path: Path, loader_class: type, off_loop: bool) -> ImportReport:
+    """
+    Function parses the genre pack and measures the duration and the loop lag.
+
+    Args:
+        file_path (Path): Genre pack
+        loader_class (type): Safe YAML loader
+        off_loop (bool): Parse in a worker thread instead of on the event loop
+
+    Returns:
+        ImportReport: Measurement of the parser
+    """
+    watchdog = LoopWatchdog(LoopWatchdogConfiguration(interval=0.01, threshold_ms=10_000))
+    watchdog_task = asyncio.create_task(watchdog.run())
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    if off_loop:
+        entries, _ = await asyncio.to_thread(
+            parse_yaml_file, str(file_path), GENRE_SCHEMA, loader_class
+        )
+    else:
+        entries, _ = parse_yaml_file(str(file_path), GENRE_SCHEMA, loader_class)
+    duration = time.perf_counter() - start
+    await asyncio.sleep(0.05)
+    watchdog_task.cancel()
+    await asyncio.gather(watchdog_task, return_exceptions=True)
+    return ImportReport(
+        loader=loader_class.__name__,
+        off_loop=off_loop,
+        entries=len(entries),
+        duration_s=duration,
+        max_lag_ms=watchdog.percentiles()["max"] * 1000,
+    )
+
+
+async def run_benchmark(size_mb: float) -> list[ImportReport]:
+    """
+    Function generates the genre pack and measures all available loaders on and off the
+    event loop.
+
+    Args:
+        size_mb (float): Size of the genre pack in megabytes
+
+    Returns:
+        list[ImportReport]: Measurement of every loader
+    """
+    loaders = [yaml.SafeLoader] + ([yaml.CSafeLoader] if yaml.__with_libyaml__ else [])
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = Path(tmp_dir) / "genre.yml"
+        write_genre_pack(file_path, size_mb)
+        return [
+            await measure(file_path, loader_class, off_loop)
+            for loader_class in loaders
+            for off_loop in (False, True)
+        ]
+
+
+def format_report(reports: list[ImportReport]) -> str:
+    """
+    Function formats the measurements as table.
+
+    Args:
+        reports (list[ImportReport]): Measurement of every loader
+
+    Returns:
+        str: Table with one line per loader
+    """
+    lines = [f"{'loader':<14}{'thread':>8}{'entries':>10}{'seconds':>10}{'max lag ms':>12}"]
+    lines.extend(
+        f"{report.loader:<14}{str(report.off_loop):>8}{report.entries:>10}"
+        + f"{report.duration_s:>10.2f}{report.max_lag_ms:>12.1f}"
+        for report in reports
+    )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the YAML content import.")
+    parser.add_argument("--size-mb", type=float, default=50, help="Size of the genre pack")
+    src.logger.remove()
+    src.logger.add(sys.stderr, level="ERROR")
+    print(format_report(asyncio.run(run_benchmark(parser.parse_args().size_mb))))
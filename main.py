@@ -15,8 +15,23 @@ async def main():
     src.init_logging(config)
     config.logger.info(f"Start application in version: {src.__version__}")
     discord_bot = src.DiscordBot(config)
+    config.background_tasks.start(src.archive_schedule(config), name="archive-schedule")
+    config.background_tasks.start(
+        src.content_watch_schedule(config), name="content-watch-schedule"
+    )
+    if config.loop_watchdog is not None:
+        config.background_tasks.start(config.loop_watchdog.run(), name="loop-watchdog")
     tasks = [discord_bot.start()]
-    await asyncio.gather(*tasks)
+    if config.metrics is not None:
+        tasks.append(config.metrics.serve())
+        config.logger.info(
+            "Serve metrics on "
+            + f"http://{config.env.metrics.host}:{config.env.metrics.port}/metrics"
+        )
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        await config.background_tasks.cancel_all()
 
 
 if __name__ == "__main__":
@@ -5,17 +5,54 @@ and enables
 - The loading of global configurations and resources.
 - The initialization of submodules and packages.
 - The import and provision of frequently used functions and constants.
+
+The submodules are imported lazily on first access of one of their names, so
+importing the package does not load discord, SQLAlchemy or the OpenAI client.
 """
-from .configuration import *
-from .db_classes import *
-from .db import *
-from .file_utils import *
-from .discord_bot import *
+import importlib
 from .tetue_generic import __gen_version__
-from .tetue_generic.generic_requests import *
-from .tetue_generic.watcher import *
 
 __version__ = "v0.2.0"
 __repository__ = "https://github.com/Technik-Tueftler/tales_of_survival"
 MODE_DEVELOP = False
 # uv run -- sphinx-build -b html docs docs/_build/html
+
+_LAZY_MODULES = (
+    ".configuration",
+    ".db_classes",
+    ".db_migrations",
+    ".db",
+    ".db_archive",
+    ".file_utils",
+    ".discord_bot",
+    ".content_watcher",
+    ".tetue_generic.generic_requests",
+    ".tetue_generic.watcher",
+)
+
+
+def __getattr__(name: str):
+    """
+    Function resolves a public name of the package from the submodules in the order
+    of the former star imports and caches it in the package namespace.
+
+    Args:
+        name (str): Name of the requested attribute
+
+    Raises:
+        AttributeError: The name is not defined in any submodule
+
+    Returns:
+        Any: The requested attribute
+    """
+    if name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    for module_name in _LAZY_MODULES:
+        module = importlib.import_module(module_name, __name__)
+        if name in module.__dict__:
+            value = module.__dict__[name]
+            globals()[name] = value
+            return value
+    if name in globals():
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
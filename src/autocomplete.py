@@ -0,0 +1,152 @@
+"""
+This module contains the in-memory name index for the autocomplete of slash command
+parameters. Discord expects autocomplete answers within 3 seconds, so games, characters
+and genres are kept in sorted lists and a prefix is found with a binary search instead
+of a database query. The index is loaded once and updated on every write.
+"""
+
+from bisect import bisect_left, insort
+from collections.abc import Hashable
+from typing import Any, Callable, Iterable
+from discord import app_commands
+from .constants import DC_MAX_SELECT_OPTIONS
+from .db_classes import GAME, CHARACTER, GENRE
+
+
+class NameIndex:
+    """
+    Class to find entries by a case insensitive name prefix. Each entry has an
+    id, the name and a tag to filter the results like the game status.
+    """
+
+    def __init__(self):
+        self._keys: list[tuple[str, int]] = []
+        self._entries: dict[int, tuple[str, Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def upsert(self, entry_id: int, name: str, tag: Hashable = None) -> None:
+        """
+        Function adds or updates the entry with the handed over id.
+
+        Args:
+            entry_id (int): Database id of the entry
+            name (str): Name of the entry
+            tag (Hashable, optional): Filter value of the entry. Defaults to None.
+        """
+        self.remove(entry_id)
+        self._entries[entry_id] = (name, tag)
+        insort(self._keys, (name.casefold(), entry_id))
+
+    def remove(self, entry_id: int) -> None:
+        """
+        Function removes the entry with the handed over id if it exists.
+
+        Args:
+            entry_id (int): Database id of the entry
+        """
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        key = (entry[0].casefold(), entry_id)
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+
+    def get(self, entry_id: int) -> tuple[str, Hashable] | None:
+        """
+        Function returns name and tag of the entry with the handed over id.
+
+        Args:
+            entry_id (int): Database id of the entry
+
+        Returns:
+            tuple[str, Hashable] | None: Name and tag or None if the entry is unknown
+        """
+        return self._entries.get(entry_id)
+
+    def search(
+        self,
+        prefix: str,
+        accept: Callable[[Hashable], bool] = lambda _: True,
+        limit: int = DC_MAX_SELECT_OPTIONS,
+    ) -> list[tuple[int, str]]:
+        """
+        Function returns all entries with a name starting with the handed over prefix
+        sorted by name. If the prefix is a number, the entry with this id is returned
+        first.
+
+        Args:
+            prefix (str): Beginning of the name or the id of the entry
+            accept (Callable[[Hashable], bool], optional): Filter on the tag of the
+                entries. Defaults to accept all entries.
+            limit (int, optional): Maximum number of results. Defaults to 25.
+
+        Returns:
+            list[tuple[int, str]]: Id and name of the found entries
+        """
+        prefix = prefix.strip().casefold()
+        results = []
+        if prefix.isdigit():
+            entry = self._entries.get(int(prefix))
+            if entry is not None and accept(entry[1]):
+                results.append((int(prefix), entry[0]))
+        position = bisect_left(self._keys, (prefix, -1))
+        while len(results) < limit and position < len(self._keys):
+            name, entry_id = self._keys[position]
+            if not name.startswith(prefix):
+                break
+            entry = self._entries[entry_id]
+            if accept(entry[1]) and (not results or results[0][0] != entry_id):
+                results.append((entry_id, entry[0]))
+            position += 1
+        return results
+
+
+class AutocompleteIndex:
+    """
+    Class to hold the name indexes of games, characters and genres. The tag of a
+    game is its status, the tag of a character and a genre is whether it is available
+    for selection.
+    """
+
+    def __init__(self):
+        self.loaded: bool = False
+        self.games = NameIndex()
+        self.characters = NameIndex()
+        self.genres = NameIndex()
+
+    def track(self, objs: Iterable[Any]) -> None:
+        """
+        Function updates the indexes with the handed over database objects after a write.
+        Objects of other classes are ignored.
+
+        Args:
+            objs (Iterable[Any]): Written database objects
+        """
+        for obj in objs:
+            if isinstance(obj, GAME):
+                self.games.upsert(obj.id, obj.name, obj.status)
+            elif isinstance(obj, CHARACTER):
+                self.characters.upsert(
+                    obj.id, obj.name, bool(obj.alive and obj.user_id is None)
+                )
+            elif isinstance(obj, GENRE):
+                self.genres.upsert(obj.id, obj.name, obj.active)
+
+
+def to_choices(entries: list[tuple[int, str]]) -> list[app_commands.Choice[int]]:
+    """
+    Function converts the results of a name index search into autocomplete choices.
+
+    Args:
+        entries (list[tuple[int, str]]): Id and name of the entries
+
+    Returns:
+        list[app_commands.Choice[int]]: Choices with the name as label and the id as value
+    """
+    return [
+        app_commands.Choice(name=f"{entry_id}: {name}"[:100], value=entry_id)
+        for entry_id, name in entries
+    ]
@@ -0,0 +1,57 @@
+"""
+This module contains the tracking of background tasks. asyncio only keeps weak
+references to tasks, so every task started in the background is stored until it is done.
+"""
+
+import asyncio
+from typing import Any, Coroutine
+
+
+class BackgroundTasks:
+    """
+    Class to track running background tasks, so they are not garbage collected and
+    can be counted and cancelled on shutdown. Finished tasks are removed automatically.
+    """
+
+    def __init__(self):
+        self._tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def start(self, coro: Coroutine[Any, Any, None], name: str) -> asyncio.Task:
+        """
+        Function starts the handed over coroutine as tracked task.
+
+        Args:
+            coro (Coroutine[Any, Any, None]): Coroutine to execute
+            name (str): Name of the task for logging
+
+        Returns:
+            asyncio.Task: Started task
+        """
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def get(self, name: str) -> asyncio.Task | None:
+        """
+        Function returns the running task with the handed over name.
+
+        Args:
+            name (str): Name of the task
+
+        Returns:
+            asyncio.Task | None: Running task or None if no task has the name
+        """
+        return next((task for task in self._tasks if task.get_name() == name), None)
+
+    async def cancel_all(self) -> None:
+        """
+        Function cancels all running tasks and waits until they are finished.
+        """
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
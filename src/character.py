@@ -2,6 +2,7 @@
 
 import sys
 from datetime import datetime, timezone
+from functools import partial
 import asyncio
 import discord
 from discord import Interaction
@@ -16,18 +17,33 @@ from .db import (
     get_game_id_from_character_id,
 )
 from .db_classes import CHARACTER
+from .unit_of_work import unit_of_work
 from .discord_utils import interface_select_game, send_character_embed
 from .configuration import Configuration, ProcessInput
+from .command_runner import send_interaction_message
+from .game_views import PagedSelectView
+from .pagination import PageDirection
 
 
-class CharacterSelectView(discord.ui.View):
+class CharacterSelectView(PagedSelectView):
     """
-    View class to select a character for a game.
+    View class to select a character for a game, large lists are loaded page by page.
     """
 
     def __init__(self, config, process_data: ProcessInput):
-        super().__init__()
-        self.add_item(CharacterSelect(config, process_data))
+        super().__init__(
+            config,
+            process_data.user_context.char_page,
+            process_data.user_context.char_page_loader,
+        )
+        self.process_data = process_data
+        self.refresh()
+
+    def create_select(self) -> discord.ui.Select:
+        return CharacterSelect(self.config, self.process_data)
+
+    def set_items(self, items: list) -> None:
+        self.process_data.user_context.available_chars = items
 
 
 class CharacterSelect(discord.ui.Select):
@@ -73,20 +89,118 @@ class CharacterSelect(discord.ui.Select):
         self.view.stop()
 
 
-async def select_character(interaction: Interaction, config: Configuration) -> None:
+async def load_available_characters(
+    config: Configuration, process_data: ProcessInput
+) -> None:
+    """
+    This function sets the page loader for all available characters and loads the
+    first page for the character selection.
+
+    Args:
+        config (Configuration): App configuration
+        process_data (ProcessInput): Process data to store the characters
+    """
+    user_context = process_data.user_context
+    user_context.char_page_loader = partial(
+        get_available_characters, config, user_context.char_page
+    )
+    user_context.available_chars = await user_context.char_page_loader(
+        PageDirection.FIRST
+    )
+
+
+async def load_open_user_games(config: Configuration, process_data: ProcessInput) -> None:
+    """
+    This function loads the games in which the user has not yet selected a character.
+    A game selected with the autocomplete is checked against all open games, otherwise
+    the page loader is set and the first page is loaded for the game selection.
+
+    Args:
+        config (Configuration): App configuration
+        process_data (ProcessInput): Process data to store the games
+    """
+    game_context = process_data.game_context
+    user_dc_id = process_data.user_context.user_dc_id
+    if game_context.selected_game_id:
+        game_context.available_games = await get_all_open_user_games(config, user_dc_id)
+        return
+    game_context.page_loader = partial(
+        get_all_open_user_games, config, user_dc_id, game_context.page
+    )
+    game_context.available_games = await game_context.page_loader(PageDirection.FIRST)
+
+
+async def get_available_character(
+    config: Configuration, character_id: int
+) -> CHARACTER | None:
+    """
+    This function returns the character with the handed over id if it is alive and not
+    assigned to a user. It checks characters selected with the autocomplete.
+
+    Args:
+        config (Configuration): App configuration
+        character_id (int): Selected character id
+
+    Returns:
+        CHARACTER | None: Available character or None
+    """
+    character = await get_object_by_id(config, CHARACTER, character_id)
+    if character is None or not character.alive or character.user_id is not None:
+        config.logger.debug(f"Character with ID: {character_id} is not available.")
+        return None
+    return character
+
+
+async def assign_character_to_game(
+    config: Configuration, process_data: ProcessInput
+) -> None:
+    """
+    This function assigns the selected character to the user in the selected game. All
+    database operations are executed in one unit of work.
+
+    Args:
+        config (Configuration): App configuration
+        process_data (ProcessInput): Process data with selected game and character
+    """
+    async with unit_of_work(config):
+        user = await get_user_from_dc_id(config, process_data.user_context.user_dc_id)
+        association = await get_mapped_ugc_association(
+            config, process_data.game_context.selected_game_id, user.id
+        )
+        selected_character = await get_object_by_id(
+            config, CHARACTER, process_data.user_context.selected_char
+        )
+        selected_character.user_id = association.user_id
+        selected_character.start_date = datetime.now(timezone.utc)
+        association.character_id = process_data.user_context.selected_char
+        await update_db_objs(config, [association, selected_character])
+
+
+async def select_character(
+    interaction: Interaction,
+    config: Configuration,
+    game_id: int | None = None,
+    character_id: int | None = None,
+) -> None:
     """
     This function allows the user to select a character for a specific game.
 
     Args:
         interaction (Interaction): Interaction object
         config (Configuration): App configuration
+        game_id (int | None, optional): Game selected with the autocomplete.
+            Defaults to None.
+        character_id (int | None, optional): Character selected with the autocomplete.
+            Defaults to None.
     """
     try:
         process_data = ProcessInput()
         process_data.user_context.user_dc_id = str(interaction.user.id)
-        await get_all_open_user_games(config, process_data)
+        process_data.game_context.selected_game_id = game_id or 0
+        await load_open_user_games(config, process_data)
         if not await process_data.game_context.input_valid_game():
-            await interaction.response.send_message(
+            await send_interaction_message(
+                interaction,
                 "An error occurred while retrieving your games. Your not registered "
                 "for any game. Please contact the admin.",
                 ephemeral=True,
@@ -99,9 +213,18 @@ async def select_character(interaction: Interaction, config: Configuration) -> N
         select_success = await interface_select_game(interaction, config, process_data)
         if not select_success:
             return
-        process_data.user_context.available_chars = await get_available_characters(
-            config
-        )
+        if character_id:
+            if await get_available_character(config, character_id) is None:
+                await interaction.followup.send(
+                    f"The character with the ID: {character_id} is not available "
+                    + "for selection.",
+                    ephemeral=True,
+                )
+                return
+            process_data.user_context.selected_char = character_id
+            await assign_character_to_game(config, process_data)
+            return
+        await load_available_characters(config, process_data)
         if not await process_data.user_context.input_valid_char():
             await interaction.followup.send(
                 "An error occurred while retrieving character. There are no selectable characters. "
@@ -116,17 +239,7 @@ async def select_character(interaction: Interaction, config: Configuration) -> N
             ephemeral=True,
         )
         await character_view.wait()
-        user = await get_user_from_dc_id(config, process_data.user_context.user_dc_id)
-        association = await get_mapped_ugc_association(
-            config, process_data.game_context.selected_game_id, user.id
-        )
-        selected_character = await get_object_by_id(
-            config, CHARACTER, process_data.user_context.selected_char
-        )
-        selected_character.user_id = association.user_id
-        selected_character.start_date = datetime.now(timezone.utc)
-        association.character_id = process_data.user_context.selected_char
-        await update_db_objs(config, [association, selected_character])
+        await assign_character_to_game(config, process_data)
 
     except discord.Forbidden:
         config.logger.opt(exception=sys.exc_info()).error(
@@ -144,18 +257,34 @@ async def select_character(interaction: Interaction, config: Configuration) -> N
         )
 
 
-async def show_character(interaction: Interaction, config: Configuration) -> None:
+async def show_character(
+    interaction: Interaction, config: Configuration, character_id: int | None = None
+) -> None:
     """
     This function allows the user to show a character's details.
 
     Args:
         interaction (Interaction): Discord interaction object
         config (Configuration): App configuration
+        character_id (int | None, optional): Character selected with the autocomplete.
+            Defaults to None.
     """
+    if character_id:
+        selected_character = await get_available_character(config, character_id)
+        if selected_character is None:
+            await send_interaction_message(
+                interaction,
+                f"The character with the ID: {character_id} is not available.",
+                ephemeral=True,
+            )
+            return
+        await send_character_embed(interaction, config, selected_character)
+        return
     char_context = ProcessInput()
-    char_context.user_context.available_chars = await get_available_characters(config)
+    await load_available_characters(config, char_context)
     if not await char_context.user_context.input_valid_char():
-        await interaction.response.send_message(
+        await send_interaction_message(
+            interaction,
             "An error occurred while retrieving character. There are no selectable characters. "
             "Please contact a admin or mod and follow the creation guideline in "
             "the documentation.",
@@ -163,7 +292,8 @@ async def show_character(interaction: Interaction, config: Configuration) -> Non
         )
         return
     character_view = CharacterSelectView(config, char_context)
-    await interaction.response.send_message(
+    await send_interaction_message(
+        interaction,
         "Please select now the character to inspect.",
         view=character_view,
         ephemeral=True,
@@ -189,14 +319,16 @@ async def show_own_character(interaction: Interaction, config: Configuration) ->
         config, user
     )
     if not await char_context.user_context.input_valid_char():
-        await interaction.response.send_message(
+        await send_interaction_message(
+            interaction,
             "An error occurred while retrieving character. There are no selectable characters. "
             "Please contact the admin.",
             ephemeral=True,
         )
         return
     character_view = CharacterSelectView(config, char_context)
-    await interaction.response.send_message(
+    await send_interaction_message(
+        interaction,
         "Please select now the character to inspect.",
         view=character_view,
         ephemeral=True,
@@ -0,0 +1,148 @@
+"""
+This module contains the execution of slash commands as tracked background tasks.
+Discord marks an interaction as failed if it is not answered within 3 seconds. Commands
+with database and LLM requests are therefore deferred immediately and the work is
+continued in a background task with timeout, while all messages are sent as followup.
+"""
+
+import sys
+import asyncio
+from typing import Awaitable, Callable
+import discord
+from discord import Interaction
+from .configuration import Configuration
+from .db_profiler import profile_command
+
+
+async def send_interaction_message(
+    interaction: Interaction, content: str | None = None, **kwargs
+) -> discord.WebhookMessage | None:
+    """
+    Function sends a message as response to the interaction or as followup if the
+    interaction is already deferred or answered.
+
+    Args:
+        interaction (Interaction): Discord interaction
+        content (str | None, optional): Message text. Defaults to None.
+        **kwargs: Further message parameters like view, embed or ephemeral
+
+    Returns:
+        discord.WebhookMessage | None: Followup message or None for a response
+    """
+    if interaction.response.is_done():
+        return await interaction.followup.send(content, **kwargs)
+    await interaction.response.send_message(content, **kwargs)
+    return None
+
+
+async def report_progress(interaction: Interaction, content: str) -> None:
+    """
+    Function informs the user about a slow step of a deferred command, like a
+    request to the LLM.
+
+    Args:
+        interaction (Interaction): Discord interaction
+        content (str): Progress message
+    """
+    await send_interaction_message(interaction, content, ephemeral=True)
+
+
+async def run_command(
+    config: Configuration,
+    interaction: Interaction,
+    handler: Callable[..., Awaitable[None]],
+    *args,
+) -> None:
+    """
+    Function executes the command handler with the configured timeout. A timeout or an
+    unexpected error is logged and reported to the user.
+
+    Args:
+        config (Configuration): App configuration
+        interaction (Interaction): Deferred Discord interaction
+        handler (Callable[..., Awaitable[None]]): Command handler
+        *args: Further arguments for the command handler
+    """
+    command_name = getattr(interaction.command, "qualified_name", handler.__name__)
+    try:
+        async with profile_command(config.query_profiler, config.engine, command_name):
+            await asyncio.wait_for(
+                handler(interaction, config, *args), timeout=config.env.dc.command_timeout
+            )
+        config.logger.trace(f"Command {command_name} finished.")
+    except asyncio.TimeoutError:
+        config.logger.warning(
+            f"Command {command_name} cancelled after {config.env.dc.command_timeout} s."
+        )
+        await send_command_error(
+            config, interaction, "The command took too long and was cancelled."
+        )
+    except asyncio.CancelledError:
+        config.logger.info(f"Command {command_name} cancelled.")
+        raise
+    except Exception:  # pylint: disable=broad-exception-caught
+        config.logger.opt(exception=sys.exc_info()).error(
+            f"Unexpected error in command {command_name}."
+        )
+        await send_command_error(
+            config, interaction, "An unexpected error occurred, please contact a Mod."
+        )
+
+
+async def send_command_error(
+    config: Configuration, interaction: Interaction, content: str
+) -> None:
+    """
+    Function informs the user about a failed command. Errors while sending are only
+    logged, because the interaction may already be expired.
+
+    Args:
+        config (Configuration): App configuration
+        interaction (Interaction): Discord interaction
+        content (str): Error message
+    """
+    try:
+        await send_interaction_message(interaction, content, ephemeral=True)
+    except discord.HTTPException:
+        config.logger.opt(exception=sys.exc_info()).error("Failed to send message.")
+
+
+def command_task_name(interaction: Interaction) -> str:
+    """
+    Function returns the name of the background task of a deferred command.
+
+    Args:
+        interaction (Interaction): Discord interaction of the command
+
+    Returns:
+        str: Name of the background task
+    """
+    return f"command-{interaction.id}"
+
+
+async def run_deferred(
+    config: Configuration,
+    interaction: Interaction,
+    handler: Callable[..., Awaitable[None]],
+    *args,
+) -> asyncio.Task:
+    """
+    Function defers the interaction immediately with thinking state and continues the
+    command handler as tracked background task. All messages of the handler are sent
+    as followup.
+
+    Args:
+        config (Configuration): App configuration
+        interaction (Interaction): Discord interaction
+        handler (Callable[..., Awaitable[None]]): Command handler
+        *args: Further arguments for the command handler
+
+    Returns:
+        asyncio.Task: Background task of the command
+    """
+    if not interaction.response.is_done():
+        await interaction.response.defer(ephemeral=True, thinking=True)
+    return config.background_tasks.start(
+        run_command(config, interaction, handler, *args),
+        name=command_task_name(interaction),
+    )
@@ -2,18 +2,27 @@
 Load environment variables and validation of project configurations from user
 """
 
-import random
 import asyncio
+from dataclasses import dataclass, field
 from string import Template
-from typing import List
+from typing import Awaitable, Callable, List
 import environ
 from dotenv import load_dotenv
 import loguru
 import discord
 from discord.ext.commands import Bot as DcBot
+from sqlalchemy import URL, make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from .tetue_generic.generic_requests import GenReqConfiguration
 from .tetue_generic.watcher import WatcherConfiguration
+from .genre_cache import GenreCache, GenreSampler
+from .autocomplete import AutocompleteIndex
+from .background_tasks import BackgroundTasks
+from .metrics import Metrics, MetricsConfiguration
+from .db_profiler import QueryProfiler
+from .sampling_profiler import SamplingProfiler
+from .loop_watchdog import LoopWatchdog, LoopWatchdogConfiguration
+from .pagination import PageContext, PageDirection
 from .db_classes import (
     DbConfiguration,
     GAME,
@@ -38,6 +47,22 @@ class IdError(Exception):
     """
 
 
+@dataclass
+class ImportResult:  # pylint: disable=too-many-instance-attributes
+    """
+    Result class from importing a file.
+    """
+
+    file_path: str
+    data: dict
+    success: bool = False
+    import_number: int = 0
+    text_genre: str = ""
+    text_character: str = ""
+    errors: list[str] = field(default_factory=list)
+    summary: str = ""
+
+
 class DelimitedTemplate(Template):
     """This class allow the creation of a template with a user defined separator.
     The package is there to define templates for texts and then substitute them
@@ -80,6 +105,8 @@ class GenreContext:
         self.available_genre: List[GENRE] = []
         self.selected_genre_id: int = 0
         self.selected_genre: GENRE = None
+        self.page: PageContext = PageContext()
+        self.page_loader: Callable[[PageDirection], Awaitable[List[GENRE]]] = None
 
     async def input_valid_genre(self) -> bool:
         """
@@ -103,6 +130,10 @@ class UserContext:
         self.user_dc_id: str = "0"
         self.available_chars: List[CHARACTER] = []
         self.selected_char: int = 0
+        self.char_page: PageContext = PageContext()
+        self.char_page_loader: Callable[[PageDirection], Awaitable[List[CHARACTER]]] = (
+            None
+        )
 
     async def input_valid_char(self) -> bool:
         """
@@ -116,7 +147,7 @@ class UserContext:
         return True
 
 
-class GameContext:
+class GameContext:  # pylint: disable=too-many-instance-attributes
     """
     Class to specify the game context and input data
     for processing.
@@ -124,6 +155,9 @@ class GameContext:
 
     def __init__(self):
         self.available_games: List[GAME] = []
+        self.page: PageContext = PageContext()
+        self.page_loader: Callable[[PageDirection], Awaitable[List[GAME]]] = None
+        self.selectable_status: List[GameStatus] | None = None
         self.selected_game_id: int = 0
         self.selected_game: GAME = None
         self.new_game_status: GameStatus = None
@@ -141,6 +175,23 @@ class GameContext:
             return False
         return True
 
+    async def game_selectable(self, game: GAME | None) -> bool:
+        """
+        Checks if a game selected by id is available for the command. Games of a paged
+        list are checked by status, otherwise the game must be in the available games.
+
+        Args:
+            game (GAME | None): Selected game
+
+        Returns:
+            bool: Game is selectable
+        """
+        if game is None:
+            return False
+        if self.selectable_status is not None:
+            return game.status in self.selectable_status
+        return any(available.id == game.id for available in self.available_games)
+
     async def request_game_start(self) -> bool:
         """
         Checks if a game start is requested, based on the selected game status.
@@ -167,6 +218,7 @@ class StoryContext:
         self.event: EVENT = None
         self.character: list[CHARACTER] = []
         self.start = StoryStartContext()
+        self.sampler: GenreSampler = None
 
     def events_available(self) -> bool:
         """
@@ -175,7 +227,7 @@ class StoryContext:
         Returns:
             bool: Events available
         """
-        if len(self.tale.genre.events) <= 0:
+        if len(self.sampler.events) <= 0:
             return False
         return True
 
@@ -184,20 +236,14 @@ class StoryContext:
         Function selecting a random event based on the weights defined
         in the database for the tale's genre.
         """
-        weights = [element.chance for element in self.tale.genre.events]
-        self.event = random.choices(  # pylint: disable=no-member
-            self.tale.genre.events, weights=weights, k=1
-        )[0]
+        self.event = self.sampler.random_event()
 
     async def get_random_insp_word_weighted(self) -> INSPIRATIONALWORD:
         """
         Function selecting a random inspirational word based on the weights defined
         in the database for the tale's genre.
         """
-        weights = [element.chance for element in self.tale.genre.inspirational_words]
-        return random.choices(  # pylint: disable=no-member
-            self.tale.genre.inspirational_words, weights=weights, k=1
-        )[0]
+        return self.sampler.random_insp_word()
 
     def insp_words_not_available(self) -> bool:
         """
@@ -206,7 +252,7 @@ class StoryContext:
         Returns:
             bool: _description_
         """
-        return len(self.tale.genre.inspirational_words) <= 0
+        return len(self.sampler.insp_words) <= 0
 
     async def get_fiction_prompt(self) -> str:
         """
@@ -279,6 +325,62 @@ class DcConfiguration:
     storyteller_role_id: int = environ.var(0, converter=int)
     everyone_role_id: int = environ.var(0, converter=int)
     public_event_channel_id: int = environ.var(0, converter=int)
+    command_timeout: int = environ.var(840, converter=int)
+    command_hash_file: str = environ.var("files/command_tree.hash", converter=str)
+    force_command_sync: bool = environ.bool_var(False)
+
+
+@environ.config(prefix="CONTENT")
+class ContentWatchConfiguration:
+    """
+    Configuration model for the watched content directory. Changed genre and character
+    files are imported when their size and modification time did not change for the
+    debounce time.
+    """
+
+    watch: bool = environ.bool_var(False)
+    directory: str = environ.var("files/content", converter=str)
+    interval: float = environ.var(5.0, converter=float)
+    debounce: float = environ.var(2.0, converter=float)
+
+
+@environ.config(prefix="CHAPTER")
+class ChapterConfiguration:
+    """
+    Configuration model for the chapters, which are written in the background when a
+    game is finished. A chapter starts with an event after the minimum number of stories
+    or after the maximum number of stories.
+    """
+
+    concurrency: int = environ.var(2, converter=int)
+    min_stories: int = environ.var(4, converter=int)
+    max_stories: int = environ.var(12, converter=int)
+
+
+def get_engine_options(db_config: DbConfiguration) -> tuple[URL, dict]:
+    """
+    Function creates the database URL and the engine options for the configured backend.
+    MariaDB and MySQL get a connection pool with pre ping and recycling and the utf8mb4
+    charset for emojis, SQLite keeps the default pool of SQLAlchemy.
+
+    Args:
+        db_config (DbConfiguration): Database configuration
+
+    Returns:
+        tuple[URL, dict]: Database URL and options for the engine
+    """
+    db_url = make_url(db_config.db_url)
+    if db_url.get_backend_name() not in ("mysql", "mariadb"):
+        return db_url, {}
+    if "charset" not in db_url.query:
+        db_url = db_url.update_query_dict({"charset": "utf8mb4"})
+    return db_url, {
+        "pool_size": db_config.pool_size,
+        "max_overflow": db_config.max_overflow,
+        "pool_recycle": db_config.pool_recycle,
+        "pool_timeout": db_config.pool_timeout,
+        "pool_pre_ping": db_config.pool_pre_ping,
+    }
 
 
 @environ.config(prefix="TT")
@@ -294,9 +396,13 @@ class EnvConfiguration:
     watcher = environ.group(WatcherConfiguration)
     db = environ.group(DbConfiguration)
     dc = environ.group(DcConfiguration)
+    content = environ.group(ContentWatchConfiguration)
+    chapter = environ.group(ChapterConfiguration)
+    metrics = environ.group(MetricsConfiguration)
+    loop = environ.group(LoopWatchdogConfiguration)
 
 
-class Configuration:
+class Configuration:  # pylint: disable=too-many-instance-attributes
     """
     Genral configuration class for the entire application.
     Combines all sub-configurations and initializes the database engine and session.
@@ -305,7 +411,25 @@ class Configuration:
     def __init__(self, config: EnvConfiguration):
         self.dc_bot = DcBot
         self.env = config
-        self.engine = create_async_engine(config.db.db_url)
+        db_url, engine_options = get_engine_options(config.db)
+        self.engine = create_async_engine(db_url, **engine_options)
         self.session = async_sessionmaker(bind=self.engine, expire_on_commit=False)
         self.write_lock = asyncio.Lock()  # pylint: disable=not-callable
+        self.genre_cache = GenreCache()
+        self.name_index = AutocompleteIndex()
+        self.background_tasks = BackgroundTasks()
+        self.chapter_limit = asyncio.Semaphore(config.chapter.concurrency)
+        self.user_ids: dict[str, int] = {}
+        self.query_profiler: QueryProfiler | None = None
+        if config.db.profile_queries:
+            self.query_profiler = QueryProfiler(config.db)
+            self.query_profiler.instrument(self.engine)
+        self.sampling_profiler = SamplingProfiler()
+        self.metrics: Metrics | None = None
+        if config.metrics.enabled:
+            self.metrics = Metrics(config.metrics)
+            self.metrics.instrument_engine(self.engine)
+        self.loop_watchdog: LoopWatchdog | None = None
+        if config.loop.watchdog:
+            self.loop_watchdog = LoopWatchdog(config.loop, self.metrics)
         self.logger: loguru._logger.Logger = None
@@ -37,9 +37,15 @@ PROMPT_MAX_WORDS_FICTION: int = 300
 DC_MAX_CHAR_MESSAGE: int = 2000
 """Maximum number of characters for a message in Discord."""
 
+DC_MAX_FILE_SIZE: int = 10 * 1024 * 1024
+"""Maximum size in bytes of a file upload in Discord without boost."""
+
 DC_DESCRIPTION_MAX_CHAR: int = 100
 """Maximum number of characters for Discord input."""
 
+DC_MAX_SELECT_OPTIONS: int = 25
+"""Maximum number of options in a Discord select menu."""
+
 DC_MODAL_INPUT_EVENT_TEXT_MAX_CHAR: int = 200
 """Maximum number of characters for event text in Discord modal input."""
 
@@ -124,3 +130,24 @@ FICTION_REQUEST_PROMPT: str = (
     + "beziehen. Der Text darf maximal #MaxWords Wörter umfassen."
 )
 """Prompt template for fiction description during story telling phase."""
+
+PROMPT_MAX_WORDS_CHAPTER_TITLE: int = 8
+"""Maximum number of words for the title of a chapter."""
+
+PROMPT_MAX_WORDS_CHAPTER_SUMMARY: int = 80
+"""Maximum number of words for the summary of a chapter."""
+
+CHAPTER_REQUEST_PROMPT: str = (
+    "Hier ist Kapitel #Number einer Geschichte:\n\n#ChapterText\n\n"
+    + "Finde einen Titel mit maximal #MaxTitleWords Wörtern und fasse das Kapitel mit "
+    + "maximal #MaxWords Wörtern zusammen. Schreibe in der Sprache der Geschichte. "
+    + "Antworte ausschließlich in diesem Format:\nTitel: <Titel>\n"
+    + "Zusammenfassung: <Zusammenfassung>"
+)
+"""Prompt template for the title and the summary of a chapter of a finished tale."""
+
+DB_COMPRESS_MIN_LENGTH: int = 256
+"""Minimum number of characters of a story text to store it compressed."""
+
+DB_DEDUP_MIN_LENGTH: int = 64
+"""Minimum number of characters of a prompt to store it once in the shared prompt texts."""
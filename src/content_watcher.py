@@ -0,0 +1,171 @@
+"""
+This module contains the watcher of the content directory. The directory is polled with
+fingerprints of size and modification time, so it also works in containers without
+inotify. New or changed genre and character files are imported incrementally in the
+background as soon as they did not change for the debounce time.
+"""
+
+import os
+import sys
+import time
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from .configuration import Configuration, ImportResult
+from .db import create_character_from_input
+from .db_content import update_characters_from_input, update_genres_from_input
+from .db_genre import create_genre_from_input
+from .file_utils import CHARACTER_SCHEMA, GENRE_SCHEMA, FieldRule, import_content_file
+
+CONTENT_SUFFIXES = (".yml", ".yaml")
+"""File extensions of the content files."""
+
+Fingerprint = tuple[int, int]
+"""Size and modification time in nanoseconds of a file."""
+
+
+@dataclass(frozen=True)
+class ContentKind:
+    """
+    Class with the rules and the import functions of a kind of content file.
+    """
+
+    schema: dict[str, FieldRule]
+    create: Callable[[Configuration, ImportResult], Awaitable[None]]
+    update: Callable[[Configuration, list[dict]], Awaitable[list[str] | None]]
+
+
+CONTENT_KINDS: dict[str, ContentKind] = {
+    "genre": ContentKind(GENRE_SCHEMA, create_genre_from_input, update_genres_from_input),
+    "character": ContentKind(
+        CHARACTER_SCHEMA, create_character_from_input, update_characters_from_input
+    ),
+}
+"""Kinds of content files by the prefix of the file name, e.g. genre_zombie.yml."""
+
+
+def content_kind(file_name: str) -> ContentKind | None:
+    """
+    Function returns the kind of a content file by its name.
+
+    Args:
+        file_name (str): Name of the file
+
+    Returns:
+        ContentKind | None: Kind of the file or None if it is no content file
+    """
+    if not file_name.lower().endswith(CONTENT_SUFFIXES):
+        return None
+    return next(
+        (kind for prefix, kind in CONTENT_KINDS.items() if file_name.lower().startswith(prefix)),
+        None,
+    )
+
+
+def scan_directory(directory: str) -> dict[str, Fingerprint]:
+    """
+    Function returns the fingerprints of all content files in the directory.
+
+    Args:
+        directory (str): Watched directory
+
+    Returns:
+        dict[str, Fingerprint]: Fingerprint per file path
+    """
+    if not os.path.isdir(directory):
+        return {}
+    fingerprints = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and content_kind(entry.name) is not None:
+                stat = entry.stat()
+                fingerprints[entry.path] = (stat.st_size, stat.st_mtime_ns)
+    return fingerprints
+
+
+class ContentWatcher:
+    """
+    Class to detect new and changed content files and to import them once they are
+    completely written.
+    """
+
+    def __init__(self, config: Configuration):
+        self.config = config
+        self.settings = config.env.content
+        self.imported: dict[str, Fingerprint] = {}
+        self.pending: dict[str, tuple[Fingerprint, float]] = {}
+
+    async def import_file(self, file_path: str) -> ImportResult:
+        """
+        Function imports the new and changed entries of a content file.
+
+        Args:
+            file_path (str): Path of the content file
+
+        Returns:
+            ImportResult: Result of the import
+        """
+        kind = content_kind(Path(file_path).name)
+        result = ImportResult(data=None, file_path=file_path)
+        await import_content_file(self.config, result, kind.schema, kind.create, kind.update)
+        if result.success:
+            self.config.logger.info(f"Content file {file_path} imported: {result.summary}")
+        else:
+            self.config.logger.warning(f"Import of the content file {file_path} failed.")
+        for error in result.errors:
+            self.config.logger.warning(f"Content file {file_path}: {error}")
+        return result
+
+    async def poll(self) -> list[ImportResult]:
+        """
+        Function checks the fingerprints of the content files once. A new or changed
+        file is imported, if its fingerprint did not change for the debounce time.
+        Files are only imported again after they changed, also after a failed import.
+
+        Returns:
+            list[ImportResult]: Results of the imported files
+        """
+        now = time.monotonic()
+        fingerprints = await asyncio.to_thread(scan_directory, self.settings.directory)
+        for file_path in set(self.imported) - set(fingerprints):
+            del self.imported[file_path]
+        for file_path in set(self.pending) - set(fingerprints):
+            del self.pending[file_path]
+        results = []
+        for file_path, fingerprint in sorted(fingerprints.items()):
+            if self.imported.get(file_path) == fingerprint:
+                continue
+            first_seen = self.pending.get(file_path)
+            if first_seen is None or first_seen[0] != fingerprint:
+                self.pending[file_path] = (fingerprint, now)
+                continue
+            if now - first_seen[1] < self.settings.debounce:
+                continue
+            del self.pending[file_path]
+            self.imported[file_path] = fingerprint
+            results.append(await self.import_file(file_path))
+        return results
+
+
+async def content_watch_schedule(config: Configuration) -> None:
+    """
+    Scheduling function to poll the content directory in the configured interval. The
+    watcher is disabled by default. A failed poll is logged and retried in the next interval.
+
+    Args:
+        config (Configuration): App configuration
+    """
+    if not config.env.content.watch:
+        return
+    watcher = ContentWatcher(config)
+    config.logger.info(f"Watch the content directory {config.env.content.directory}")
+    while True:
+        try:
+            await watcher.poll()
+        except Exception:  # pylint: disable=broad-exception-caught
+            config.logger.opt(exception=sys.exc_info()).error(
+                "Error while watching the content directory."
+            )
+        await asyncio.sleep(config.env.content.interval)
@@ -4,15 +4,19 @@ general database related functions.
 """
 
 import sys
-from dataclasses import dataclass
+import hashlib
 
 import discord
-from sqlalchemy import select, func, exists, update
+from sqlalchemy import Insert, select, exists, update, delete, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, joinedload, load_only, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from .configuration import Configuration, ProcessInput
+from .configuration import Configuration, ImportResult
 from .db_classes import (
+    Base,
     CHARACTER,
     EVENT,
     GAME,
@@ -24,21 +28,18 @@ from .db_classes import (
     STORY,
     StoryType,
     MESSAGE,
+    PROMPTTEXT,
+)
+from .constants import DB_DEDUP_MIN_LENGTH
+from .db_genre import get_genre_catalog
+from .db_game import collect_counter_changes, apply_counter_changes
+from .unit_of_work import db_session
+from .pagination import (
+    PageContext,
+    PageDirection,
+    keyset_statement,
+    apply_page_result,
 )
-
-
-@dataclass
-class ImportResult:
-    """
-    Result class from importing a file.
-    """
-
-    file_path: str
-    data: dict
-    success: bool = False
-    import_number: int = 0
-    text_genre: str = ""
-    text_character: str = ""
 
 
 async def get_unique_event_from_content(
@@ -57,7 +58,7 @@ async def get_unique_event_from_content(
         EVENT | None: Found genre or None in case of not found
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(EVENT)
                 .where(EVENT.text == text)
@@ -83,7 +84,7 @@ async def check_exist_unique_character(config: Configuration, character: dict) -
         bool: Transferred character already exists.
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = select(exists().where(CHARACTER.name == character["name"]))
             return (await session.execute(statement)).scalar()
     except (AttributeError, SQLAlchemyError, TypeError):
@@ -122,8 +123,9 @@ async def create_character_from_input(config: Configuration, result: ImportResul
             config.logger.debug(
                     f"The following character is created: {temp_character.name}"
                 )
-        async with config.write_lock, config.session() as session, session.begin():
+        async with db_session(config, write=True) as session:
             session.add_all(final_character)
+        config.name_index.track(final_character)
         result.import_number = len(final_character)
         result.success = True
         if missed_character:
@@ -150,7 +152,7 @@ async def get_characters_from_ids(
     Returns:
         list[CHARACTER]: List of characters
     """
-    async with config.session() as session, session.begin():
+    async with db_session(config) as session:
         return (
             (await session.execute(select(CHARACTER).where(CHARACTER.id.in_(ids))))
             .scalars()
@@ -171,17 +173,39 @@ async def get_object_by_id(
         obj_type (UserGameCharacterAssociation): Type of the object to get
         obj_id (int): Id of the object to get
     """
-    async with config.session() as session, session.begin():
+    async with db_session(config) as session:
         return (
             await session.execute(select(obj_type).where(obj_type.id == obj_id))
         ).scalar_one_or_none()
 
 
+def insert_ignore_duplicates(config: Configuration, table: type[Base]) -> Insert:
+    """
+    Function creates an insert statement for the handed over table, which skips rows
+    violating a unique constraint, with the syntax of the database dialect.
+
+    Args:
+        config (Configuration): App configuration
+        table (type[Base]): Table class to insert into
+
+    Returns:
+        Insert: Insert statement ignoring duplicates
+    """
+    dialect = config.engine.dialect.name
+    if dialect == "sqlite":
+        return sqlite_insert(table).on_conflict_do_nothing()
+    if dialect in ("mysql", "mariadb"):
+        return insert(table).prefix_with("IGNORE")
+    return insert(table)
+
+
 async def process_player(
     config: Configuration, user_list: list[discord.member.Member]
 ) -> list[USER]:
     """
     Function to process a user list and add them to the database if they are not already there.
+    All users are looked up with one query and the missing users are inserted with one
+    statement, which skips users added in the meantime.
 
     Args:
         config (Configuration): App configuration
@@ -190,18 +214,64 @@ async def process_player(
     Returns:
         list[User]: processed user list
     """
-    processed_user_list = []
-    async with config.write_lock, config.session() as session, session.begin():
-        for user in user_list:
-            temp_user = (
-                await session.execute(select(USER).filter(USER.dc_id == user.id))
-            ).scalar_one_or_none()
-            if temp_user is None:
-                temp_user = USER(name=user.name, dc_id=user.id)
-                session.add(temp_user)
-                config.logger.debug(f"User {temp_user.name} added to the database.")
-            processed_user_list.append(temp_user)
-    return processed_user_list
+    names = {str(user.id): user.name for user in user_list}
+    async with db_session(config) as session:
+        found = (
+            await session.execute(select(USER).where(USER.dc_id.in_(names)))
+        ).scalars().all()
+    users = {user.dc_id: user for user in found}
+    missing = [dc_id for dc_id in names if dc_id not in users]
+    if missing:
+        async with db_session(config, write=True) as session:
+            await session.execute(
+                insert_ignore_duplicates(config, USER),
+                [{"name": names[dc_id], "dc_id": dc_id} for dc_id in missing],
+            )
+            created = (
+                await session.execute(select(USER).where(USER.dc_id.in_(missing)))
+            ).scalars().all()
+        users.update((user.dc_id, user) for user in created)
+        config.logger.debug(f"Users {[names[dc_id] for dc_id in missing]} added to the database.")
+    config.user_ids.update((dc_id, user.id) for dc_id, user in users.items())
+    return [users[dc_id] for dc_id in names]
+
+
+async def deduplicate_prompts(session: AsyncSession, objs: list) -> None:
+    """
+    Function moves the requests of new stories into the shared prompt texts, so
+    repeated prompts like the INIT prompts of a genre are stored only once.
+
+    Args:
+        session (AsyncSession): Session of the write
+        objs (list): Objects to write, only stories are handled
+    """
+    stories = [
+        obj
+        for obj in objs
+        if isinstance(obj, STORY)
+        and obj.request_text is not None
+        and len(obj.request_text) >= DB_DEDUP_MIN_LENGTH
+    ]
+    if not stories:
+        return
+    hashes = {
+        story: hashlib.sha256(story.request_text.encode("utf-8")).hexdigest()
+        for story in stories
+    }
+    prompts = {
+        prompt.hash: prompt
+        for prompt in (
+            await session.execute(
+                select(PROMPTTEXT).where(PROMPTTEXT.hash.in_(set(hashes.values())))
+            )
+        ).scalars()
+    }
+    for story, text_hash in hashes.items():
+        if text_hash not in prompts:
+            prompts[text_hash] = PROMPTTEXT(hash=text_hash, text=story.request_text)
+        story.request_text = None
+        story.request_hash = text_hash
+        story.prompt = prompts[text_hash]
 
 
 async def update_db_objs(
@@ -209,40 +279,58 @@ async def update_db_objs(
     objs: list[GAME | USER | TALE | GENRE, STORY],
 ) -> None:
     """
-    Function to update a game or player object in the database
+    Function to update a game or player object in the database. The counters of the
+    games are updated in the same transaction for written stories and registrations
+    and long story requests are stored once in the shared prompt texts.
 
     Args:
         config (Configuration): App configuration
         obj (GAME | USER | TALE | GENRE): Object to update in the database
     """
     try:
-        async with config.write_lock, config.session() as session, session.begin():
+        async with db_session(config, write=True) as session:
+            counter_changes = collect_counter_changes(objs)
+            await deduplicate_prompts(session, objs)
             session.add_all(objs)
             await session.flush()
+            if counter_changes:
+                await apply_counter_changes(session, counter_changes)
             for obj in objs:
                 config.logger.trace(
                     f"Updated object in database: {obj.__class__.__name__} with ID: {obj.id}"
                 )
+        config.name_index.track(objs)
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql update.")
         return
 
 
-async def get_available_characters(config: Configuration) -> list[CHARACTER]:
+async def get_available_characters(
+    config: Configuration,
+    page: PageContext | None = None,
+    direction: PageDirection = PageDirection.FIRST,
+) -> list[CHARACTER]:
     """
     Function to get all characters from the database which are not assigned to a user.
+    If a page context is handed over, only the requested page is loaded.
 
     Args:
         config (Configuration): App configuration
+        page (PageContext | None, optional): Pagination context. Defaults to None.
+        direction (PageDirection, optional): Requested page. Defaults to PageDirection.FIRST.
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(CHARACTER)
                 .where(CHARACTER.alive.is_(True))
                 .where(CHARACTER.user_id.is_(None))
             )
+            if page is not None:
+                statement = keyset_statement(statement, CHARACTER, page, direction)
             result = (await session.execute(statement)).scalars().all()
+            if page is not None:
+                result = apply_page_result(result, page, direction)
 
             if result is None or len(result) == 0:
                 config.logger.debug("No available characters found in the database")
@@ -267,7 +355,7 @@ async def get_all_owned_characters(
         user (USER): User object
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(CHARACTER)
                 .join(CHARACTER.game_assignments)
@@ -279,7 +367,7 @@ async def get_all_owned_characters(
                     CHARACTER.alive.is_(True),
                     CHARACTER.end_date.is_(None),
                 )
-                .distinct(USER.id)
+                .distinct()
             )
             result = (await session.execute(statement)).scalars().all()
 
@@ -295,66 +383,90 @@ async def get_all_owned_characters(
 
 
 async def get_all_open_user_games(
-    config: Configuration, process_data: ProcessInput
-) -> None:
+    config: Configuration,
+    user_dc_id: str,
+    page: PageContext | None = None,
+    direction: PageDirection = PageDirection.FIRST,
+) -> list[GAME]:
     """
-    Function get all games loaded with user participations from the database from a user.
+    Function get all games from the database in which the user has not yet selected a
+    character. If a page context is handed over, only the requested page is loaded.
 
     Args:
         config (Configuration): App configuration
-        process_data (ProcessInput): Process input data structure
+        user_dc_id (str): Discord ID of the user
+        page (PageContext | None, optional): Pagination context. Defaults to None.
+        direction (PageDirection, optional): Requested page. Defaults to PageDirection.FIRST.
+
+    Returns:
+        list[GAME]: Open games of the user
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(GAME)
                 .join(GAME.user_participations)
                 .join(UserGameCharacterAssociation.user)
-                .where(USER.dc_id == process_data.user_context.user_dc_id)
+                .where(USER.dc_id == user_dc_id)
                 .where(UserGameCharacterAssociation.character_id.is_(None))
                 .where(UserGameCharacterAssociation.end_date.is_(None))
             )
-            process_data.game_context.available_games = (
-                (await session.execute(statement)).scalars().all()
-            )
+            if page is not None:
+                statement = keyset_statement(statement, GAME, page, direction)
+            result = (await session.execute(statement)).scalars().all()
+        if page is not None:
+            result = apply_page_result(result, page, direction)
+        return list(result)
 
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
-        return
+        return []
 
 
 async def get_all_running_games(
-    config: Configuration, process_data: ProcessInput
-) -> None:
+    config: Configuration,
+    page: PageContext | None = None,
+    direction: PageDirection = PageDirection.FIRST,
+) -> list[GAME]:
     """
     Function to get all available games from the database which are not finished.
+    If a page context is handed over, only the requested page is loaded.
 
     Args:
         config (Configuration): App configuration
-        process_data (ProcessInput): Game data object
+        page (PageContext | None, optional): Pagination context. Defaults to None.
+        direction (PageDirection, optional): Requested page. Defaults to PageDirection.FIRST.
+
+    Returns:
+        list[GAME]: Running games
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(GAME)
                 .where(GAME.end_date.is_(None))
                 .where(GAME.status == GameStatus.RUNNING)
             )
+            if page is not None:
+                statement = keyset_statement(statement, GAME, page, direction)
             result = (await session.execute(statement)).scalars().all()
+            if page is not None:
+                result = apply_page_result(result, page, direction)
 
             if result is None or len(result) == 0:
                 config.logger.debug("No available games found in the database")
-                return
-            process_data.game_context.available_games = result
+                return []
+            return list(result)
 
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
-        return
+        return []
 
 
 async def get_tale_from_game_id(config: Configuration, game_id: int) -> TALE | None:
     """
-    Function to get the tale based on handed over game id.
+    Function to get the tale based on handed over game id. The genre with all events
+    and inspirational words is taken from the genre cache.
 
     Args:
         config (Configuration): App configuration
@@ -364,54 +476,95 @@ async def get_tale_from_game_id(config: Configuration, game_id: int) -> TALE | N
         TALE | None: One Tale or None
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(TALE)
                 .join(TALE.game)
                 .options(
-                    joinedload(TALE.genre).options(
-                        selectinload(GENRE.events),
-                        selectinload(GENRE.inspirational_words),
-                    ),
                     joinedload(TALE.game).options(
                         selectinload(GAME.user_participations)
                     ),
                 )
                 .where(GAME.id == game_id)
             )
-            return (await session.execute(statement)).scalar_one_or_none()
+            tale = (await session.execute(statement)).scalar_one_or_none()
+        if tale is not None:
+            catalog = await get_genre_catalog(config)
+            set_committed_value(tale, "genre", catalog.get(tale.genre_id))
+        return tale
 
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
         return
 
 
+async def get_tale_for_turn(config: Configuration, game_id: int) -> TALE | None:
+    """
+    Function to get the tale for a keep telling turn based on handed over game id.
+    Only the tale id and genre id are loaded from the database, the genre with all
+    events and inspirational words is taken from the genre cache.
+
+    Args:
+        config (Configuration): App configuration
+        game_id (int): Game id
+
+    Returns:
+        TALE | None: Tale with genre or None
+    """
+    try:
+        async with db_session(config) as session:
+            statement = (
+                select(TALE)
+                .join(GAME, GAME.tale_id == TALE.id)
+                .options(load_only(TALE.id, TALE.genre_id), raiseload("*"))
+                .where(GAME.id == game_id)
+            )
+            tale = (await session.execute(statement)).scalar_one_or_none()
+        if tale is not None:
+            catalog = await get_genre_catalog(config)
+            set_committed_value(tale, "genre", catalog.get(tale.genre_id))
+        return tale
+
+    except (AttributeError, SQLAlchemyError, TypeError):
+        config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
+        return None
+
+
 async def get_games_w_status(
-    config: Configuration, status: list[GameStatus]
+    config: Configuration,
+    status: list[GameStatus],
+    page: PageContext | None = None,
+    direction: PageDirection = PageDirection.FIRST,
 ) -> list[GAME]:
     """
     This function get all changeable games back. Games that have the status
-    CREATED, RUNNING or PAUSED can be changed.
+    CREATED, RUNNING or PAUSED can be changed. If a page context is handed over,
+    only the requested page is loaded.
 
     Args:
         config (Configuration): App configuration
+        status (list[GameStatus]): Status of the games
+        page (PageContext | None, optional): Pagination context. Defaults to None.
+        direction (PageDirection, optional): Requested page. Defaults to PageDirection.FIRST.
 
     Returns:
         list[Game]: The list if changeable games
     """
     config.logger.trace(f"Called with status: {status}")
-    async with config.session() as session, session.begin():
-        games = (
-            (await session.execute(select(GAME).where(GAME.status.in_(status))))
-            .scalars()
-            .all()
-        )
+    async with db_session(config) as session:
+        statement = select(GAME).where(GAME.status.in_(status))
+        if page is not None:
+            statement = keyset_statement(statement, GAME, page, direction)
+        games = (await session.execute(statement)).scalars().all()
+    if page is not None:
+        games = apply_page_result(games, page, direction)
     return games
 
 
 async def get_user_from_dc_id(config: Configuration, dc_id: str) -> USER | None:
     """
-    Get the user object based on handed over discord id.
+    Get the user object based on handed over discord id. The user id of a known discord
+    id is cached, so the user is loaded by primary key.
 
     Args:
         config (Configuration): App configuration
@@ -421,9 +574,15 @@ async def get_user_from_dc_id(config: Configuration, dc_id: str) -> USER | None:
         USER | None: One User or None
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
+            user_id = config.user_ids.get(dc_id)
+            if user_id is not None:
+                return await session.get(USER, user_id)
             statement = select(USER).where(USER.dc_id == dc_id)
-            return (await session.execute(statement)).scalar_one_or_none()
+            user = (await session.execute(statement)).scalar_one_or_none()
+            if user is not None:
+                config.user_ids[dc_id] = user.id
+            return user
 
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
@@ -445,7 +604,7 @@ async def get_mapped_ugc_association(
         UserGameCharacterAssociation | None: Linked association object
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(UserGameCharacterAssociation)
                 .where(UserGameCharacterAssociation.game_id == game_id)
@@ -458,38 +617,6 @@ async def get_mapped_ugc_association(
         return
 
 
-async def count_regist_char_from_game(config: Configuration, game_id: int) -> int:
-    """
-    Function get the number of registered character in a handed over game based on id.
-
-    Args:
-        config (Configuration): App configuration
-        game_id (int): Game id
-
-    Returns:
-        int: Count of registered characters
-    """
-    try:
-        async with config.session() as session, session.begin():
-            statement = (
-                select(
-                    func.count(  # pylint: disable=not-callable
-                        UserGameCharacterAssociation.id
-                    )
-                )
-                .where(UserGameCharacterAssociation.game_id == game_id)
-                .where(UserGameCharacterAssociation.character_id.isnot(None))
-                .where(UserGameCharacterAssociation.end_date.is_(None))
-            )
-            temp_return = (await session.execute(statement)).scalar_one_or_none()
-            config.logger.trace(f"Counted registered character: {temp_return}")
-            return temp_return
-
-    except (AttributeError, SQLAlchemyError, TypeError):
-        config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
-        return 0
-
-
 async def get_active_user_from_game(
     config: Configuration, game_id: int
 ) -> list[USER] | None:
@@ -505,7 +632,7 @@ async def get_active_user_from_game(
         list[USER] | None: All active user in game or None
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(USER)
                 .join(
@@ -514,7 +641,7 @@ async def get_active_user_from_game(
                 )
                 .where(UserGameCharacterAssociation.game_id == game_id)
                 .where(UserGameCharacterAssociation.character_id.isnot(None))
-                .distinct(USER.id)
+                .distinct()
             )
             return (await session.execute(statement)).scalars().all()
     except (AttributeError, SQLAlchemyError, TypeError):
@@ -536,7 +663,7 @@ async def get_character_from_game_id(
         list[CHARACTER] | None: List of characters or None
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(CHARACTER)
                 .join(
@@ -565,7 +692,7 @@ async def get_stories_messages_for_ai(
         list[dict]: List of messages formatted for AI
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(STORY)
                 .where(STORY.tale_id == tale_id)
@@ -604,7 +731,7 @@ async def channel_id_exist(config: Configuration, channel_id: str) -> bool:
         bool: Any game started with same channel ID
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = select(exists().where(GAME.channel_id == channel_id))
             return (await session.execute(statement)).scalar()
 
@@ -624,7 +751,7 @@ async def check_only_init_stories(config: Configuration, tale_id: int) -> bool:
     Returns:
         bool: Identify whether there are only stories that have the type INIT.
     """
-    async with config.session() as session, session.begin():
+    async with db_session(config) as session:
         statement = (
             select(STORY)
             .where(STORY.tale_id == tale_id)
@@ -642,7 +769,9 @@ async def delete_init_stories(
 ) -> list[int]:
     """
     This function deletes all INIT stories from a tale and returns the Discord
-    message IDs associated with those stories.
+    message IDs associated with those stories. The messages are deleted and the
+    stories discarded with set based statements. If the database supports
+    DELETE ... RETURNING, the message IDs are returned by the delete itself.
 
     Args:
         config (Configuration): App configuration
@@ -652,67 +781,95 @@ async def delete_init_stories(
     Returns:
         list[int]: List of Discord message IDs that were associated with the deleted stories
     """
-    async with config.session() as session, session.begin():
-        statement_stories = (
-            select(STORY)
+    async with db_session(config, write=True) as session:
+        story_ids = (
+            select(STORY.id)
             .where(STORY.tale_id == tale_id)
             .where(STORY.discarded.is_(False))
         )
-        stories = (await session.execute(statement_stories)).scalars().all()
-        story_ids = [story.id for story in stories]
-        config.logger.debug(f"Select stories with IDs: {story_ids} for discarding.")
-        statement_messages = select(MESSAGE).where(MESSAGE.story_id.in_(story_ids))
-        messages = (await session.execute(statement_messages)).scalars().all()
-        config.logger.debug(
-            f"Select messages with IDs: {[message.id for message in messages]} for deleting."
+        statement_messages = (
+            delete(MESSAGE)
+            .where(MESSAGE.story_id.in_(story_ids))
+            .execution_options(synchronize_session=False)
         )
+        if session.get_bind().dialect.delete_returning:
+            dc_message_ids = (
+                await session.execute(statement_messages.returning(MESSAGE.message_id))
+            ).scalars().all()
+        else:
+            dc_message_ids = (
+                await session.execute(
+                    select(MESSAGE.message_id).where(MESSAGE.story_id.in_(story_ids))
+                )
+            ).scalars().all()
+            await session.execute(statement_messages)
         dc_message_ids = [
-            message.message_id for message in messages if message.message_id is not None
+            message_id for message_id in dc_message_ids if message_id is not None
         ]
-        config.logger.debug(f"DC messages IDs to delete: {dc_message_ids}")
-        for message in messages:
-            await session.delete(message)
-        config.logger.debug(f"Deleted {len(messages)} messages.")
+        config.logger.debug(f"Deleted messages with DC messages IDs: {dc_message_ids}")
 
-        statement_messages = (
-            update(STORY).where(STORY.id.in_(story_ids)).values(discarded=True)
+        statement_stories = (
+            update(STORY)
+            .where(STORY.tale_id == tale_id)
+            .where(STORY.discarded.is_(False))
+            .values(discarded=True)
+            .execution_options(synchronize_session=False)
         )
-        await session.execute(statement_messages)
-        config.logger.debug(f"Discard {len(messages)} stories.")
-        statement_game = select(GAME).where(GAME.id == game_id)
-        game = (await session.execute(statement_game)).scalar_one_or_none()
-        game.status = GameStatus.CREATED
-        return dc_message_ids
+        discarded = (await session.execute(statement_stories)).rowcount
+        config.logger.debug(f"Discard {discarded} stories.")
+        statement_game = (
+            update(GAME)
+            .where(GAME.id == game_id)
+            .values(status=GameStatus.CREATED, stories_told=0)
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(statement_game)
+    entry = config.name_index.games.get(game_id)
+    if entry is not None:
+        config.name_index.games.upsert(game_id, entry[0], GameStatus.CREATED)
+    return dc_message_ids
 
 
 async def get_all_running_user_games(
-    config: Configuration, process_data: ProcessInput
-) -> None:
+    config: Configuration,
+    user_dc_id: str,
+    page: PageContext | None = None,
+    direction: PageDirection = PageDirection.FIRST,
+) -> list[GAME]:
     """
-    Function get all running games loaded with user participations from the database from a user.
+    Function get all running games from the database in which the user plays a
+    character. If a page context is handed over, only the requested page is loaded.
 
     Args:
         config (Configuration): App configuration
-        process_data (ProcessInput): Process input data structure
+        user_dc_id (str): Discord ID of the user
+        page (PageContext | None, optional): Pagination context. Defaults to None.
+        direction (PageDirection, optional): Requested page. Defaults to PageDirection.FIRST.
+
+    Returns:
+        list[GAME]: Running games of the user
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(GAME)
                 .join(GAME.user_participations)
                 .join(UserGameCharacterAssociation.user)
                 .where(GAME.end_date.is_(None))
                 .where(GAME.status == GameStatus.RUNNING)
-                .where(USER.dc_id == process_data.user_context.user_dc_id)
+                .where(USER.dc_id == user_dc_id)
                 .where(UserGameCharacterAssociation.character_id.isnot(None))
             )
-            process_data.game_context.available_games = (
-                (await session.execute(statement)).scalars().all()
-            )
+            if page is not None:
+                statement = keyset_statement(statement, GAME, page, direction)
+            result = (await session.execute(statement)).scalars().all()
+        if page is not None:
+            result = apply_page_result(result, page, direction)
+        return list(result)
 
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
-        return
+        return []
 
 
 async def get_game_id_from_character_id(config: Configuration, character_id: int) -> int | None:
@@ -728,7 +885,7 @@ async def get_game_id_from_character_id(config: Configuration, character_id: int
         int | None: Game ID or None
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(UserGameCharacterAssociation.game_id)
                 .where(UserGameCharacterAssociation.character_id == character_id)
@@ -738,3 +895,40 @@ async def get_game_id_from_character_id(config: Configuration, character_id: int
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
         return None
+
+
+async def load_autocomplete_index(config: Configuration) -> None:
+    """
+    Function loads id, name and filter columns of all games, characters and genres
+    into the autocomplete index. Afterwards the index is kept up to date by the
+    write functions.
+
+    Args:
+        config (Configuration): App configuration
+    """
+    try:
+        async with db_session(config) as session:
+            games = await session.execute(
+                select(GAME).options(load_only(GAME.id, GAME.name, GAME.status))
+            )
+            config.name_index.track(games.scalars())
+            characters = await session.execute(
+                select(CHARACTER).options(
+                    load_only(
+                        CHARACTER.id, CHARACTER.name, CHARACTER.alive, CHARACTER.user_id
+                    )
+                )
+            )
+            config.name_index.track(characters.scalars())
+            genres = await session.execute(
+                select(GENRE).options(load_only(GENRE.id, GENRE.name, GENRE.active))
+            )
+            config.name_index.track(genres.scalars())
+        config.name_index.loaded = True
+        config.logger.debug(
+            f"Autocomplete index loaded with {len(config.name_index.games)} games, "
+            + f"{len(config.name_index.characters)} characters and "
+            + f"{len(config.name_index.genres)} genres."
+        )
+    except (AttributeError, SQLAlchemyError, TypeError):
+        config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
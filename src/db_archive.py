@@ -0,0 +1,208 @@
+"""
+This module contains the cold archive for the stories of finished games. Finished tales
+are no longer told, so their stories and messages are moved as one compressed JSON
+document into the archive table. The indexes and scans of the running games then only
+cover the stories of active tales, while exports read archived tales transparently.
+"""
+
+import sys
+import json
+import zlib
+import asyncio
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete, func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
+
+from .configuration import Configuration
+from .unit_of_work import db_session
+from .db_classes import GAME, STORY, MESSAGE, TALEARCHIVE, GameStatus, StoryType
+
+
+def pack_stories(stories: list[STORY]) -> bytes:
+    """
+    Function serializes the stories of a tale with their Discord message ids into
+    compressed JSON.
+
+    Args:
+        stories (list[STORY]): Stories of the tale with loaded messages
+
+    Returns:
+        bytes: Compressed story sequence
+    """
+    document = [
+        {
+            "id": story.id,
+            "request": story.request,
+            "response": story.response,
+            "summary": story.summary,
+            "story_type": story.story_type.name,
+            "timestamp": story.timestamp.isoformat(),
+            "discarded": story.discarded,
+            "message_ids": [message.message_id for message in story.messages],
+        }
+        for story in stories
+    ]
+    return zlib.compress(json.dumps(document, ensure_ascii=False).encode("utf-8"), 9)
+
+
+def unpack_stories(data: bytes, tale_id: int) -> list[STORY]:
+    """
+    Function restores the stories of an archived tale as transient objects, which are
+    not added to a session.
+
+    Args:
+        data (bytes): Compressed story sequence
+        tale_id (int): Id of the archived tale
+
+    Returns:
+        list[STORY]: Stories of the tale with their messages
+    """
+    return [
+        STORY(
+            id=item["id"],
+            request=item["request"],
+            response=item["response"],
+            summary=item["summary"],
+            story_type=StoryType[item["story_type"]],
+            timestamp=datetime.fromisoformat(item["timestamp"]),
+            discarded=item["discarded"],
+            tale_id=tale_id,
+            messages=[MESSAGE(message_id=message_id) for message_id in item["message_ids"]],
+        )
+        for item in json.loads(zlib.decompress(data).decode("utf-8"))
+    ]
+
+
+async def archive_tale(config: Configuration, tale_id: int) -> int:
+    """
+    Function moves all stories and messages of a tale into the archive in one
+    transaction. An already archived tale is not changed.
+
+    Args:
+        config (Configuration): App configuration
+        tale_id (int): Id of the tale to archive
+
+    Returns:
+        int: Number of archived stories
+    """
+    async with db_session(config, write=True) as session:
+        if await session.scalar(
+            select(TALEARCHIVE.id).where(TALEARCHIVE.tale_id == tale_id)
+        ):
+            return 0
+        stories = (
+            await session.execute(
+                select(STORY)
+                .where(STORY.tale_id == tale_id)
+                .options(selectinload(STORY.messages))
+                .order_by(STORY.id)
+            )
+        ).scalars().all()
+        session.add(
+            TALEARCHIVE(
+                tale_id=tale_id,
+                story_count=len(stories),
+                data=pack_stories(stories),
+            )
+        )
+        story_ids = [story.id for story in stories]
+        await session.execute(
+            delete(MESSAGE)
+            .where(MESSAGE.story_id.in_(story_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(
+            delete(STORY)
+            .where(STORY.tale_id == tale_id)
+            .execution_options(synchronize_session=False)
+        )
+    config.logger.debug(f"Archived {len(stories)} stories of tale {tale_id}.")
+    return len(stories)
+
+
+async def get_tale_stories(config: Configuration, tale_id: int) -> list[STORY]:
+    """
+    Function returns the not discarded stories of a tale in the told order with their
+    messages, from the story table or from the archive for archived tales.
+
+    Args:
+        config (Configuration): App configuration
+        tale_id (int): Id of the tale
+
+    Returns:
+        list[STORY]: Stories of the tale
+    """
+    async with db_session(config) as session:
+        data = await session.scalar(
+            select(TALEARCHIVE.data).where(TALEARCHIVE.tale_id == tale_id)
+        )
+        if data is not None:
+            return [story for story in unpack_stories(data, tale_id) if not story.discarded]
+        return list(
+            (
+                await session.execute(
+                    select(STORY)
+                    .where(STORY.tale_id == tale_id)
+                    .where(STORY.discarded.is_(False))
+                    .options(selectinload(STORY.messages))
+                    .order_by(STORY.id)
+                )
+            ).scalars().all()
+        )
+
+
+async def archive_finished_games(config: Configuration, older_than: timedelta) -> int:
+    """
+    Function archives the tales of all games, which are finished for longer than the
+    handed over time span. Games without end date are aged by their last activity.
+
+    Args:
+        config (Configuration): App configuration
+        older_than (timedelta): Minimum time since the game was finished
+
+    Returns:
+        int: Number of archived tales
+    """
+    cutoff = datetime.now(timezone.utc) - older_than
+    try:
+        async with db_session(config) as session:
+            tale_ids = (
+                await session.execute(
+                    select(GAME.tale_id)
+                    .where(GAME.status == GameStatus.FINISHED)
+                    .where(func.coalesce(GAME.end_date, GAME.last_activity) < cutoff)
+                    .where(GAME.tale_id.not_in(select(TALEARCHIVE.tale_id)))
+                )
+            ).scalars().all()
+        for tale_id in tale_ids:
+            await archive_tale(config, tale_id)
+        if tale_ids:
+            config.logger.info(f"Archived the stories of {len(tale_ids)} finished games.")
+        return len(tale_ids)
+    except (AttributeError, SQLAlchemyError, TypeError):
+        config.logger.opt(exception=sys.exc_info()).error("Error while archiving games.")
+        return 0
+
+
+async def archive_schedule(config: Configuration) -> None:
+    """
+    Scheduling function to archive the finished games regularly in the configured
+    interval. The archive is disabled if archive_after_days is 0. A failed run is logged
+    and retried in the next interval, so it does not stop the bot.
+
+    Args:
+        config (Configuration): App configuration
+    """
+    if config.env.db.archive_after_days <= 0:
+        return
+    while True:
+        try:
+            await archive_finished_games(
+                config, timedelta(days=config.env.db.archive_after_days)
+            )
+        except Exception:  # pylint: disable=broad-exception-caught
+            config.logger.opt(exception=sys.exc_info()).error(
+                "Unexpected error while archiving games."
+            )
+        await asyncio.sleep(config.env.db.archive_interval)
@@ -0,0 +1,177 @@
+"""
+This module contains the database functions of the incremental content import: the
+stored content hashes of the imported files and the update of changed genres and
+characters.
+"""
+
+import sys
+
+from sqlalchemy import select, delete, insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import selectinload
+
+from .configuration import Configuration
+from .unit_of_work import db_session
+from .db_classes import CHARACTER, CONTENTHASH, EVENT, GENRE, INSPIRATIONALWORD
+
+FILE_ENTRY = ""
+"""Entry name of the hash of the whole file."""
+
+CHARACTER_FIELDS = ("age", "background", "description", "pos_trait", "neg_trait", "summary")
+"""Fields of a character which are updated by a changed entry."""
+
+
+async def get_content_hashes(config: Configuration, source: str) -> dict[str, str]:
+    """
+    Function returns the stored hashes of an imported file and its entries.
+
+    Args:
+        config (Configuration): App configuration
+        source (str): Path of the imported file
+
+    Returns:
+        dict[str, str]: Hash per entry name, the hash of the file has the name FILE_ENTRY
+    """
+    try:
+        async with db_session(config) as session:
+            statement = select(CONTENTHASH.entry, CONTENTHASH.digest).where(
+                CONTENTHASH.source == source
+            )
+            return dict((await session.execute(statement)).all())
+    except (AttributeError, SQLAlchemyError, TypeError):
+        config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
+        return {}
+
+
+async def store_content_hashes(
+    config: Configuration, source: str, hashes: dict[str, str]
+) -> bool:
+    """
+    Function replaces the stored hashes of an imported file and its entries.
+
+    Args:
+        config (Configuration): App configuration
+        source (str): Path of the imported file
+        hashes (dict[str, str]): Hash per entry name including the hash of the file
+
+    Returns:
+        bool: Hashes are stored
+    """
+    try:
+        async with db_session(config, write=True) as session:
+            await session.execute(delete(CONTENTHASH).where(CONTENTHASH.source == source))
+            await session.execute(
+                insert(CONTENTHASH),
+                [
+                    {"source": source, "entry": entry, "digest": digest}
+                    for entry, digest in hashes.items()
+                ],
+            )
+        return True
+    except (AttributeError, SQLAlchemyError, TypeError):
+        config.logger.opt(exception=sys.exc_info()).error("Error in sql insert.")
+        return False
+
+
+async def update_genres_from_input(
+    config: Configuration, genres: list[dict]
+) -> list[str] | None:
+    """
+    Function updates the newest genre with the name of each changed entry. Genres are
+    versioned, so an entry with other settings is returned to be created as new genre
+    and the running games keep their version. For an entry with the same settings the
+    missing events and inspirational words are added, existing ones are kept because
+    told stories can refer to them.
+
+    Args:
+        config (Configuration): App configuration
+        genres (list[dict]): Changed genre entries
+
+    Returns:
+        list[str] | None: Names of the entries without genre with these settings in the
+            database or None in case of an error
+    """
+    missing = []
+    try:
+        async with db_session(config, write=True) as session:
+            for genre in genres:
+                statement = (
+                    select(GENRE)
+                    .where(GENRE.name == genre["name"])
+                    .order_by(GENRE.id.desc())
+                    .limit(1)
+                    .options(
+                        selectinload(GENRE.events), selectinload(GENRE.inspirational_words)
+                    )
+                )
+                db_genre = (await session.execute(statement)).scalar_one_or_none()
+                if db_genre is None or (
+                    db_genre.storytelling_style,
+                    db_genre.atmosphere,
+                    db_genre.language,
+                ) != (genre["storytelling-type"], genre["atmosphere"], genre["language"]):
+                    missing.append(genre["name"])
+                    continue
+                known_words = {(word.text, word.chance) for word in db_genre.inspirational_words}
+                for insp_word in genre.get("inspirational-words", []):
+                    db_genre.inspirational_words.extend(
+                        INSPIRATIONALWORD(text=word, chance=insp_word["chance"])
+                        for word in insp_word["words"]
+                        if (word, insp_word["chance"]) not in known_words
+                    )
+                known_events = {(event.text, event.chance) for event in db_genre.events}
+                for events in genre.get("events", []):
+                    db_genre.events.extend(
+                        EVENT(text=event, chance=events["chance"])
+                        for event in events["event"]
+                        if (event, events["chance"]) not in known_events
+                    )
+        config.genre_cache.invalidate()
+    except (KeyError, IntegrityError, SQLAlchemyError):
+        config.logger.opt(exception=sys.exc_info()).error("Error while update genres.")
+        return None
+    return missing
+
+
+async def update_characters_from_input(
+    config: Configuration, characters: list[dict]
+) -> list[str] | None:
+    """
+    Function updates the character with the name of each changed entry. A character,
+    which is already claimed by a player, keeps its values for the running tale and
+    the entry is stored as new character.
+
+    Args:
+        config (Configuration): App configuration
+        characters (list[dict]): Changed character entries
+
+    Returns:
+        list[str] | None: Names of the entries without character in the database or
+            None in case of an error
+    """
+    missing = []
+    new_characters = []
+    try:
+        async with db_session(config, write=True) as session:
+            for character in characters:
+                statement = (
+                    select(CHARACTER)
+                    .where(CHARACTER.name == character["name"])
+                    .order_by(CHARACTER.id.desc())
+                    .limit(1)
+                )
+                db_character = (await session.execute(statement)).scalar_one_or_none()
+                if db_character is None:
+                    missing.append(character["name"])
+                    continue
+                if db_character.user_id is not None:
+                    db_character = CHARACTER(name=character["name"])
+                    new_characters.append(db_character)
+                for field in CHARACTER_FIELDS:
+                    setattr(db_character, field, character[field])
+            session.add_all(new_characters)
+        config.name_index.track(new_characters)
+    except (KeyError, IntegrityError, SQLAlchemyError):
+        config.logger.opt(exception=sys.exc_info()).error("Error while update characters.")
+        return None
+    return missing
@@ -3,18 +3,23 @@ This file contains the functions to interact with the database for game related
 """
 
 import sys
-from typing import List
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, List
 
-from sqlalchemy import select, func
+from sqlalchemy import Update, inspect, select, update, func
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .configuration import Configuration
+from .unit_of_work import db_session
 from .db_classes import (
     CHARACTER,
     GAME,
     USER,
     UserGameCharacterAssociation,
     STORY,
+    TALEARCHIVE,
 )
 
 class GameInfo:
@@ -34,13 +39,14 @@ async def get_all_game_related_infos(
 ) -> None:
     """
     Function get all games loaded with user participations from the database from a user.
+    The number of told stories is taken from the counter of the game.
 
     Args:
         config (Configuration): App configuration
         game_info (GameInfo): Game info data structure
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement_user = (
                 select(USER, CHARACTER)
                 .join(
@@ -61,20 +67,176 @@ async def get_all_game_related_infos(
             ).all()
             game_info.user_char_list = [tuple(row) for row in result_user]
 
-            statement = (
-                select(
-                    func.count(  # pylint: disable=not-callable
-                        STORY.id
-                    )
-                )
-                .where(STORY.tale_id == game_info.game.tale_id)
-                .where(STORY.response.isnot(None))
-                .where(STORY.discarded.is_(False))
-            )
-            temp_return = (await session.execute(statement)).scalar_one_or_none()
-            config.logger.trace(f"Number of stories told: {temp_return}")
-            game_info.num_stories = temp_return if temp_return is not None else 0
+            game_info.num_stories = game_info.game.stories_told or 0
 
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
         return
+
+
+class GameCounterChanges:
+    """
+    This class collects the changes of the game counters caused by written stories
+    and character registrations. Stories are counted per tale, registrations per game.
+    """
+
+    def __init__(self):
+        self.stories: defaultdict[int, int] = defaultdict(int)
+        self.registrations: defaultdict[int, int] = defaultdict(int)
+
+    def __bool__(self) -> bool:
+        return any(self.stories.values()) or any(self.registrations.values())
+
+
+def stored_value(obj: Any, key: str) -> Any:
+    """
+    Function returns the value of an attribute as it is stored in the database, before
+    the changes of the current unit of work.
+
+    Args:
+        obj (Any): Database object
+        key (str): Attribute name
+
+    Returns:
+        Any: Stored value of the attribute
+    """
+    history = inspect(obj).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return None
+
+
+def count_change(obj: Any, keys: tuple[str, ...], counted: Callable[..., bool]) -> int:
+    """
+    Function determines whether the handed over object is added to or removed from a
+    counter by the pending changes.
+
+    Args:
+        obj (Any): Database object
+        keys (tuple[str, ...]): Attributes which decide whether the object is counted
+        counted (Callable[..., bool]): Condition with the attribute values as arguments
+
+    Returns:
+        int: 1 if the object is counted now, -1 if it is not counted anymore, else 0
+    """
+    now_counted = counted(*(getattr(obj, key) for key in keys))
+    if inspect(obj).key is None:
+        return int(now_counted)
+    return int(now_counted) - int(counted(*(stored_value(obj, key) for key in keys)))
+
+
+def collect_counter_changes(objs: Iterable[Any]) -> GameCounterChanges:
+    """
+    Function collects the counter changes of the handed over objects before they are
+    flushed. A story is counted if it has a response and is not discarded, a
+    registration if a character is selected and the participation is not ended.
+
+    Args:
+        objs (Iterable[Any]): Database objects to write
+
+    Returns:
+        GameCounterChanges: Counter changes per tale and game
+    """
+    changes = GameCounterChanges()
+    for obj in objs:
+        if isinstance(obj, STORY) and obj.tale_id is not None:
+            changes.stories[obj.tale_id] += count_change(
+                obj,
+                ("response", "discarded"),
+                lambda response, discarded: response is not None and not discarded,
+            )
+        elif isinstance(obj, UserGameCharacterAssociation) and obj.game_id is not None:
+            changes.registrations[obj.game_id] += count_change(
+                obj,
+                ("character_id", "end_date"),
+                lambda character_id, end_date: character_id is not None
+                and end_date is None,
+            )
+    return changes
+
+
+async def apply_counter_changes(
+    session: AsyncSession, changes: GameCounterChanges
+) -> None:
+    """
+    Function increments the game counters in the transaction of the written objects.
+    The increment is done in SQL, so concurrent changes are not lost.
+
+    Args:
+        session (AsyncSession): Session of the write
+        changes (GameCounterChanges): Counter changes per tale and game
+    """
+    now = datetime.now(timezone.utc)
+    for tale_id, delta in changes.stories.items():
+        if not delta:
+            continue
+        values = {"stories_told": GAME.stories_told + delta}
+        if delta > 0:
+            values["last_activity"] = now
+        await session.execute(update(GAME).where(GAME.tale_id == tale_id).values(values))
+    for game_id, delta in changes.registrations.items():
+        if not delta:
+            continue
+        await session.execute(
+            update(GAME)
+            .where(GAME.id == game_id)
+            .values(registered_characters=GAME.registered_characters + delta)
+        )
+
+
+def recount_statement() -> Update:
+    """
+    Function creates the statement to recompute the counters of all games from the
+    stories and character registrations. Games with archived stories keep their counters.
+
+    Returns:
+        Update: Update statement for all games
+    """
+    return (
+        update(GAME)
+        .where(GAME.tale_id.not_in(select(TALEARCHIVE.tale_id)))
+        .values(
+            stories_told=select(func.count(STORY.id))  # pylint: disable=not-callable
+            .where(STORY.tale_id == GAME.tale_id)
+            .where(STORY.response.isnot(None))
+            .where(STORY.discarded.is_(False))
+            .scalar_subquery(),
+            registered_characters=select(
+                func.count(UserGameCharacterAssociation.id)  # pylint: disable=not-callable
+            )
+            .where(UserGameCharacterAssociation.game_id == GAME.id)
+            .where(UserGameCharacterAssociation.character_id.isnot(None))
+            .where(UserGameCharacterAssociation.end_date.is_(None))
+            .scalar_subquery(),
+            last_activity=select(func.max(STORY.timestamp))
+            .where(STORY.tale_id == GAME.tale_id)
+            .where(STORY.response.isnot(None))
+            .where(STORY.discarded.is_(False))
+            .scalar_subquery(),
+        )
+    )
+
+
+async def recount_game_counters(config: Configuration) -> int:
+    """
+    Function recomputes the counters of all games, to repair them after manual changes
+    in the database.
+
+    Args:
+        config (Configuration): App configuration
+
+    Returns:
+        int: Number of repaired games
+    """
+    try:
+        async with db_session(config, write=True) as session:
+            result = await session.execute(
+                recount_statement(), execution_options={"synchronize_session": False}
+            )
+            config.logger.info(f"Recounted the counters of {result.rowcount} games.")
+            return result.rowcount
+    except (AttributeError, SQLAlchemyError, TypeError):
+        config.logger.opt(exception=sys.exc_info()).error("Error in sql update.")
+        return 0
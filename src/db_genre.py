@@ -8,13 +8,14 @@ from sqlalchemy import select, exists
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import selectinload
 
-from .configuration import Configuration
+from .configuration import Configuration, ImportResult
+from .unit_of_work import db_session
+from .pagination import PageContext, PageDirection, paginate_items
 from .db_classes import (
     EVENT,
     GENRE,
     INSPIRATIONALWORD,
 )
-from .db import ImportResult
 
 async def get_unique_genre_from_content(
     config: Configuration, genre: dict
@@ -30,7 +31,7 @@ async def get_unique_genre_from_content(
         GENRE | None: Found genre or None in case of not found
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = (
                 select(GENRE)
                 .where(GENRE.name == genre["name"])
@@ -50,7 +51,7 @@ async def get_genre_double_cond(
     config: Configuration, genre_id: int, genre_name: str = None
 ) -> GENRE | None:
     """
-    This function retrieves the last GENRE object from the database based on the
+    This function retrieves the last GENRE object from the genre catalog based on the
     provided genre name. The reason for returning the last entry is to manage
     adaptions to genre over time, ensuring that without deleting old versions in
     case of traceability to old games.
@@ -64,31 +65,19 @@ async def get_genre_double_cond(
     """
     try:
         config.logger.trace(f"Entering function with argument: {genre_id, genre_name}")
-        async with config.session() as session, session.begin():
-            if genre_name:
-                filter_stmt = GENRE.name == genre_name
-            else:
-                filter_stmt = GENRE.id == genre_id
-            genres = (
-                (
-                    await session.execute(
-                        select(GENRE)
-                        .where(filter_stmt)
-                        .options(selectinload(GENRE.inspirational_words))
-                        .options(selectinload(GENRE.events))
-                    )
-                )
-                .scalars()
-                .all()
-            )
-            if not genres:
-                config.logger.debug("No genre found and return None")
-                return None
-            config.logger.debug(
-                f"Found genre with ID {genres[-1].id} annd name {genres[-1].name}"
-            )
-            return genres[-1]
-    except (AttributeError, SQLAlchemyError, TypeError):
+        catalog = await get_genre_catalog(config)
+        if genre_name:
+            genres = [genre for genre in catalog.values() if genre.name == genre_name]
+        else:
+            genres = [genre for genre in catalog.values() if genre.id == int(genre_id)]
+        if not genres:
+            config.logger.debug("No genre found and return None")
+            return None
+        config.logger.debug(
+            f"Found genre with ID {genres[-1].id} annd name {genres[-1].name}"
+        )
+        return genres[-1]
+    except (AttributeError, SQLAlchemyError, TypeError, ValueError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select")
         return None
 
@@ -105,7 +94,7 @@ async def check_exist_unique_genre(config: Configuration, genre: dict) -> bool:
         bool: Transferred genre already exists.
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config) as session:
             statement = select(
                 exists()
                 .where(GENRE.name == genre["name"])
@@ -154,8 +143,10 @@ async def create_genre_from_input(config: Configuration, result: ImportResult):
                     for event in events["event"]
                 )
             final_genre.append(temp_genre)
-        async with config.write_lock, config.session() as session, session.begin():
+        async with db_session(config, write=True) as session:
             session.add_all(final_genre)
+        config.genre_cache.invalidate()
+        config.name_index.track(final_genre)
         result.import_number = len(final_genre)
         result.success = True
         if missed_genre:
@@ -169,6 +160,45 @@ async def create_genre_from_input(config: Configuration, result: ImportResult):
         )
 
 
+async def load_genre_catalog(config: Configuration) -> list[GENRE]:
+    """
+    This function loads all genres with their inspirational words and events from the
+    database. It is the loader of the genre cache and should not be called directly.
+
+    Args:
+        config (Configuration): App configuration
+
+    Returns:
+        list[GENRE]: All genres sorted by id
+    """
+    # The catalog is shared between all commands, so it is never loaded in the
+    # session of a unit of work.
+    async with config.session() as session, session.begin():
+        statement = (
+            select(GENRE)
+            .options(selectinload(GENRE.inspirational_words))
+            .options(selectinload(GENRE.events))
+            .order_by(GENRE.id)
+        )
+        genres = (await session.execute(statement)).scalars().all()
+    config.logger.debug(f"Genre catalog loaded with {len(genres)} genres.")
+    return genres
+
+
+async def get_genre_catalog(config: Configuration) -> dict[int, GENRE]:
+    """
+    This function returns all genres mapped by id from the genre cache. The
+    database is only requested if the cache is empty or invalidated.
+
+    Args:
+        config (Configuration): App configuration
+
+    Returns:
+        dict[int, GENRE]: All genres with loaded inspirational words and events
+    """
+    return await config.genre_cache.get_catalog(lambda: load_genre_catalog(config))
+
+
 async def get_loaded_genre_from_id(
     config: Configuration, genre_id: int
 ) -> GENRE | None:
@@ -184,14 +214,7 @@ async def get_loaded_genre_from_id(
         GENRE | None: Found genre or NONE
     """
     try:
-        async with config.session() as session, session.begin():
-            statement = (
-                select(GENRE)
-                .where(GENRE.id == genre_id)
-                .options(selectinload(GENRE.inspirational_words))
-                .options(selectinload(GENRE.events))
-            )
-            return (await session.execute(statement)).scalar_one_or_none()
+        return (await get_genre_catalog(config)).get(genre_id)
 
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
@@ -208,12 +231,9 @@ async def get_all_active_genre(config: Configuration) -> list[GENRE]:
     Returns:
         list[GENRE]: List of all genres in the database
     """
-    async with config.session() as session, session.begin():
-        return (
-            (await session.execute(select(GENRE).where(GENRE.active.is_(True))))
-            .scalars()
-            .all()
-        )
+    return [
+        genre for genre in (await get_genre_catalog(config)).values() if genre.active
+    ]
 
 
 async def get_active_genre(config: Configuration) -> list[GENRE]:
@@ -227,14 +247,34 @@ async def get_active_genre(config: Configuration) -> list[GENRE]:
         list[GENRE]: List with all active genres
     """
     try:
-        async with config.session() as session, session.begin():
-            statement = select(GENRE).where(GENRE.active.is_(True))
-            return (await session.execute(statement)).scalars().all()
+        return [
+            genre
+            for genre in (await get_genre_catalog(config)).values()
+            if genre.active
+        ]
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
         return []
 
 
+async def get_genre_page(
+    genres: list[GENRE], page: PageContext, direction: PageDirection
+) -> list[GENRE]:
+    """
+    This function returns the requested page of a genre list. The genres are taken
+    from the genre cache, so the page is cut in memory.
+
+    Args:
+        genres (list[GENRE]): All genres sorted by id
+        page (PageContext): Pagination context
+        direction (PageDirection): Requested page
+
+    Returns:
+        list[GENRE]: Genres of the requested page
+    """
+    return paginate_items(genres, page, direction)
+
+
 async def deactivate_genre_with_id(config: Configuration, genre_id: int) -> None:
     """
     This function deactivates a genre based on the handed over genre id.
@@ -244,12 +284,14 @@ async def deactivate_genre_with_id(config: Configuration, genre_id: int) -> None
         genre_id (int): Genre id to deactivate
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config, write=True) as session:
             statement = select(GENRE).where(GENRE.id == genre_id)
             genre = (await session.execute(statement)).scalar_one_or_none()
             if genre:
                 genre.active = False
+                config.name_index.track([genre])
                 config.logger.debug(f"Deactivated genre with ID: {genre_id}")
+        config.genre_cache.invalidate()
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
 
@@ -265,9 +307,11 @@ async def get_inactive_genre(config: Configuration) -> list[GENRE]:
         list[GENRE]: List with all inactive genres
     """
     try:
-        async with config.session() as session, session.begin():
-            statement = select(GENRE).where(GENRE.active.is_(False))
-            return (await session.execute(statement)).scalars().all()
+        return [
+            genre
+            for genre in (await get_genre_catalog(config)).values()
+            if not genre.active
+        ]
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
         return []
@@ -282,11 +326,42 @@ async def activate_genre_with_id(config: Configuration, genre_id: int) -> None:
         genre_id (int): Genre id to activate
     """
     try:
-        async with config.session() as session, session.begin():
+        async with db_session(config, write=True) as session:
             statement = select(GENRE).where(GENRE.id == genre_id)
             genre = (await session.execute(statement)).scalar_one_or_none()
             if genre:
                 genre.active = True
+                config.name_index.track([genre])
                 config.logger.debug(f"Deactivated genre with ID: {genre_id}")
+        config.genre_cache.invalidate()
     except (AttributeError, SQLAlchemyError, TypeError):
         config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
+
+
+async def add_genre_content(
+    config: Configuration, genre_id: int, content: list[EVENT | INSPIRATIONALWORD]
+) -> bool:
+    """
+    This function adds new events or inspirational words to a genre. The rows are
+    inserted with the genre id, so the cached genre objects are not changed and only
+    replaced after the invalidation of the cache.
+
+    Args:
+        config (Configuration): App configuration
+        genre_id (int): Genre id of the new content
+        content (list[EVENT | INSPIRATIONALWORD]): New events or words
+
+    Returns:
+        bool: Content is stored
+    """
+    try:
+        async with db_session(config, write=True) as session:
+            for entry in content:
+                entry.genre_id = genre_id
+            session.add_all(content)
+        config.genre_cache.invalidate()
+        config.logger.debug(f"Added {len(content)} entries to genre with ID: {genre_id}")
+        return True
+    except (AttributeError, SQLAlchemyError, TypeError):
+        config.logger.opt(exception=sys.exc_info()).error("Error in sql insert.")
+        return False
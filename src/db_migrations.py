@@ -0,0 +1,261 @@
+"""
+This module contains the versioned migrations of the database schema. New tables are
+created by SQLAlchemy, but columns and indexes of existing tables are added by the
+migrations. Every migration is idempotent, so it can be repeated by the maintenance
+command without harm. Indexes are built online on MariaDB to not lock the tables.
+"""
+
+from dataclasses import dataclass
+from typing import Callable
+from sqlalchemy import Column, Connection, Index, inspect, select, delete, update, func, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateColumn
+from .db_classes import (
+    Base,
+    SCHEMAVERSION,
+    GAME,
+    GENRE,
+    CHARACTER,
+    USER,
+    STORY,
+    UserGameCharacterAssociation,
+)
+from .db_game import recount_statement
+
+
+@dataclass
+class Migration:
+    """
+    Class to define a migration step to the handed over schema version.
+    """
+
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+@dataclass
+class MigrationResult:
+    """
+    Class to collect the result of a migration run.
+    """
+
+    from_version: int | None
+    to_version: int
+    applied: list[int]
+
+
+def add_column(conn: Connection, column: Column) -> bool:
+    """
+    Function adds the handed over column of a table definition to the database if it
+    does not exist yet.
+
+    Args:
+        conn (Connection): Synchronous database connection
+        column (Column): Column of a table definition
+
+    Returns:
+        bool: Column was added
+    """
+    table = column.table
+    existing = {item["name"] for item in inspect(conn).get_columns(table.name)}
+    if column.name in existing:
+        return False
+    quote = conn.dialect.identifier_preparer.quote
+    column_ddl = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {column_ddl}"))
+    return True
+
+
+def create_index(conn: Connection, index: Index) -> bool:
+    """
+    Function builds the handed over index if it does not exist yet. On MariaDB and
+    MySQL the index is built online without locking the table for writes.
+
+    Args:
+        conn (Connection): Synchronous database connection
+        index (Index): Index of a table definition
+
+    Returns:
+        bool: Index was created
+    """
+    table = index.table
+    existing = {item["name"] for item in inspect(conn).get_indexes(table.name)}
+    if index.name in existing:
+        return False
+    if conn.dialect.name in ("mysql", "mariadb"):
+        quote = conn.dialect.identifier_preparer.quote
+        columns = ", ".join(quote(column.name) for column in index.columns)
+        unique = "UNIQUE " if index.unique else ""
+        conn.execute(
+            text(
+                f"ALTER TABLE {quote(table.name)} ADD {unique}INDEX "
+                + f"{quote(index.name)} ({columns}), ALGORITHM=INPLACE, LOCK=NONE"
+            )
+        )
+    else:
+        index.create(conn)
+    return True
+
+
+def migrate_select_indexes(conn: Connection) -> None:
+    """
+    Migration to build the indexes for the paged select menus and the name search.
+
+    Args:
+        conn (Connection): Synchronous database connection
+    """
+    for table in (GENRE.__table__, GAME.__table__, CHARACTER.__table__):
+        for index in table.indexes:
+            create_index(conn, index)
+
+
+def migrate_game_counters(conn: Connection) -> None:
+    """
+    Migration to add the counters of told stories and registered characters to the
+    games and to compute them from the existing data.
+
+    Args:
+        conn (Connection): Synchronous database connection
+    """
+    for column in ("stories_told", "registered_characters", "last_activity"):
+        add_column(conn, GAME.__table__.c[column])
+    conn.execute(recount_statement())
+
+
+def migrate_unique_user_dc_id(conn: Connection) -> None:
+    """
+    Migration to merge users with the same Discord id into the first created user and
+    to build the unique index on the Discord id.
+
+    Args:
+        conn (Connection): Synchronous database connection
+    """
+    duplicates = conn.execute(
+        select(USER.dc_id, func.min(USER.id))  # pylint: disable=not-callable
+        .group_by(USER.dc_id)
+        .having(func.count(USER.id) > 1)  # pylint: disable=not-callable
+    ).all()
+    for dc_id, user_id in duplicates:
+        merged_ids = conn.execute(
+            select(USER.id).where(USER.dc_id == dc_id).where(USER.id != user_id)
+        ).scalars().all()
+        for table in (CHARACTER, UserGameCharacterAssociation):
+            conn.execute(
+                update(table).where(table.user_id.in_(merged_ids)).values(user_id=user_id)
+            )
+        conn.execute(delete(USER).where(USER.id.in_(merged_ids)))
+    for index in USER.__table__.indexes:
+        create_index(conn, index)
+
+
+def migrate_prompt_texts(conn: Connection) -> None:
+    """
+    Migration to reference the shared prompt texts from the stories. Existing requests
+    stay in the stories and are read unchanged.
+
+    Args:
+        conn (Connection): Synchronous database connection
+    """
+    add_column(conn, STORY.__table__.c.request_hash)
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "Initial schema", lambda conn: None),
+    Migration(2, "Indexes for paged select menus", migrate_select_indexes),
+    Migration(3, "Counters of told stories and registered characters", migrate_game_counters),
+    Migration(4, "Unique Discord id of users", migrate_unique_user_dc_id),
+    Migration(5, "Archive of finished tales", lambda conn: None),
+    Migration(6, "Compressed story texts and shared prompt texts", migrate_prompt_texts),
+    Migration(7, "Content hashes of imported files", lambda conn: None),
+    Migration(8, "Chapters of finished tales", lambda conn: None),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+"""Version of the current table definitions, defined by the last migration."""
+
+
+def read_schema_version(conn: Connection) -> int | None:
+    """
+    Function reads the stored schema version of the database.
+
+    Args:
+        conn (Connection): Synchronous database connection
+
+    Returns:
+        int | None: Stored schema version or None for a new or unversioned database
+    """
+    if not inspect(conn).has_table(SCHEMAVERSION.__tablename__):
+        return None
+    return conn.execute(select(SCHEMAVERSION.version)).scalar_one_or_none()
+
+
+def write_schema_version(conn: Connection, version: int) -> None:
+    """
+    Function stores the handed over schema version.
+
+    Args:
+        conn (Connection): Synchronous database connection
+        version (int): Schema version
+    """
+    conn.execute(delete(SCHEMAVERSION))
+    conn.execute(SCHEMAVERSION.__table__.insert().values(version=version))
+
+
+def upgrade_schema(conn: Connection, repair: bool = False) -> MigrationResult:
+    """
+    Function creates all missing tables and applies the migrations newer than the
+    stored schema version. A database without version is migrated from the initial
+    schema.
+
+    Args:
+        conn (Connection): Synchronous database connection
+        repair (bool, optional): Apply all migrations again. Defaults to False.
+
+    Returns:
+        MigrationResult: Stored version before and after the run with applied migrations
+    """
+    from_version = read_schema_version(conn)
+    Base.metadata.create_all(conn)
+    start_version = 0 if repair else (from_version or 1)
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version <= start_version:
+            continue
+        migration.upgrade(conn)
+        applied.append(migration.version)
+    write_schema_version(conn, SCHEMA_VERSION)
+    return MigrationResult(from_version, SCHEMA_VERSION, applied)
+
+
+async def migrate_db(engine: AsyncEngine, repair: bool = False) -> MigrationResult:
+    """
+    Function migrates the database to the current schema version in one transaction.
+
+    Args:
+        engine (AsyncEngine): The engine of the database
+        repair (bool, optional): Apply all migrations again. Defaults to False.
+
+    Returns:
+        MigrationResult: Stored version before and after the run with applied migrations
+    """
+    async with engine.begin() as conn:
+        return await conn.run_sync(upgrade_schema, repair)
+
+
+async def sync_db(engine: AsyncEngine) -> bool:
+    """
+    Function to create all DB dependencies and tables and to migrate an existing
+    database. Nothing is done if the stored schema version is the current one.
+
+    Args:
+        engine (AsyncEngine): The engine to run the sync command
+
+    Returns:
+        bool: Tables were created or migrated
+    """
+    async with engine.connect() as conn:
+        if await conn.run_sync(read_schema_version) == SCHEMA_VERSION:
+            return False
+    await migrate_db(engine)
+    return True
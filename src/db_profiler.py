@@ -0,0 +1,283 @@
+"""
+This module contains the optional profiling of the SQL statements. The engine events
+around every cursor execution measure each statement, count the statements per command
+and log statements slower than the threshold with the types of their parameters. For
+slow SELECT statements the query plan can be logged after the command is finished.
+"""
+
+import re
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from itertools import groupby
+from time import perf_counter
+from typing import Any, AsyncContextManager, AsyncIterator
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from .db_classes import DbConfiguration
+
+BACKGROUND_COMMAND = "background"
+PLACEHOLDER_LIST = re.compile(r"\(\s*(\?|%s|%\(\w+\)s)(\s*,\s*(\?|%s|%\(\w+\)s))+\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class QueryStats:
+    """
+    Class to sum up the executions of a statement or the statements of a command.
+    """
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def add(self, duration: float) -> None:
+        """
+        Function adds an execution with the handed over duration in seconds.
+        """
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+
+@dataclass
+class SlowQuery:
+    """
+    Class with a slow SELECT statement and its parameters for the query plan.
+    """
+
+    key: str
+    statement: str
+    parameters: Any
+    duration: float
+
+
+@dataclass
+class CommandProfile:
+    """
+    Class with the statements of one command execution.
+    """
+
+    command: str
+    stats: QueryStats
+
+
+current_profile: ContextVar[CommandProfile | None] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Function normalizes a statement, so executions with a different number of values in
+    an IN list are counted as the same statement.
+
+    Args:
+        statement (str): Executed SQL statement
+
+    Returns:
+        str: Statement in one line with collapsed placeholder lists
+    """
+    return PLACEHOLDER_LIST.sub("(...)", WHITESPACE.sub(" ", statement).strip())
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """
+    Function describes the bound parameters by their types without the values, runs of
+    the same type are collapsed.
+
+    Args:
+        parameters (Any): Bound parameters of the cursor execution
+        executemany (bool, optional): Parameters are a list of parameter sets.
+            Defaults to False.
+
+    Returns:
+        str: Shape of the parameters like (int, str x 3)
+    """
+    if executemany:
+        first = parameters[0] if parameters else ()
+        return f"{len(parameters)} x {parameter_shape(first)}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(
+            f"{name}: {type(value).__name__}" for name, value in parameters.items()
+        ) + "}"
+    types = [type(value).__name__ for value in parameters or ()]
+    runs = (
+        name if count == 1 else f"{name} x {count}"
+        for name, count in ((name, len(list(group))) for name, group in groupby(types))
+    )
+    return "(" + ", ".join(runs) + ")"
+
+
+class QueryProfiler:
+    """
+    Class to measure the SQL statements of an engine per statement and per command.
+    """
+
+    def __init__(self, settings: DbConfiguration):
+        self.settings = settings
+        self.statements: dict[str, QueryStats] = {}
+        self.commands: dict[str, QueryStats] = {}
+        self.pending_explain: list[SlowQuery] = []
+        self.explained: set[str] = set()
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """
+        Function registers the cursor events of the engine.
+
+        Args:
+            engine (AsyncEngine): Database engine of the application
+        """
+        event.listen(engine.sync_engine, "before_cursor_execute", self.before_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self.after_execute)
+        event.listen(engine.sync_engine, "handle_error", self.discard_start)
+
+    def before_execute(self, conn, _cursor, statement, *_) -> None:
+        """
+        Event function stores the start time of the statement on the connection.
+        """
+        if not statement.startswith("EXPLAIN"):
+            conn.info.setdefault("query_start", []).append(perf_counter())
+
+    def discard_start(self, context) -> None:
+        """
+        Event function removes the start time of a failed statement.
+        """
+        if context.connection is None or not context.statement:
+            return
+        starts = context.connection.info.get("query_start")
+        if starts and not context.statement.startswith("EXPLAIN"):
+            starts.pop()
+
+    def after_execute(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        self, conn, _cursor, statement, parameters, _context, executemany
+    ) -> None:
+        """
+        Event function measures the statement and logs it, if it is slower than the
+        threshold.
+        """
+        if statement.startswith("EXPLAIN"):
+            return
+        duration = perf_counter() - conn.info["query_start"].pop()
+        key = normalize_statement(statement)
+        self.statements.setdefault(key, QueryStats()).add(duration)
+        profile = current_profile.get()
+        command = profile.command if profile is not None else BACKGROUND_COMMAND
+        self.commands.setdefault(command, QueryStats()).add(duration)
+        if profile is not None:
+            profile.stats.add(duration)
+        if duration * 1000 < self.settings.slow_query_ms:
+            return
+        logger.warning(
+            f"Slow query in {command} with {duration * 1000:.1f} ms: {key} "
+            + f"parameters: {parameter_shape(parameters, executemany)}"
+        )
+        if (
+            self.settings.explain_slow_queries
+            and not executemany
+            and key.upper().startswith("SELECT")
+            and key not in self.explained
+        ):
+            self.explained.add(key)
+            self.pending_explain.append(SlowQuery(key, statement, parameters, duration))
+
+    async def explain_pending(self, engine: AsyncEngine) -> None:
+        """
+        Function logs the query plans of the collected slow SELECT statements with a
+        new connection.
+
+        Args:
+            engine (AsyncEngine): Database engine of the application
+        """
+        pending, self.pending_explain = self.pending_explain, []
+        if not pending:
+            return
+        prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            async with engine.connect() as conn:
+                for query in pending:
+                    result = await conn.exec_driver_sql(
+                        prefix + query.statement, query.parameters
+                    )
+                    plan = "\n".join(" | ".join(map(str, row)) for row in result)
+                    logger.warning(
+                        f"Query plan of slow query ({query.duration * 1000:.1f} ms): "
+                        + f"{query.key}\n{plan}"
+                    )
+        except SQLAlchemyError:
+            logger.opt(exception=True).error("Error while explaining slow queries.")
+
+    def report(self, limit: int = 10) -> str:
+        """
+        Function returns the statements with the highest total duration and the
+        statements per command.
+
+        Args:
+            limit (int, optional): Number of reported statements. Defaults to 10.
+
+        Returns:
+            str: Report with one line per statement and command
+        """
+        lines = ["Statements by total time:"]
+        for key, stats in sorted(
+            self.statements.items(), key=lambda item: item[1].total, reverse=True
+        )[:limit]:
+            lines.append(
+                f"{stats.total * 1000:9.1f} ms {stats.count:6}x max "
+                + f"{stats.max * 1000:7.1f} ms  {key[:120]}"
+            )
+        lines.append("Statements by command:")
+        for command, stats in sorted(self.commands.items()):
+            lines.append(
+                f"{command}: {stats.count} statements in {stats.total * 1000:.1f} ms"
+            )
+        return "\n".join(lines)
+
+    @asynccontextmanager
+    async def profile_command(
+        self, engine: AsyncEngine, command: str
+    ) -> AsyncIterator[CommandProfile]:
+        """
+        Context manager to count the statements of a command execution. The query plans
+        of slow statements are logged after the command.
+
+        Args:
+            engine (AsyncEngine): Database engine of the application
+            command (str): Name of the command
+
+        Yields:
+            CommandProfile: Statements of the command execution
+        """
+        profile = CommandProfile(command, QueryStats())
+        token = current_profile.set(profile)
+        try:
+            yield profile
+        finally:
+            current_profile.reset(token)
+            logger.debug(
+                f"Command {command} executed {profile.stats.count} statements in "
+                + f"{profile.stats.total * 1000:.1f} ms."
+            )
+        await self.explain_pending(engine)
+
+
+def profile_command(
+    profiler: QueryProfiler | None, engine: AsyncEngine, command: str
+) -> AsyncContextManager:
+    """
+    Function returns the context manager to profile the statements of a command, which
+    does nothing if the profiling is disabled.
+
+    Args:
+        profiler (QueryProfiler | None): Query profiler or None if disabled
+        engine (AsyncEngine): Database engine of the application
+        command (str): Name of the command
+
+    Returns:
+        AsyncContextManager: Context manager of the command profile
+    """
+    if profiler is None:
+        return nullcontext()
+    return profiler.profile_command(engine, command)
@@ -0,0 +1,81 @@
+"""
+This module contains custom column types of the database. Long story texts are stored
+compressed with zlib. The compressed data is Base64 encoded and marked with a prefix,
+so the columns stay text columns on every backend and uncompressed rows written
+before stay readable.
+"""
+
+import base64
+import zlib
+from sqlalchemy import TEXT
+from sqlalchemy.types import TypeDecorator
+from .constants import DB_COMPRESS_MIN_LENGTH
+
+COMPRESSED_PREFIX = "zlib:"
+"""Marker at the beginning of a compressed value."""
+
+
+def compress_text(value: str) -> str:
+    """
+    Function compresses the handed over text into a marked Base64 string.
+
+    Args:
+        value (str): Text to compress
+
+    Returns:
+        str: Compressed text with marker
+    """
+    return COMPRESSED_PREFIX + base64.b64encode(
+        zlib.compress(value.encode("utf-8"), 9)
+    ).decode("ascii")
+
+
+def decompress_text(value: str) -> str:
+    """
+    Function restores a text compressed by compress_text.
+
+    Args:
+        value (str): Compressed text with marker
+
+    Returns:
+        str: Original text
+    """
+    return zlib.decompress(
+        base64.b64decode(value[len(COMPRESSED_PREFIX) :])
+    ).decode("utf-8")
+
+
+class CompressedText(TypeDecorator):  # pylint: disable=too-many-ancestors
+    """
+    Column type for long texts, which are compressed transparently from the handed over
+    minimum length on, if the compression saves space. Texts starting with the marker
+    are always compressed, so a stored value can be decoded without ambiguity.
+    """
+
+    impl = TEXT
+    cache_ok = True
+
+    def __init__(self, min_length: int = DB_COMPRESS_MIN_LENGTH):
+        super().__init__()
+        self.min_length = min_length
+
+    def process_bind_param(self, value: str | None, dialect) -> str | None:
+        if value is None:
+            return None
+        marked = value.startswith(COMPRESSED_PREFIX)
+        if len(value) < self.min_length and not marked:
+            return value
+        compressed = compress_text(value)
+        return compressed if marked or len(compressed) < len(value) else value
+
+    def process_result_value(self, value: str | None, dialect) -> str | None:
+        if value is None or not value.startswith(COMPRESSED_PREFIX):
+            return value
+        return decompress_text(value)
+
+    def process_literal_param(self, value: str | None, dialect) -> str | None:
+        return self.process_bind_param(value, dialect)
+
+    @property
+    def python_type(self) -> type:
+        return str
@@ -3,10 +3,24 @@ This module contains the discord bot implementation with definitions for the bot
 The bot is implemented using the discord.py library and provides a simple command to test the bot.
 """
 
+import json
+import asyncio
+import hashlib
+from pathlib import Path
+from operator import not_
+from collections.abc import Hashable
+from typing import Callable
 import discord
 from discord import app_commands
 from discord.ext import commands
 from .configuration import Configuration
+from .constants import DC_MAX_CHAR_MESSAGE
+from .autocomplete import to_choices
+from .command_runner import run_deferred, send_interaction_message, command_task_name
+from .db import load_autocomplete_index
+from .db_game import recount_game_counters
+from .db_migrations import migrate_db
+from .llm_handler import preload_openai
 from .discord_permissions import check_permissions_historian
 from .game import (
     create_game,
@@ -14,13 +28,70 @@ from .game import (
     setup_game,
     reset_game,
     finish_game,
+    FinishOptions,
     info_game,
+    SETUP_GAME_STATUS,
+    RESET_GAME_STATUS,
+    FINISH_GAME_STATUS,
+    INFO_GAME_STATUS,
 )
 from .character import select_character, show_character, show_own_character
 from .file_utils import import_data
+from .tale_export import ExportFormat
 from .genre import deactivate_genre, activate_genre, update_genre_with_content
 
 
+def name_autocomplete(
+    config: Configuration, index_name: str, accept: Callable[[Hashable], bool]
+):
+    """
+    Function creates an autocomplete callback for a command parameter which is answered
+    from the in-memory name index without database query.
+
+    Args:
+        config (Configuration): App configuration
+        index_name (str): Name of the index: games, characters or genres
+        accept (Callable[[Hashable], bool]): Filter on the tag of the index entries
+
+    Returns:
+        Callable: Autocomplete callback for discord.py
+    """
+
+    async def autocomplete(
+        _: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[int]]:
+        if not config.name_index.loaded:
+            await load_autocomplete_index(config)
+        index = getattr(config.name_index, index_name)
+        return to_choices(index.search(current, accept))
+
+    return autocomplete
+
+
+def command_tree_hash(tree: app_commands.CommandTree, application_id: int | None) -> str:
+    """
+    Function calculates a stable hash of all registered slash commands with their
+    parameters, descriptions and permissions as they are sent to Discord.
+
+    Args:
+        tree (app_commands.CommandTree): Command tree of the bot
+        application_id (int | None): Id of the Discord application
+
+    Returns:
+        str: SHA-256 hash of the command tree
+    """
+    commands_payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands()),
+        key=lambda command: command["name"],
+    )
+    payload = json.dumps(
+        {"application_id": application_id, "commands": commands_payload},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 class DiscordBot:
     """
     DiscordBot class to create a discord bot with the given configuration. This is
@@ -42,6 +113,9 @@ class DiscordBot:
             await self.on_ready()
 
         self.register_commands()
+        if self.config.metrics is not None:
+            self.config.metrics.instrument_http(self.bot.http)
+            self.instrument_commands()
 
     async def start(self):
         """
@@ -55,8 +129,10 @@ class DiscordBot:
         Event function to print a message when the bot is online.
         """
         self.config.logger.info(f"{self.bot.user} ist online")
-        synced = await self.bot.tree.sync()
-        self.config.logger.info(f"Slash Commands synchronisiert: {len(synced)}")
+        if not self.config.name_index.loaded:
+            await load_autocomplete_index(self.config)
+            self.config.background_tasks.start(preload_openai(), name="preload-openai")
+        await self.sync_commands(force=self.config.env.dc.force_command_sync)
         await self.bot.change_presence(
             status=discord.Status.online,
             activity=discord.Activity(
@@ -64,6 +140,67 @@ class DiscordBot:
             ),
         )
 
+    async def sync_commands(self, force: bool = False) -> int | None:
+        """
+        Function synchronizes the slash commands with Discord if the command tree has
+        changed since the last synchronization. The hash of the last synchronized tree
+        is stored in a file, so reconnects and restarts skip the rate limited request.
+
+        Args:
+            force (bool, optional): Synchronize even if the tree is unchanged.
+                Defaults to False.
+
+        Returns:
+            int | None: Number of synchronized commands or None if skipped
+        """
+        tree_hash = command_tree_hash(self.bot.tree, self.bot.application_id)
+        hash_file = Path(self.config.env.dc.command_hash_file)
+        if (
+            not force
+            and hash_file.is_file()
+            and hash_file.read_text(encoding="utf-8").strip() == tree_hash
+        ):
+            self.config.logger.info("Slash Commands unverändert, keine Synchronisierung.")
+            return None
+        synced = await self.bot.tree.sync()
+        self.config.logger.info(f"Slash Commands synchronisiert: {len(synced)}")
+        hash_file.parent.mkdir(parents=True, exist_ok=True)
+        hash_file.write_text(tree_hash, encoding="utf-8")
+        return len(synced)
+
+    def instrument_commands(self) -> None:
+        """
+        Function wraps the callback of every registered slash command in a trace. The
+        trace lasts until the deferred background task of the command is finished.
+        """
+        for command in self.bot.tree.walk_commands():
+            if isinstance(command, app_commands.Command):
+                command._callback = self.traced_callback(  # pylint: disable=protected-access
+                    command.qualified_name, command.callback
+                )
+
+    def traced_callback(self, name: str, callback: Callable) -> Callable:
+        """
+        Function creates the traced callback of a slash command.
+
+        Args:
+            name (str): Qualified name of the command
+            callback (Callable): Callback of the command
+
+        Returns:
+            Callable: Callback which measures the command with its background task
+        """
+
+        async def traced(interaction: discord.Interaction, **params):
+            async with self.config.metrics.trace_command(name) as trace:
+                await callback(interaction, **params)
+                task = self.config.background_tasks.get(command_task_name(interaction))
+                if task is not None:
+                    await asyncio.wait([task])
+            self.config.logger.debug(f"Command {name} traced: {trace.summary()}")
+
+        return traced
+
     def register_commands(self):  # pylint: disable=too-many-locals, too-many-statements
         """
         Function to register the commands for the bot. This function is called in the
@@ -90,7 +227,7 @@ class DiscordBot:
             self.config.logger.trace(
                 f"User: {interaction.user.id} execute command to continue telling a story."
             )
-            await keep_telling_schedule(interaction, self.config)
+            await run_deferred(self.config, interaction, keep_telling_schedule)
 
         @content_group.command(
             name="import-data",
@@ -102,19 +239,166 @@ class DiscordBot:
             )
             if not await check_permissions_historian(self.config, interaction):
                 return
-            await import_data(interaction, self.config)
+            await run_deferred(self.config, interaction, import_data)
+
+        @content_group.command(
+            name="sync-commands",
+            description="Synchronize the slash commands with Discord.",
+        )
+        async def wrapped_sync_commands(interaction: discord.Interaction):
+            self.config.logger.trace(
+                f"User: {interaction.user.id} execute command to sync slash commands."
+            )
+            if not await check_permissions_historian(self.config, interaction):
+                return
+            await run_deferred(self.config, interaction, force_sync_commands)
+
+        async def force_sync_commands(interaction: discord.Interaction, _: Configuration):
+            synced = await self.sync_commands(force=True)
+            await send_interaction_message(
+                interaction, f"{synced} slash commands synchronized.", ephemeral=True
+            )
+
+        @content_group.command(
+            name="migrate-db",
+            description="Apply all database migrations again to repair columns and indexes.",
+        )
+        async def wrapped_migrate_db(interaction: discord.Interaction):
+            self.config.logger.trace(
+                f"User: {interaction.user.id} execute command to migrate the database."
+            )
+            if not await check_permissions_historian(self.config, interaction):
+                return
+            await run_deferred(self.config, interaction, repair_database)
+
+        async def repair_database(interaction: discord.Interaction, config: Configuration):
+            result = await migrate_db(config.engine, repair=True)
+            config.logger.info(
+                f"Database migrated from version {result.from_version} to "
+                + f"{result.to_version} with migrations: {result.applied}"
+            )
+            await send_interaction_message(
+                interaction,
+                f"Database schema is at version {result.to_version}, "
+                + f"{len(result.applied)} migrations checked.",
+                ephemeral=True,
+            )
+
+        @content_group.command(
+            name="repair-counters",
+            description="Recount the told stories and registered characters of all games.",
+        )
+        async def wrapped_repair_counters(interaction: discord.Interaction):
+            self.config.logger.trace(
+                f"User: {interaction.user.id} execute command to repair the game counters."
+            )
+            if not await check_permissions_historian(self.config, interaction):
+                return
+            await run_deferred(self.config, interaction, repair_game_counters)
+
+        async def repair_game_counters(interaction: discord.Interaction, config: Configuration):
+            repaired = await recount_game_counters(config)
+            await send_interaction_message(
+                interaction, f"Counters of {repaired} games recounted.", ephemeral=True
+            )
+
+        @content_group.command(
+            name="query-profile",
+            description="Show the slowest SQL statements and the statements per command.",
+        )
+        async def wrapped_query_profile(interaction: discord.Interaction):
+            self.config.logger.trace(
+                f"User: {interaction.user.id} execute command to show the query profile."
+            )
+            if not await check_permissions_historian(self.config, interaction):
+                return
+            await run_deferred(self.config, interaction, show_query_profile)
+
+        async def show_query_profile(interaction: discord.Interaction, config: Configuration):
+            if config.query_profiler is None:
+                await send_interaction_message(
+                    interaction,
+                    "The query profiling is disabled, enable it with TT_DB_PROFILE_QUERIES.",
+                    ephemeral=True,
+                )
+                return
+            report = config.query_profiler.report()
+            await send_interaction_message(
+                interaction, f"```\n{report[:DC_MAX_CHAR_MESSAGE - 8]}\n```", ephemeral=True
+            )
+
+        @content_group.command(
+            name="sample-profile",
+            description="Profile the running bot and its tasks and show the hotspots.",
+        )
+        @app_commands.describe(seconds="Duration of the profile in seconds")
+        async def wrapped_sample_profile(
+            interaction: discord.Interaction, seconds: app_commands.Range[int, 1, 120] = 10
+        ):
+            self.config.logger.trace(
+                f"User: {interaction.user.id} execute command to sample a profile."
+            )
+            if not await check_permissions_historian(self.config, interaction):
+                return
+            await run_deferred(self.config, interaction, sample_profile, seconds)
+
+        async def sample_profile(
+            interaction: discord.Interaction, config: Configuration, seconds: int
+        ):
+            if config.sampling_profiler.running:
+                await send_interaction_message(
+                    interaction, "A profile is already running.", ephemeral=True
+                )
+                return
+            result = await config.sampling_profiler.profile(seconds)
+            config.logger.info(
+                f"Sampling profile written to {result.stack_file} and {result.task_file}."
+            )
+            report = f"{result.report()}\nFiles: {result.stack_file}, {result.task_file}"
+            await send_interaction_message(
+                interaction, f"```\n{report[:DC_MAX_CHAR_MESSAGE - 8]}\n```", ephemeral=True
+            )
+
+        @content_group.command(
+            name="loop-lag",
+            description="Show the lag of the event loop and the last blocking calls.",
+        )
+        async def wrapped_loop_lag(interaction: discord.Interaction):
+            self.config.logger.trace(
+                f"User: {interaction.user.id} execute command to show the loop lag."
+            )
+            if not await check_permissions_historian(self.config, interaction):
+                return
+            if self.config.loop_watchdog is None:
+                await send_interaction_message(
+                    interaction,
+                    "The loop watchdog is disabled, enable it with TT_LOOP_WATCHDOG.",
+                    ephemeral=True,
+                )
+                return
+            report = self.config.loop_watchdog.report()
+            await send_interaction_message(
+                interaction, f"```\n{report[:DC_MAX_CHAR_MESSAGE - 8]}\n```", ephemeral=True
+            )
 
         @content_group.command(
             name="update-genre",
             description="Update events and inspirational words for genres from external source.",
         )
-        async def wrapped_update_genre(interaction: discord.Interaction):
+        @app_commands.describe(genre="Genre to select, leave empty to choose from a list")
+        @app_commands.autocomplete(
+            genre=name_autocomplete(self.config, "genres", bool),
+        )
+        async def wrapped_update_genre(
+            interaction: discord.Interaction,
+            genre: int | None = None,
+        ):
             self.config.logger.trace(
                 f"User: {interaction.user.id} execute command to update genre content."
             )
             if not await check_permissions_historian(self.config, interaction):
                 return
-            await update_genre_with_content(interaction, self.config)
+            await run_deferred(self.config, interaction, update_genre_with_content, genre)
 
         @game_group.command(
             name="create", description="Create a new game and set the parameters."
@@ -125,88 +409,161 @@ class DiscordBot:
             )
             if not await check_permissions_historian(self.config, interaction):
                 return
-            await create_game(interaction, self.config)
+            await run_deferred(self.config, interaction, create_game)
 
         @game_group.command(
             name="setup",
             description="Switch game state to specific status like running, paused, etc.",
         )
-        async def wrapped_setup_game(interaction: discord.Interaction):
+        @app_commands.describe(game="Game to select, leave empty to choose from a list")
+        @app_commands.autocomplete(
+            game=name_autocomplete(self.config, "games", SETUP_GAME_STATUS.__contains__),
+        )
+        async def wrapped_setup_game(
+            interaction: discord.Interaction,
+            game: int | None = None,
+        ):
             self.config.logger.trace(
                 f"User: {interaction.user.id} execute command for setup game."
             )
             if not await check_permissions_historian(self.config, interaction):
                 return
-            await setup_game(interaction, self.config)
+            await run_deferred(self.config, interaction, setup_game, game)
 
         @game_group.command(
             name="reset", description="Restart a Tale and create new start prompt."
         )
-        async def wrapped_reset_game(interaction: discord.Interaction):
+        @app_commands.describe(game="Game to select, leave empty to choose from a list")
+        @app_commands.autocomplete(
+            game=name_autocomplete(self.config, "games", RESET_GAME_STATUS.__contains__),
+        )
+        async def wrapped_reset_game(
+            interaction: discord.Interaction,
+            game: int | None = None,
+        ):
             self.config.logger.trace(
                 f"User: {interaction.user.id} execute command for reset game."
             )
             if not await check_permissions_historian(self.config, interaction):
                 return
-            await reset_game(interaction, self.config)
+            await run_deferred(self.config, interaction, reset_game, game)
 
         @game_group.command(
-            name="finish", description="Finish a Tale and print the story as PDF."
+            name="finish",
+            description="Finish a Tale and upload the story as PDF, HTML or Markdown.",
         )
-        async def wrapped_finish_game(interaction: discord.Interaction):
+        @app_commands.describe(
+            game="Game to select, leave empty to choose from a list",
+            file_format="Format of the exported story",
+            chapters="Write titles and summaries of the chapters in the background",
+            prompt="Additional instruction for the chapters",
+        )
+        @app_commands.autocomplete(
+            game=name_autocomplete(self.config, "games", FINISH_GAME_STATUS.__contains__),
+        )
+        async def wrapped_finish_game(
+            interaction: discord.Interaction,
+            game: int | None = None,
+            file_format: ExportFormat = ExportFormat.PDF,
+            chapters: bool = True,
+            prompt: app_commands.Range[str, 0, DC_MAX_CHAR_MESSAGE] = "",
+        ):
             self.config.logger.trace(
                 f"User: {interaction.user.id} execute command for finish game."
             )
             if not await check_permissions_historian(self.config, interaction):
                 return
-            await finish_game(interaction, self.config)
+            options = FinishOptions(
+                export_format=file_format, create_chapter=chapters, finish_prompt=prompt
+            )
+            await run_deferred(self.config, interaction, finish_game, game, options)
 
         @game_group.command(
             name="info",
             description="Print information about a selected game like state, players, etc.",
         )
-        async def wrapped_info_game(interaction: discord.Interaction):
+        @app_commands.describe(game="Game to select, leave empty to choose from a list")
+        @app_commands.autocomplete(
+            game=name_autocomplete(self.config, "games", INFO_GAME_STATUS.__contains__),
+        )
+        async def wrapped_info_game(
+            interaction: discord.Interaction,
+            game: int | None = None,
+        ):
             self.config.logger.trace(
                 f"User: {interaction.user.id} execute command for info game."
             )
-            await info_game(interaction, self.config)
+            await run_deferred(self.config, interaction, info_game, game)
 
         @genre_group.command(name="deactivate", description="Deactivate genre")
-        async def wrapped_genre_deactivate(interaction: discord.Interaction):
+        @app_commands.describe(genre="Genre to select, leave empty to choose from a list")
+        @app_commands.autocomplete(
+            genre=name_autocomplete(self.config, "genres", bool),
+        )
+        async def wrapped_genre_deactivate(
+            interaction: discord.Interaction,
+            genre: int | None = None,
+        ):
             self.config.logger.trace(
                 f"User: {interaction.user.id} execute sub-command for genre deactivation."
             )
             if not await check_permissions_historian(self.config, interaction):
                 return
-            await deactivate_genre(interaction, self.config)
+            await run_deferred(self.config, interaction, deactivate_genre, genre)
 
         @genre_group.command(name="activate", description="Activate genre")
-        async def wrapped_genre_activate(interaction: discord.Interaction):
+        @app_commands.describe(genre="Genre to select, leave empty to choose from a list")
+        @app_commands.autocomplete(
+            genre=name_autocomplete(self.config, "genres", not_),
+        )
+        async def wrapped_genre_activate(
+            interaction: discord.Interaction,
+            genre: int | None = None,
+        ):
             self.config.logger.trace(
                 f"User: {interaction.user.id} execute sub-command for genre activation."
             )
             if not await check_permissions_historian(self.config, interaction):
                 return
-            await activate_genre(interaction, self.config)
+            await run_deferred(self.config, interaction, activate_genre, genre)
 
         @character_group.command(
             name="select", description="Join a game by selecting a character."
         )
-        async def wrapped_character_select(interaction: discord.Interaction):
+        @app_commands.describe(
+            game="Game to select, leave empty to choose from a list",
+            character="Character to select, leave empty to choose from a list",
+        )
+        @app_commands.autocomplete(
+            game=name_autocomplete(self.config, "games", SETUP_GAME_STATUS.__contains__),
+            character=name_autocomplete(self.config, "characters", bool),
+        )
+        async def wrapped_character_select(
+            interaction: discord.Interaction,
+            game: int | None = None,
+            character: int | None = None,
+        ):
             self.config.logger.trace(
                 f"User: {interaction.user.id} execute sub-command for character selection."
             )
-            await select_character(interaction, self.config)
+            await run_deferred(self.config, interaction, select_character, game, character)
 
         @character_group.command(
             name="show",
             description="Show available character and select one with background and traits.",
         )
-        async def wrapped_character_show(interaction: discord.Interaction):
+        @app_commands.describe(character="Character to select, leave empty to choose from a list")
+        @app_commands.autocomplete(
+            character=name_autocomplete(self.config, "characters", bool),
+        )
+        async def wrapped_character_show(
+            interaction: discord.Interaction,
+            character: int | None = None,
+        ):
             self.config.logger.trace(
                 f"User: {interaction.user.id} execute sub-command to show character."
             )
-            await show_character(interaction, self.config)
+            await run_deferred(self.config, interaction, show_character, character)
 
         @character_group.command(
             name="own",
@@ -216,7 +573,7 @@ class DiscordBot:
             self.config.logger.trace(
                 f"User: {interaction.user.id} execute sub-command to show own character."
             )
-            await show_own_character(interaction, self.config)
+            await run_deferred(self.config, interaction, show_own_character)
 
         self.bot.tree.add_command(content_group)
         self.bot.tree.add_command(game_group)
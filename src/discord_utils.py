@@ -3,11 +3,13 @@ This module contains utility functions for interacting with Discord.
 """
 
 import sys
+from datetime import timezone
 from urllib.parse import urljoin
 import asyncio
 import discord
 from discord import TextChannel, Embed, Interaction
 from .configuration import Configuration, ProcessInput
+from .command_runner import send_interaction_message
 from .constants import (
     DC_MAX_CHAR_MESSAGE,
     DC_EMBED_DESCRIPTION,
@@ -89,6 +91,39 @@ async def send_channel_message(
         return []
 
 
+async def send_channel_file(
+    config: Configuration, channel_id: int, file_path: str, message: str
+) -> int | None:
+    """
+    This function uploads a file with a message to a specific Discord channel.
+
+    Args:
+        config (Configuration): App configuration
+        channel_id (int): Channel ID to send the file to
+        file_path (str): Path of the file to upload
+        message (str): Message of the upload
+
+    Returns:
+        int | None: ID of the sent message or None if the upload failed
+    """
+    try:
+        channel = config.dc_bot.get_channel(channel_id)
+        if channel is None:
+            channel = await config.dc_bot.fetch_channel(channel_id)
+        msg = await channel.send(message, file=discord.File(file_path))
+        config.logger.debug(f"Uploaded file {file_path} with message: {msg.id}")
+        return msg.id
+    except discord.errors.NotFound:
+        config.logger.error(f"Channel ID {channel_id} not found.")
+        return None
+    except discord.errors.Forbidden:
+        config.logger.error(f"No permission to upload to channel {channel_id}.")
+        return None
+    except discord.errors.HTTPException:
+        config.logger.opt(exception=sys.exc_info()).error("HTTP-Error during file upload")
+        return None
+
+
 async def delete_channel_messages(
     config: Configuration, game: GAME, dc_message_ids: list[int]
 ) -> None:
@@ -242,6 +277,41 @@ async def update_embed_message(config: Configuration, game: GAME) -> None:
         )
 
 
+async def interface_preselected_game(
+    interaction: Interaction, config: Configuration, process_data: ProcessInput
+) -> bool:
+    """
+    This function checks the game which was already selected with the autocomplete of
+    the command parameter and sends the first response instead of the select menu.
+
+    Args:
+        interaction (Interaction): Discord interaction
+        config (Configuration): App configuration
+        process_data (ProcessInput): Process data with the selected game id
+
+    Returns:
+        bool: Selected game is available for the command and saved in the process data.
+    """
+    game_context = process_data.game_context
+    game = await get_object_by_id(config, GAME, game_context.selected_game_id)
+    if not await game_context.game_selectable(game):
+        config.logger.debug(
+            f"Game with ID: {game_context.selected_game_id} is not selectable."
+        )
+        await send_interaction_message(
+            interaction,
+            f"The game with the ID: {game_context.selected_game_id} is not available "
+            + "for this command.",
+            ephemeral=True,
+        )
+        return False
+    game_context.selected_game = game
+    await send_interaction_message(
+        interaction, f"You have chosen the game {game.id}: {game.name}", ephemeral=True
+    )
+    return True
+
+
 async def interface_select_game(
     interaction: Interaction, config: Configuration, process_data: ProcessInput
 ) -> bool:
@@ -258,15 +328,19 @@ async def interface_select_game(
         bool: Selection was successful and a game was selected and saved in the process data.
     """
     try:
+        if process_data.game_context.selected_game_id:
+            return await interface_preselected_game(interaction, config, process_data)
         if not await process_data.game_context.input_valid_game():
-            await interaction.response.send_message(
+            await send_interaction_message(
+                interaction,
                 "No game is available for this command, please contact a Mod.",
                 ephemeral=True,
             )
             return False
 
         select_view = GameSelectView(config, process_data)
-        await interaction.response.send_message(
+        await send_interaction_message(
+            interaction,
             "Which game would you like to select?",
             view=select_view,
             ephemeral=True,
@@ -501,6 +575,14 @@ async def send_game_info_embed(
         )
         embed.add_field(name="Tale", value=message_link, inline=False)
         embed.add_field(name="Told stories", value=game_info.num_stories, inline=False)
+        if game_info.game.last_activity is not None:
+            embed.add_field(
+                name="Last activity",
+                value=discord.utils.format_dt(
+                    game_info.game.last_activity.replace(tzinfo=timezone.utc), "R"
+                ),
+                inline=False,
+            )
         embed.add_field(
             name="The Player as character:",
             value="\n".join(
@@ -3,38 +3,203 @@ This file contains all functions and definitions required for document handling.
 """
 
 import sys
+import json
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
 from pathlib import Path
-import aiofiles
+from typing import Awaitable, Callable
 import yaml
 from discord import HTTPException, Interaction
 
 from .configuration import Configuration
+from .command_runner import send_interaction_message
 from .db import (
     ImportResult,
     create_character_from_input
 )
 from .db_genre import create_genre_from_input
+from .db_content import (
+    FILE_ENTRY,
+    get_content_hashes,
+    store_content_hashes,
+    update_characters_from_input,
+    update_genres_from_input,
+)
 from .constants import DC_DESCRIPTION_MAX_CHAR, DC_MAX_CHAR_MESSAGE
 
 
-async def load_yaml(config: Configuration, result: ImportResult) -> dict:
+@dataclass(frozen=True)
+class FieldRule:
+    """
+    Class with the rule for a field of an imported entry. Lists can contain values of
+    a type or entries with their own rules.
     """
-    Generic function to import yml files and parse them to a dict.
+
+    type: type
+    required: bool = True
+    nullable: bool = False
+    max_length: int | None = None
+    item_type: type | None = None
+    entries: dict[str, "FieldRule"] | None = None
+
+
+GENRE_SCHEMA: dict[str, FieldRule] = {
+    "name": FieldRule(str, max_length=100),
+    "storytelling-type": FieldRule(str, nullable=True, max_length=100),
+    "atmosphere": FieldRule(str, nullable=True, max_length=100),
+    "language": FieldRule(str, max_length=100),
+    "inspirational-words": FieldRule(
+        list,
+        required=False,
+        entries={"chance": FieldRule(int), "words": FieldRule(list, item_type=str)},
+    ),
+    "events": FieldRule(
+        list,
+        required=False,
+        entries={"chance": FieldRule(int), "event": FieldRule(list, item_type=str)},
+    ),
+}
+"""Rules for the entries of the genre file."""
+
+CHARACTER_SCHEMA: dict[str, FieldRule] = {
+    "name": FieldRule(str, max_length=100),
+    "age": FieldRule(int),
+    "background": FieldRule(str),
+    "description": FieldRule(str),
+    "pos_trait": FieldRule(str, nullable=True),
+    "neg_trait": FieldRule(str, nullable=True),
+    "summary": FieldRule(str),
+}
+"""Rules for the entries of the character file."""
+
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+"""Safe loader of libyaml if available, otherwise the pure Python loader."""
+
+
+def validate_value(value, rule: FieldRule, path: str) -> list[str]:
+    """
+    Function checks a value against the rule of its field.
 
     Args:
-        config (Configuration): App configuration
-        result (ImportResult): Result class to store import information
+        value (Any): Value of the field
+        rule (FieldRule): Rule of the field
+        path (str): Path of the field for the error messages
+
+    Returns:
+        list[str]: Error messages, empty if the value is valid
+    """
+    if value is None:
+        return [] if rule.nullable else [f"{path} is empty"]
+    if not isinstance(value, rule.type) or (isinstance(value, bool) and rule.type is not bool):
+        return [f"{path} must be {rule.type.__name__}, not {type(value).__name__}"]
+    if rule.max_length is not None and len(value) > rule.max_length:
+        return [f"{path} is longer than {rule.max_length} characters"]
+    errors = []
+    for index, item in enumerate(value if rule.type is list else []):
+        if rule.item_type is not None and not isinstance(item, rule.item_type):
+            errors.append(
+                f"{path}[{index}] must be {rule.item_type.__name__}, "
+                + f"not {type(item).__name__}"
+            )
+        if rule.entries is not None:
+            errors.extend(validate_entry(item, rule.entries, f"{path}[{index}]."))
+    return errors
+
+
+def validate_entry(entry, schema: dict[str, FieldRule], prefix: str = "") -> list[str]:
+    """
+    Function checks an imported entry against the rules of its fields.
+
+    Args:
+        entry (Any): Imported entry
+        schema (dict[str, FieldRule]): Rules of the fields
+        prefix (str, optional): Path of the entry for nested entries. Defaults to "".
+
+    Returns:
+        list[str]: Error messages, empty if the entry is valid
+    """
+    if not isinstance(entry, dict):
+        return [f"{prefix or 'entry'} must be a mapping, not {type(entry).__name__}"]
+    errors = []
+    for name, rule in schema.items():
+        if name not in entry:
+            if rule.required:
+                errors.append(f"{prefix}{name} is missing")
+            continue
+        errors.extend(validate_value(entry[name], rule, f"{prefix}{name}"))
+    return errors
+
+
+def parse_yaml_file(
+    file_path: str, schema: dict[str, FieldRule], loader_class: type = YamlLoader
+) -> tuple[list[dict], list[str]]:
+    """
+    Function parses a yml file document by document and validates every entry. A
+    document is a list of entries or a single entry. Invalid entries are left out and
+    reported with their line. The function blocks and is executed in a worker thread.
+
+    Args:
+        file_path (str): Path of the yml file
+        schema (dict[str, FieldRule]): Rules of the fields of an entry
+        loader_class (type, optional): Safe YAML loader. Defaults to YamlLoader.
 
     Returns:
-        dict: Parsed data from the yml file
+        tuple[list[dict], list[str]]: Valid entries and the error messages
+    """
+    entries, errors = [], []
+    file_name = Path(file_path).name
+    with open(file_path, mode="r", encoding="utf-8") as stream:
+        loader = loader_class(stream)
+        try:
+            while loader.check_node():
+                node = loader.get_node()
+                data = loader.construct_document(node)
+                if data is None:
+                    continue
+                items = (
+                    zip(node.value, data)
+                    if isinstance(node, yaml.SequenceNode)
+                    else [(node, data)]
+                )
+                for item_node, entry in items:
+                    entry_errors = validate_entry(entry, schema)
+                    if not entry_errors:
+                        entries.append(entry)
+                        continue
+                    name = entry.get("name") if isinstance(entry, dict) else None
+                    errors.append(
+                        f"{file_name} line {item_node.start_mark.line + 1}"
+                        + (f" ({name})" if name else "")
+                        + f": {", ".join(entry_errors)}"
+                    )
+        finally:
+            loader.dispose()
+    return entries, errors
+
+
+async def load_yaml(
+    config: Configuration, result: ImportResult, schema: dict[str, FieldRule]
+) -> None:
+    """
+    Generic function to import yml files and parse them to a list of valid entries. The
+    file is parsed in a worker thread, so the event loop is not blocked by large files.
+
+    Args:
+        config (Configuration): App configuration
+        result (ImportResult): Result class to store import information
+        schema (dict[str, FieldRule]): Rules of the fields of an entry
     """
     try:
         if not Path(result.file_path).is_file():
             config.logger.debug(f"During import, file {result.file_path} don't exist")
             return
-        async with aiofiles.open(result.file_path, mode="r", encoding="utf-8") as file:
-            content = await file.read()
-            result.data = yaml.safe_load(content)
+        result.data, errors = await asyncio.to_thread(
+            parse_yaml_file, result.file_path, schema
+        )
+        for error in errors:
+            config.logger.warning(f"Invalid entry skipped during import: {error}")
+        result.errors.extend(errors)
     except PermissionError:
         config.logger.error(f"No permission to read the file {result.file_path}")
     except FileNotFoundError:
@@ -49,10 +214,154 @@ async def load_yaml(config: Configuration, result: ImportResult) -> dict:
         )
     except UnicodeDecodeError:
         config.logger.error(f"File {result.file_path} is not valid UTF-8 encoded")
-    except yaml.YAMLError:
+    except yaml.YAMLError as err:
         config.logger.opt(exception=sys.exc_info()).error(
             f"YAML parsing error in file {result.file_path}."
         )
+        result.errors.append(f"{Path(result.file_path).name}: {err}")
+
+
+@dataclass
+class ImportDiff:
+    """
+    Class with the difference between the entries of a file and the stored hashes of
+    the last import.
+    """
+
+    new: list[dict] = field(default_factory=list)
+    changed: list[dict] = field(default_factory=list)
+    unchanged: int = 0
+    removed: int = 0
+    hashes: dict[str, str] = field(default_factory=dict)
+    duplicates: list[str] = field(default_factory=list)
+
+    def summary(self, file_name: str) -> str:
+        """
+        Function returns the numbers of new, changed, unchanged and removed entries.
+
+        Args:
+            file_name (str): Name of the imported file
+
+        Returns:
+            str: Summary of the difference
+        """
+        return (
+            f"{file_name}: {len(self.new)} new, {len(self.changed)} changed, "
+            + f"{self.unchanged} unchanged, {self.removed} removed."
+        )
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Function calculates the SHA-256 hash of a file in chunks.
+
+    Args:
+        file_path (str): Path of the file
+
+    Returns:
+        str: Hash as hex string
+    """
+    digest = hashlib.sha256()
+    with open(file_path, mode="rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_entry(entry: dict) -> str:
+    """
+    Function calculates the SHA-256 hash of an entry independent of the order of its
+    fields.
+
+    Args:
+        entry (dict): Imported entry
+
+    Returns:
+        str: Hash as hex string
+    """
+    content = json.dumps(entry, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def diff_entries(entries: list[dict], stored: dict[str, str]) -> ImportDiff:
+    """
+    Function compares the entries of a file by name with the stored hashes of the last
+    import. Later entries with the name of a former entry are left out.
+
+    Args:
+        entries (list[dict]): Valid entries of the file
+        stored (dict[str, str]): Stored hash per entry name
+
+    Returns:
+        ImportDiff: Difference with the hashes of all entries
+    """
+    diff = ImportDiff()
+    for entry in entries:
+        name = entry["name"]
+        if name in diff.hashes:
+            diff.duplicates.append(name)
+            continue
+        diff.hashes[name] = hash_entry(entry)
+        if name not in stored:
+            diff.new.append(entry)
+        elif stored[name] != diff.hashes[name]:
+            diff.changed.append(entry)
+        else:
+            diff.unchanged += 1
+    diff.removed = len(set(stored) - set(diff.hashes) - {FILE_ENTRY})
+    return diff
+
+
+async def import_content_file(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+    config: Configuration,
+    result: ImportResult,
+    schema: dict[str, FieldRule],
+    create: Callable[[Configuration, ImportResult], Awaitable[None]],
+    update: Callable[[Configuration, list[dict]], Awaitable[list[str] | None]],
+) -> None:
+    """
+    Function imports only the new and changed entries of a content file. A file with
+    the hash of the last import is not parsed again. The hashes are stored after a
+    successful import, the hash of the file only if all entries were valid.
+
+    Args:
+        config (Configuration): App configuration
+        result (ImportResult): Result class to store import information
+        schema (dict[str, FieldRule]): Rules of the fields of an entry
+        create (Callable): Function to create the new entries
+        update (Callable): Function to update the changed entries, returns the names
+            of the entries which are not in the database
+    """
+    file_name = Path(result.file_path).name
+    if not Path(result.file_path).is_file():
+        config.logger.debug(f"During import, file {result.file_path} don't exist")
+        return
+    file_digest = await asyncio.to_thread(hash_file, result.file_path)
+    stored = await get_content_hashes(config, result.file_path)
+    if stored.get(FILE_ENTRY) == file_digest:
+        result.success = True
+        result.summary = f"{file_name} is unchanged."
+        return
+    await load_yaml(config, result, schema)
+    if result.data is None:
+        return
+    diff = await asyncio.to_thread(diff_entries, result.data, stored)
+    result.errors.extend(
+        f"{file_name} ({name}): duplicate name, entry skipped" for name in diff.duplicates
+    )
+    missing = await update(config, diff.changed) if diff.changed else []
+    if missing is None:
+        return
+    result.data = diff.new + [entry for entry in diff.changed if entry["name"] in missing]
+    if result.data:
+        await create(config, result)
+        if not result.success:
+            return
+    result.success = True
+    if not result.errors:
+        diff.hashes[FILE_ENTRY] = file_digest
+    await store_content_hashes(config, result.file_path, diff.hashes)
+    result.summary = diff.summary(file_name)
 
 
 async def import_data(interaction: Interaction, config: Configuration):
@@ -67,12 +376,20 @@ async def import_data(interaction: Interaction, config: Configuration):
     try:
         result_genre = ImportResult(data=None, file_path="files/genre.yml")
         result_character = ImportResult(data=None, file_path="files/character.yml")
-        await load_yaml(config, result_genre)
-        if result_genre.data:
-            await create_genre_from_input(config, result_genre)
-        await load_yaml(config, result_character)
-        if result_character.data:
-            await create_character_from_input(config, result_character)
+        await import_content_file(
+            config,
+            result_genre,
+            GENRE_SCHEMA,
+            create_genre_from_input,
+            update_genres_from_input,
+        )
+        await import_content_file(
+            config,
+            result_character,
+            CHARACTER_SCHEMA,
+            create_character_from_input,
+            update_characters_from_input,
+        )
         context = {
             "genre_status": ("successful" if result_genre.success else "unsuccessful"),
             "genre_number": result_genre.import_number,
@@ -89,25 +406,33 @@ async def import_data(interaction: Interaction, config: Configuration):
             f"and {context["char_number"]} records were imported."
             f"{result_character.text_character}"
         )
-        await interaction.response.send_message(
-            limit_text(message, DC_MAX_CHAR_MESSAGE), ephemeral=True
+        summaries = " ".join(
+            result.summary for result in (result_genre, result_character) if result.summary
+        )
+        if summaries:
+            message += f" {summaries}"
+        errors = result_genre.errors + result_character.errors
+        if errors:
+            message += f" {len(errors)} invalid entries were skipped: {"; ".join(errors)}"
+        await send_interaction_message(
+            interaction, limit_text(message, DC_MAX_CHAR_MESSAGE), ephemeral=True
         )
     except FileNotFoundError:
         config.logger.opt(exception=sys.exc_info()).error("File not found.")
-        await interaction.response.send_message(
-            "A required file was not found.", ephemeral=True
+        await send_interaction_message(
+            interaction, "A required file was not found.", ephemeral=True
         )
     except yaml.YAMLError:
         config.logger.opt(exception=sys.exc_info()).error(
             "Error parsing the YAML file."
         )
-        await interaction.response.send_message(
-            "Error parsing the YAML file", ephemeral=True
+        await send_interaction_message(
+            interaction, "Error parsing the YAML file", ephemeral=True
         )
     except PermissionError:
         config.logger.opt(exception=sys.exc_info()).error("No access rights.")
-        await interaction.response.send_message(
-            "Access rights to a file are missing.", ephemeral=True
+        await send_interaction_message(
+            interaction, "Access rights to a file are missing.", ephemeral=True
         )
     except HTTPException:
         config.logger.opt(exception=sys.exc_info()).error(
@@ -4,9 +4,12 @@ Module to handle game creation and management
 
 import sys
 from datetime import datetime, timezone
+from functools import partial
+from dataclasses import dataclass
 import asyncio
 import discord
 from discord import Interaction
+from sqlalchemy.exc import SQLAlchemyError
 from .discord_utils import (
     send_channel_message,
     update_embed_message,
@@ -16,9 +19,11 @@ from .discord_utils import (
     send_game_embed,
     create_dc_message_link,
     send_game_info_embed,
+    send_channel_file,
 )
 from .discord_permissions import check_permissions_storyteller
 from .configuration import Configuration, ProcessInput, IdError
+from .command_runner import send_interaction_message, report_progress
 from .llm_handler import request_openai, OpenAiContext
 from .db_classes import StoryType, GameStatus
 from .db_classes import (
@@ -34,8 +39,8 @@ from .db import (
     get_all_running_games,
     get_all_running_user_games,
     get_tale_from_game_id,
+    get_tale_for_turn,
     get_games_w_status,
-    count_regist_char_from_game,
     get_character_from_game_id,
     get_stories_messages_for_ai,
     channel_id_exist,
@@ -57,6 +62,62 @@ from .game_start import (
     get_second_phase_prompt,
 )
 from .game_telling import telling_event, telling_fiction
+from .unit_of_work import unit_of_work
+from .tale_export import ExportFormat, chapter_heading, export_tale
+from .tale_chapters import create_chapters, get_chapters
+from .constants import DC_MAX_FILE_SIZE
+from .pagination import PageDirection
+
+SETUP_GAME_STATUS = [GameStatus.CREATED, GameStatus.RUNNING, GameStatus.PAUSED]
+RESET_GAME_STATUS = [GameStatus.PAUSED, GameStatus.RUNNING]
+FINISH_GAME_STATUS = [GameStatus.STOPPED]
+INFO_GAME_STATUS = list(GameStatus)
+
+
+async def load_games_w_status(
+    config: Configuration, process_data: ProcessInput, status: list[GameStatus]
+) -> None:
+    """
+    Function sets the page loader for games with the handed over status and loads
+    the first page for the game selection.
+
+    Args:
+        config (Configuration): App configuration
+        process_data (ProcessInput): Input collection object
+        status (list[GameStatus]): Status of the selectable games
+    """
+    game_context = process_data.game_context
+    game_context.selectable_status = status
+    game_context.page_loader = partial(
+        get_games_w_status, config, status, game_context.page
+    )
+    game_context.available_games = await game_context.page_loader(PageDirection.FIRST)
+
+
+async def load_running_games(
+    config: Configuration, process_data: ProcessInput, storyteller: bool
+) -> None:
+    """
+    Function sets the page loader for the running games and loads the first page for
+    the game selection. A storyteller can select all running games, a player only the
+    running games with an own character.
+
+    Args:
+        config (Configuration): App configuration
+        process_data (ProcessInput): Input collection object
+        storyteller (bool): User has the permissions of a storyteller
+    """
+    game_context = process_data.game_context
+    if storyteller:
+        game_context.page_loader = partial(get_all_running_games, config, game_context.page)
+    else:
+        game_context.page_loader = partial(
+            get_all_running_user_games,
+            config,
+            process_data.user_context.user_dc_id,
+            game_context.page,
+        )
+    game_context.available_games = await game_context.page_loader(PageDirection.FIRST)
 
 
 async def collect_all_game_contexts(
@@ -72,7 +133,8 @@ async def collect_all_game_contexts(
     """
     try:
         user_view = UserSelectView(config, process_data)
-        await interaction.response.send_message(
+        await send_interaction_message(
+            interaction,
             "Please select all players for the new story.",
             view=user_view,
             ephemeral=True,
@@ -142,7 +204,8 @@ async def create_game(interaction: Interaction, config: Configuration):
     """
     try:
         if await channel_id_exist(config, interaction.channel_id):
-            await interaction.response.send_message(
+            await send_interaction_message(
+                interaction,
                 (
                     "In this channel is a Tale ongoing and no new Tale can created. "
                     "Please select another channel."
@@ -160,22 +223,23 @@ async def create_game(interaction: Interaction, config: Configuration):
         genre = await get_genre_double_cond(
             config, process_data.game_context.start.selected_genre
         )
-        processed_user_list = await process_player(
-            config, process_data.game_context.start.selected_user
-        )
-        tale = TALE(genre=genre)
-        game = GAME(
-            name=process_data.game_context.start.game_name,
-            description=process_data.game_context.start.game_description,
-            start_date=datetime.now(timezone.utc),
-            tale=tale,
-        )
-        await update_db_objs(config, [game])
-        associations = [
-            UserGameCharacterAssociation(game_id=game.id, user_id=user.id)
-            for user in processed_user_list
-        ]
-        await update_db_objs(config, associations)
+        async with unit_of_work(config):
+            processed_user_list = await process_player(
+                config, process_data.game_context.start.selected_user
+            )
+            tale = TALE(genre_id=genre.id)
+            game = GAME(
+                name=process_data.game_context.start.game_name,
+                description=process_data.game_context.start.game_description,
+                start_date=datetime.now(timezone.utc),
+                tale=tale,
+            )
+            await update_db_objs(config, [game])
+            associations = [
+                UserGameCharacterAssociation(game_id=game.id, user_id=user.id)
+                for user in processed_user_list
+            ]
+            await update_db_objs(config, associations)
         message = await send_game_embed(
             interaction, config, game, genre, processed_user_list
         )
@@ -216,16 +280,33 @@ async def keep_telling_schedule(interaction: Interaction, config: Configuration)
     try:
         process_data = ProcessInput()
         process_data.user_context.user_dc_id = str(interaction.user.id)
-        if await check_permissions_storyteller(config, interaction):
-            await get_all_running_games(config, process_data)
-        else:
-            await get_all_running_user_games(config, process_data)
+        await load_running_games(
+            config, process_data, await check_permissions_storyteller(config, interaction)
+        )
         select_success = await interface_select_game(interaction, config, process_data)
         if not select_success:
             return
-        process_data.story_context.tale = await get_tale_from_game_id(
+        process_data.story_context.tale = await get_tale_for_turn(
             config, process_data.game_context.selected_game_id
         )
+        if (
+            process_data.story_context.tale is None
+            or process_data.story_context.tale.genre is None
+        ):
+            config.logger.error(
+                "No tale or genre found for game with ID: "
+                + f"{process_data.game_context.selected_game_id}"
+            )
+            await send_interaction_message(
+                interaction,
+                f"The game with the ID: {process_data.game_context.selected_game_id} "
+                + "is not available for this command.",
+                ephemeral=True,
+            )
+            return
+        process_data.story_context.sampler = config.genre_cache.get_sampler(
+            process_data.story_context.tale.genre
+        )
         telling_view = KeepTellingButtonView(config, process_data)
 
         await interaction.followup.send(view=telling_view, ephemeral=True)
@@ -293,6 +374,7 @@ async def start_game_schedule(
 
         messages = await get_first_phase_prompt(config, game_data)
 
+        await report_progress(interaction, "The storyteller is creating the world...")
         response_world: OpenAiContext = await request_openai(config, messages)
         if not await response_world.error_free():
             await interaction.followup.send(
@@ -339,6 +421,7 @@ async def start_game_schedule(
             )
 
         messages.extend(messages_second_phase)
+        await report_progress(interaction, "The storyteller is writing the beginning...")
         response_start = await request_openai(config, messages)
         if not await response_start.error_free():
             await interaction.followup.send(
@@ -372,7 +455,9 @@ async def start_game_schedule(
         return False
 
 
-async def setup_game(interaction: Interaction, config: Configuration) -> None:
+async def setup_game(
+    interaction: Interaction, config: Configuration, game_id: int | None = None
+) -> None:
     """
     Function game status with a select menu to choose the game status. The game status can be
     switched based on the current status of the game.
@@ -380,19 +465,16 @@ async def setup_game(interaction: Interaction, config: Configuration) -> None:
     Args:
         config (Configuration): App configuration
         interaction (Interaction): Interaction object
+        game_id (int | None, optional): Game selected with the autocomplete.
+            Defaults to None.
     """
     try:
         process_data = ProcessInput()
-        process_data.game_context.available_games = await get_games_w_status(
-            config,
-            [
-                GameStatus.CREATED,
-                GameStatus.RUNNING,
-                GameStatus.PAUSED,
-            ],
-        )
+        process_data.game_context.selected_game_id = game_id or 0
+        await load_games_w_status(config, process_data, SETUP_GAME_STATUS)
         if not await process_data.game_context.input_valid_game():
-            await interaction.response.send_message(
+            await send_interaction_message(
+                interaction,
                 "No game is available, please contact a Mod.",
                 ephemeral=True,
             )
@@ -409,10 +491,7 @@ async def setup_game(interaction: Interaction, config: Configuration) -> None:
         )
         await game_select_view.wait()
         if await process_data.game_context.request_game_start():
-            counted_participants = await count_regist_char_from_game(
-                config, process_data.game_context.selected_game.id
-            )
-            if counted_participants == 0:
+            if not process_data.game_context.selected_game.registered_characters:
                 await interaction.followup.send(
                     "You have selected that the game with the ID: "
                     + f"{process_data.game_context.selected_game_id}. "
@@ -451,7 +530,9 @@ async def setup_game(interaction: Interaction, config: Configuration) -> None:
         )
 
 
-async def reset_game(interaction: Interaction, config: Configuration) -> None:
+async def reset_game(
+    interaction: Interaction, config: Configuration, game_id: int | None = None
+) -> None:
     """
     This function resets a game and generates a new start story.
     Only possible if stories in the game with the status INIT.
@@ -459,11 +540,12 @@ async def reset_game(interaction: Interaction, config: Configuration) -> None:
     Args:
         interaction (Interaction): Discrod interaction
         config (Configuration): App configuration
+        game_id (int | None, optional): Game selected with the autocomplete.
+            Defaults to None.
     """
     process_data = ProcessInput()
-    process_data.game_context.available_games = await get_games_w_status(
-        config, [GameStatus.PAUSED, GameStatus.RUNNING]
-    )
+    process_data.game_context.selected_game_id = game_id or 0
+    await load_games_w_status(config, process_data, RESET_GAME_STATUS)
     select_success = await interface_select_game(interaction, config, process_data)
     if not select_success:
         return
@@ -489,22 +571,157 @@ async def reset_game(interaction: Interaction, config: Configuration) -> None:
     )
 
 
-async def finish_game(interaction: Interaction, config: Configuration) -> None:
+@dataclass
+class FinishOptions:
+    """
+    Class with the options of the command to finish a game.
+    """
+
+    export_format: ExportFormat = ExportFormat.PDF
+    create_chapter: bool = True
+    finish_prompt: str = ""
+
+
+async def report_publish_result(
+    config: Configuration, game: GAME, interaction: Interaction | None, text: str
+) -> None:
+    """
+    This function reports a result of the publishing to the user of the command. In
+    the background the result is logged as warning and posted to the game channel.
+
+    Args:
+        config (Configuration): App configuration
+        game (GAME): Finished game
+        interaction (Interaction | None): Discord interaction or None in the background
+        text (str): Result for the user
     """
-    This function finishes a game and generates a PDF with the story so far.
+    if interaction is not None:
+        await send_interaction_message(interaction, text, ephemeral=True)
+        return
+    config.logger.warning(f"Game {game.id}: {text}")
+    if game.channel_id is not None:
+        await send_channel_message(config, game.channel_id, text)
+
+
+async def publish_tale(
+    config: Configuration,
+    game: GAME,
+    export_format: ExportFormat,
+    interaction: Interaction | None = None,
+) -> None:
+    """
+    This function exports the story of a finished game and uploads the file with the
+    chapters to the game channel. A game without channel gets the file as answer of
+    the interaction. Failures are reported with report_publish_result.
+
+    Args:
+        config (Configuration): App configuration
+        game (GAME): Finished game
+        export_format (ExportFormat): Format of the exported story
+        interaction (Interaction | None, optional): Discord interaction of the command,
+            None in the background. Defaults to None.
+    """
+    try:
+        file_path = await export_tale(config, game, export_format)
+    except (OSError, SQLAlchemyError):
+        config.logger.opt(exception=sys.exc_info()).error(
+            f"Error while exporting the story of game {game.id}."
+        )
+        await report_publish_result(
+            config, game, interaction, "The game is finished, but the story could not be exported."
+        )
+        return
+    if file_path.stat().st_size > DC_MAX_FILE_SIZE:
+        await report_publish_result(
+            config,
+            game,
+            interaction,
+            f"The story is too large to upload and is saved as {file_path}.",
+        )
+        return
+    message = f"The story of the game {game.name} is finished."
+    if game.channel_id is None:
+        if interaction is not None:
+            await send_interaction_message(interaction, message, file=discord.File(file_path))
+            return
+        await report_publish_result(
+            config,
+            game,
+            interaction,
+            f"The game has no channel, the story is saved as {file_path}.",
+        )
+        return
+    chapters = await get_chapters(config, game.tale_id)
+    if await send_channel_file(config, game.channel_id, str(file_path), message) is None:
+        await report_publish_result(
+            config, game, interaction, f"The upload failed, the story is saved as {file_path}."
+        )
+        return
+    if chapters:
+        await send_channel_message(
+            config,
+            game.channel_id,
+            "\n".join(
+                chapter_heading(chapter.number, chapter.title) for chapter in chapters
+            ),
+        )
+    if interaction is not None:
+        await send_interaction_message(
+            interaction,
+            f"The story of the game {game.name} is uploaded to the game channel.",
+            ephemeral=True,
+        )
+
+
+async def finish_game_schedule(
+    config: Configuration, game: GAME, export_format: ExportFormat, finish_prompt: str
+) -> None:
+    """
+    Background function to write the chapters of a finished game and to publish the
+    story afterwards. The chapters are written in parallel with a limited number of
+    requests, so the turns of the running games are not blocked.
+
+    Args:
+        config (Configuration): App configuration
+        game (GAME): Finished game
+        export_format (ExportFormat): Format of the exported story
+        finish_prompt (str): Additional instruction for the chapters
+    """
+    try:
+        chapters = await create_chapters(config, game.tale_id, finish_prompt)
+        config.logger.info(f"Wrote {len(chapters)} chapters of game {game.id}.")
+    except SQLAlchemyError:
+        config.logger.opt(exception=sys.exc_info()).error(
+            f"Error while writing the chapters of game {game.id}."
+        )
+    await publish_tale(config, game, export_format)
+
+
+async def finish_game(
+    interaction: Interaction,
+    config: Configuration,
+    game_id: int | None = None,
+    options: FinishOptions | None = None,
+) -> None:
+    """
+    This function finishes a game and exports the story as file to the game channel.
     The game status will be set to finished. It is not possible to keep
-    telling a story after finishing the game.
+    telling a story after finishing the game. The chapters are written in the
+    background, so the story is posted when they are done.
     Args:
         interaction (Interaction): Discord interaction object
         config (Configuration): App configuration
+        game_id (int | None, optional): Game selected with the autocomplete.
+            Defaults to None.
+        options (FinishOptions | None, optional): Export format and chapter options.
+            Defaults to None for the default options.
     """
+    options = options or FinishOptions()
     process_data = ProcessInput()
-    process_data.game_context.available_games = await get_games_w_status(
-        config,
-        [
-            GameStatus.STOPPED,
-        ],
-    )
+    process_data.game_context.selected_game_id = game_id or 0
+    process_data.game_context.finish.create_chapter = options.create_chapter
+    process_data.game_context.finish.finish_prompt = options.finish_prompt
+    await load_games_w_status(config, process_data, FINISH_GAME_STATUS)
     select_success = await interface_select_game(interaction, config, process_data)
     if not select_success:
         return
@@ -517,28 +734,44 @@ async def finish_game(interaction: Interaction, config: Configuration) -> None:
         ephemeral=True,
     )
     await game_finish_view.wait()
+    finish = process_data.game_context.finish
+    if not finish.finish_confirmed:
+        return
+    game = process_data.game_context.selected_game
+    game.status = GameStatus.FINISHED
+    game.end_date = datetime.now(timezone.utc)
+    await update_db_objs(config, [game])
+    if finish.create_chapter:
+        config.background_tasks.start(
+            finish_game_schedule(config, game, options.export_format, finish.finish_prompt),
+            name=f"finish-game-{game.id}",
+        )
+        await send_interaction_message(
+            interaction,
+            "The chapters are written in the background, the story will be posted in "
+            + "the game channel when they are done.",
+            ephemeral=True,
+        )
+        return
+    await report_progress(interaction, "Export the story of the game.")
+    await publish_tale(config, game, options.export_format, interaction)
 
 
-async def info_game(interaction: Interaction, config: Configuration) -> None:
+async def info_game(
+    interaction: Interaction, config: Configuration, game_id: int | None = None
+) -> None:
     """
     This function prints information about a game like state, players, etc.
 
     Args:
         interaction (Interaction): Discrod interaction
         config (Configuration): App configuration
+        game_id (int | None, optional): Game selected with the autocomplete.
+            Defaults to None.
     """
     process_data = ProcessInput()
-    process_data.game_context.available_games = await get_games_w_status(
-        config,
-        [
-            GameStatus.CREATED,
-            GameStatus.PAUSED,
-            GameStatus.RUNNING,
-            GameStatus.STOPPED,
-            GameStatus.FINISHED,
-            GameStatus.FAILURE,
-        ],
-    )
+    process_data.game_context.selected_game_id = game_id or 0
+    await load_games_w_status(config, process_data, INFO_GAME_STATUS)
     select_success = await interface_select_game(interaction, config, process_data)
     if not select_success:
         return
@@ -8,6 +8,7 @@ from .configuration import Configuration, ProcessInput, DelimitedTemplate, IdErr
 from .db import get_stories_messages_for_ai, update_db_objs
 from .db_classes import STORY, StoryType, MESSAGE
 from .llm_handler import request_openai
+from .command_runner import report_progress
 from .constants import (
     PROMPT_MAX_WORDS_EVENT,
     PROMPT_MAX_WORDS_FICTION,
@@ -47,6 +48,7 @@ async def telling_event(
                 tale_id=process_data.story_context.tale.id,
             )
         )
+        await report_progress(interaction, "The storyteller is writing the story...")
         response_event = await request_openai(config, messages)
         if not await response_event.error_free():
             await interaction.followup.send(
@@ -116,6 +118,7 @@ async def telling_fiction(
                 tale_id=process_data.story_context.tale.id,
             )
         )
+        await report_progress(interaction, "The storyteller is writing the story...")
         response_fiction = await request_openai(config, messages)
         if not await response_fiction.error_free():
             await interaction.followup.send(
@@ -3,11 +3,139 @@ This module contains all view for game creation and general game handling.
 """
 
 import sys
+import abc
+import copy
+from typing import Awaitable, Callable
 import discord
 from .db_classes import GENRE, StoryType, GameStatus, StartCondition
 from .configuration import Configuration, ProcessInput
 from .file_utils import limit_text
 from .constants import DC_DESCRIPTION_MAX_CHAR
+from .pagination import PageContext, PageDirection, paginate_items
+
+
+class PageSearchModal(discord.ui.Modal, title="Search by name"):
+    """
+    Modal class to enter the name prefix to filter a paged select menu.
+    """
+
+    def __init__(self, parent_view: "PagedSelectView"):
+        super().__init__()
+        self.parent_view = parent_view
+        self.prefix_input = discord.ui.TextInput(
+            label="Name starts with",
+            placeholder="Leave empty to show all entries.",
+            required=False,
+            max_length=DC_DESCRIPTION_MAX_CHAR,
+            style=discord.TextStyle.short,
+        )
+        self.add_item(self.prefix_input)
+
+    async def on_submit(  # pylint: disable=arguments-differ
+        self, interaction: discord.Interaction
+    ):
+        await self.parent_view.search(interaction, self.prefix_input.value.strip())
+
+
+class PagedSelectView(discord.ui.View, metaclass=abc.ABCMeta):
+    """
+    View class with a select menu and buttons to browse large lists page by page and
+    to search by name. Subclasses must define how the select menu is created and where
+    the entries of a page are stored. Without page loader the buttons are removed.
+    """
+
+    def __init__(
+        self,
+        config: Configuration,
+        page: PageContext,
+        page_loader: Callable[[PageDirection], Awaitable[list]] | None,
+    ):
+        super().__init__()
+        self.config = config
+        self.page = page
+        self.page_loader = page_loader
+        self.select: discord.ui.Select = None
+        if page_loader is None:
+            self.clear_items()
+
+    @abc.abstractmethod
+    def create_select(self) -> discord.ui.Select:
+        """
+        Function creates the select menu for the entries of the current page.
+        """
+
+    @abc.abstractmethod
+    def set_items(self, items: list) -> None:
+        """
+        Function stores the entries of the current page.
+        """
+
+    def refresh(self) -> None:
+        """
+        Function replaces the select menu and updates the state of the buttons.
+        """
+        if self.select is not None:
+            self.remove_item(self.select)
+        self.select = self.create_select()
+        self.add_item(self.select)
+        self.button_prev.disabled = not self.page.has_prev
+        self.button_next.disabled = not self.page.has_next
+
+    async def change_page(
+        self, interaction: discord.Interaction, direction: PageDirection
+    ) -> None:
+        """
+        Function loads the page in the handed over direction and updates the message.
+        """
+        self.set_items(await self.page_loader(direction))
+        self.refresh()
+        await interaction.response.edit_message(view=self)
+
+    async def search(self, interaction: discord.Interaction, prefix: str) -> None:
+        """
+        Function loads the first page of entries starting with the handed over prefix.
+        If nothing is found, the current page is kept.
+        """
+        previous_page = copy.copy(self.page)
+        self.page.name_prefix = prefix
+        items = await self.page_loader(PageDirection.FIRST)
+        if not items:
+            self.page.__dict__.update(previous_page.__dict__)
+            self.config.logger.debug(f"No entries found for name prefix: {prefix}")
+            await interaction.response.send_message(
+                f"No entry found with a name starting with: {prefix}", ephemeral=True
+            )
+            return
+        self.set_items(items)
+        self.refresh()
+        await interaction.response.edit_message(view=self)
+
+    @discord.ui.button(label="Previous", emoji="◀️", row=1)
+    async def button_prev(
+        self, interaction: discord.Interaction, _: discord.ui.Button
+    ):
+        """
+        Callback function when the previous button is clicked.
+        """
+        await self.change_page(interaction, PageDirection.PREV)
+
+    @discord.ui.button(label="Next", emoji="▶️", row=1)
+    async def button_next(
+        self, interaction: discord.Interaction, _: discord.ui.Button
+    ):
+        """
+        Callback function when the next button is clicked.
+        """
+        await self.change_page(interaction, PageDirection.NEXT)
+
+    @discord.ui.button(label="Search", emoji="🔍", row=1)
+    async def button_search(
+        self, interaction: discord.Interaction, _: discord.ui.Button
+    ):
+        """
+        Callback function when the search button is clicked.
+        """
+        await interaction.response.send_modal(PageSearchModal(self))
 
 
 class GameSelect(discord.ui.Select):
@@ -50,14 +178,25 @@ class GameSelect(discord.ui.Select):
         self.view.stop()
 
 
-class GameSelectView(discord.ui.View):
+class GameSelectView(PagedSelectView):
     """
-    View class to select a genre for a new game.
+    View class to select a game, large lists are loaded page by page.
     """
 
     def __init__(self, config, process_data: ProcessInput):
-        super().__init__()
-        self.add_item(GameSelect(config, process_data))
+        super().__init__(
+            config,
+            process_data.game_context.page,
+            process_data.game_context.page_loader,
+        )
+        self.process_data = process_data
+        self.refresh()
+
+    def create_select(self) -> discord.ui.Select:
+        return GameSelect(self.config, self.process_data)
+
+    def set_items(self, items: list) -> None:
+        self.process_data.game_context.available_games = items
 
 
 class GenreSelect(discord.ui.Select):
@@ -100,14 +239,29 @@ class GenreSelect(discord.ui.Select):
         self.view.stop()
 
 
-class GenreSelectView(discord.ui.View):
+class GenreSelectView(PagedSelectView):
     """
-    View class to select a genre for a new game.
+    View class to select a genre for a new game, large lists are shown page by page.
     """
 
     def __init__(self, config, process_data: ProcessInput, genres: list[GENRE]):
-        super().__init__()
-        self.add_item(GenreSelect(config, process_data, genres))
+        super().__init__(config, PageContext(), self.load_page)
+        self.process_data = process_data
+        self.genres = genres
+        self.page_genres = paginate_items(genres, self.page, PageDirection.FIRST)
+        self.refresh()
+
+    async def load_page(self, direction: PageDirection) -> list[GENRE]:
+        """
+        Function returns the requested page of the handed over genres.
+        """
+        return paginate_items(self.genres, self.page, direction)
+
+    def create_select(self) -> discord.ui.Select:
+        return GenreSelect(self.config, self.process_data, self.page_genres)
+
+    def set_items(self, items: list) -> None:
+        self.page_genres = items
 
 
 class GameInfoModal(discord.ui.Modal, title="Please enter the last game information"):
@@ -2,21 +2,24 @@
 
 import sys
 import asyncio
+from functools import partial
 import discord
 from discord import Interaction
-from .db import (
-    update_db_objs,
-)
 from .db_genre import (
     get_loaded_genre_from_id,
     get_active_genre,
     deactivate_genre_with_id,
     get_inactive_genre,
     activate_genre_with_id,
+    get_genre_page,
+    add_genre_content,
 )
 from .db_classes import EVENT, INSPIRATIONALWORD
 from .file_utils import limit_text
 from .configuration import Configuration, GenreContext
+from .command_runner import send_interaction_message
+from .game_views import PagedSelectView
+from .pagination import PageDirection
 from .constants import (
     DC_MODAL_INPUT_EVENT_TEXT_MAX_CHAR,
     DC_MODAL_INPUT_EVENT_TEXT_MIN_CHAR,
@@ -25,14 +28,21 @@ from .constants import (
 )
 
 
-class GenreSelectView(discord.ui.View):
+class GenreSelectView(PagedSelectView):
     """
-    View class to select a genre for a new game.
+    View class to select a genre, large lists are shown page by page.
     """
 
     def __init__(self, config, process_data: GenreContext):
-        super().__init__()
-        self.add_item(GenreSelect(config, process_data))
+        super().__init__(config, process_data.page, process_data.page_loader)
+        self.process_data = process_data
+        self.refresh()
+
+    def create_select(self) -> discord.ui.Select:
+        return GenreSelect(self.config, self.process_data)
+
+    def set_items(self, items: list) -> None:
+        self.process_data.available_genre = items
 
 
 class GenreSelect(discord.ui.Select):
@@ -78,6 +88,41 @@ class GenreSelect(discord.ui.Select):
         self.view.stop()
 
 
+async def preselected_genre(
+    interaction: Interaction, config: Configuration, genre_context: GenreContext
+) -> None:
+    """
+    This function checks the genre which was already selected with the autocomplete of
+    the command parameter and sends the first response instead of the select menu.
+
+    Args:
+        interaction (Interaction): Dicord interaction object
+        config (Configuration): App configuration
+        genre_context (GenreContext): Genre context object with the selected genre id
+    """
+    if not any(
+        genre.id == genre_context.selected_genre_id
+        for genre in genre_context.available_genre
+    ):
+        config.logger.debug(
+            f"Genre with ID: {genre_context.selected_genre_id} is not selectable."
+        )
+        await send_interaction_message(
+            interaction,
+            f"The genre with the ID: {genre_context.selected_genre_id} is not available "
+            + "for this command.",
+            ephemeral=True,
+        )
+        return
+    genre_context.selected_genre = await get_loaded_genre_from_id(
+        config, genre_context.selected_genre_id
+    )
+    await send_interaction_message(
+        interaction,
+        f"You have chosen the genre {genre_context.selected_genre.name}", ephemeral=True
+    )
+
+
 async def single_genre_selection(
     interaction: Interaction, config: Configuration, genre_context: GenreContext
 ) -> None:
@@ -93,14 +138,25 @@ async def single_genre_selection(
     try:
         if not await genre_context.input_valid_genre():
             config.logger.debug("Call function with no available genre.")
-            await interaction.response.send_message(
+            await send_interaction_message(
+                interaction,
                 "No genre available for the called command, please contact a Mod.",
                 ephemeral=True,
             )
             return
+        if genre_context.selected_genre_id:
+            await preselected_genre(interaction, config, genre_context)
+            return
 
+        genre_context.page_loader = partial(
+            get_genre_page, genre_context.available_genre, genre_context.page
+        )
+        genre_context.available_genre = await genre_context.page_loader(
+            PageDirection.FIRST
+        )
         genre_select_view = GenreSelectView(config, genre_context)
-        await interaction.response.send_message(
+        await send_interaction_message(
+            interaction,
             "Please select a genre for your command:",
             view=genre_select_view,
             ephemeral=True,
@@ -125,16 +181,21 @@ async def single_genre_selection(
         config.logger.opt(exception=sys.exc_info()).error("Timeout error occurred.")
 
 
-async def deactivate_genre(interaction: Interaction, config: Configuration) -> None:
+async def deactivate_genre(
+    interaction: Interaction, config: Configuration, genre_id: int | None = None
+) -> None:
     """
     This function allows the user to deactivate a genre.
 
     Args:
         interaction (Interaction): Discord interaction object
         config (Configuration): App configuration
+        genre_id (int | None, optional): Genre selected with the autocomplete.
+            Defaults to None.
     """
     try:
         process_data = GenreContext()
+        process_data.selected_genre_id = genre_id or 0
         process_data.available_genre = await get_active_genre(config)
         await single_genre_selection(interaction, config, process_data)
 
@@ -161,16 +222,21 @@ async def deactivate_genre(interaction: Interaction, config: Configuration) -> N
         config.logger.opt(exception=sys.exc_info()).error("Timeout error occurred.")
 
 
-async def activate_genre(interaction: Interaction, config: Configuration) -> None:
+async def activate_genre(
+    interaction: Interaction, config: Configuration, genre_id: int | None = None
+) -> None:
     """
     This function allows the user to activate a genre.
 
     Args:
         interaction (Interaction): Discord interaction object
         config (Configuration): App configuration
+        genre_id (int | None, optional): Genre selected with the autocomplete.
+            Defaults to None.
     """
     try:
         process_data = GenreContext()
+        process_data.selected_genre_id = genre_id or 0
         process_data.available_genre = await get_inactive_genre(config)
 
         await single_genre_selection(interaction, config, process_data)
@@ -251,13 +317,17 @@ class AddEventToGenreModal(discord.ui.Modal, title="Define a new event for the g
                 f"Event chance input is invalid: '{self.chance.value}'"
             )
             return
-        self.genre_context.selected_genre.events.append(
-            EVENT(text=self.text.value, chance=int(self.chance.value))
-        )
-        self.config.logger.debug(
-            f"New event is generated for genre id: {self.genre_context.selected_genre.id}"
-        )
-        await update_db_objs(self.config, [self.genre_context.selected_genre])
+        genre = self.genre_context.selected_genre
+        if not await add_genre_content(
+            self.config,
+            genre.id,
+            [EVENT(text=self.text.value, chance=int(self.chance.value))],
+        ):
+            await interaction.response.send_message(
+                "The event could not be added, please contact a Mod.", ephemeral=True
+            )
+            return
+        self.config.logger.debug(f"New event is generated for genre id: {genre.id}")
         await interaction.response.send_message(
             content=f"Event added successfully to genre: {self.genre_context.selected_genre.name}",
         )
@@ -353,14 +423,19 @@ class AddWordsToGenreModal(discord.ui.Modal, title="Define new words for the gen
                 + ", ".join(valid_words.keys())
                 + "]."
             )
-            for word, chance in valid_words.items():
-                self.genre_context.selected_genre.inspirational_words.append(
+            if await add_genre_content(
+                self.config,
+                self.genre_context.selected_genre.id,
+                [
                     INSPIRATIONALWORD(text=word, chance=chance)
+                    for word, chance in valid_words.items()
+                ],
+            ):
+                self.config.logger.debug(
+                    f"New words are generated for genre id: {self.genre_context.selected_genre.id}"
                 )
-            await update_db_objs(self.config, [self.genre_context.selected_genre])
-            self.config.logger.debug(
-                f"New words are generated for genre id: {self.genre_context.selected_genre.id}"
-            )
+            else:
+                valid_text = "The words could not be added, please contact a Mod."
         if faulty_words:
             faulty_text = (
                 "The input fields did not contain or had an incorrect input format: ["
@@ -416,7 +491,7 @@ class UpdateContentButtonView(discord.ui.View):
 
 
 async def update_genre_with_content(
-    interaction: Interaction, config: Configuration
+    interaction: Interaction, config: Configuration, genre_id: int | None = None
 ) -> None:
     """
     This function allows the user to update genre content.
@@ -424,8 +499,11 @@ async def update_genre_with_content(
     Args:
         interaction (Interaction): Discord interaction object
         config (Configuration): App configuration
+        genre_id (int | None, optional): Genre selected with the autocomplete.
+            Defaults to None.
     """
     genre_context = GenreContext()
+    genre_context.selected_genre_id = genre_id or 0
     genre_context.available_genre = await get_active_genre(config)
     await single_genre_selection(interaction, config, genre_context)
     if genre_context.selected_genre is None:
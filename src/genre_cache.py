@@ -0,0 +1,132 @@
+"""
+This module contains the process wide read-through cache for the genre catalog. Genres
+change rarely, so the complete catalog with all events and inspirational words is loaded
+once and served from memory until a write operation invalidates it.
+"""
+
+import random
+import asyncio
+from itertools import accumulate
+from typing import Awaitable, Callable
+from .db_classes import GENRE, EVENT, INSPIRATIONALWORD
+
+
+class GenreSampler:
+    """
+    Class to select weighted random events and inspirational words of a genre. The
+    cumulative weights are calculated once, so a selection is a binary search.
+    """
+
+    def __init__(self, genre: GENRE):
+        self.genre_id: int = genre.id
+        self.events: list[EVENT] = list(genre.events)
+        self.event_weights: list[int] = list(
+            accumulate(event.chance for event in self.events)
+        )
+        self.insp_words: list[INSPIRATIONALWORD] = list(genre.inspirational_words)
+        self.insp_word_weights: list[int] = list(
+            accumulate(word.chance for word in self.insp_words)
+        )
+
+    def random_event(self) -> EVENT | None:
+        """
+        Function selects a random event based on the weights of the events.
+
+        Returns:
+            EVENT | None: Selected event or None if the genre has no events
+        """
+        if not self.events:
+            return None
+        return random.choices(  # pylint: disable=no-member
+            self.events, cum_weights=self.event_weights, k=1
+        )[0]
+
+    def random_insp_word(self) -> INSPIRATIONALWORD | None:
+        """
+        Function selects a random inspirational word based on the weights of the words.
+
+        Returns:
+            INSPIRATIONALWORD | None: Selected word or None if the genre has no words
+        """
+        if not self.insp_words:
+            return None
+        return random.choices(  # pylint: disable=no-member
+            self.insp_words, cum_weights=self.insp_word_weights, k=1
+        )[0]
+
+
+class GenreCache:
+    """
+    Read-through cache for all genres with versioned invalidation. Every invalidation
+    increases the version, so a load that was started before an invalidation is not
+    stored and the next access loads the catalog again.
+    """
+
+    def __init__(self):
+        self.version: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._catalog: dict[int, GENRE] | None = None
+        self._samplers: dict[int, GenreSampler] = {}
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """
+        Function drops the cached catalog and increases the cache version.
+        """
+        self.version += 1
+        self._catalog = None
+        self._samplers = {}
+
+    async def get_catalog(
+        self, loader: Callable[[], Awaitable[list[GENRE]]]
+    ) -> dict[int, GENRE]:
+        """
+        Function returns the cached genre catalog and loads it with the handed over
+        loader in case of a cache miss.
+
+        Args:
+            loader (Callable[[], Awaitable[list[GENRE]]]): Function to load all genres
+
+        Returns:
+            dict[int, GENRE]: All genres mapped by id and sorted by id
+        """
+        if self._catalog is not None:
+            self.hits += 1
+            return self._catalog
+        async with self._lock:
+            if self._catalog is not None:
+                self.hits += 1
+                return self._catalog
+            self.misses += 1
+            version = self.version
+            catalog = {genre.id: genre for genre in await loader()}
+            if version == self.version:
+                self._catalog = catalog
+            return catalog
+
+    def get_sampler(self, genre: GENRE) -> GenreSampler:
+        """
+        Function returns the cached sampler for the handed over genre and creates it
+        on first use.
+
+        Args:
+            genre (GENRE): Genre with loaded events and inspirational words
+
+        Returns:
+            GenreSampler: Sampler for weighted events and inspirational words
+        """
+        sampler = self._samplers.get(genre.id)
+        if sampler is None:
+            sampler = GenreSampler(genre)
+            self._samplers[genre.id] = sampler
+        return sampler
+
+    def stats(self) -> dict[str, int]:
+        """
+        Function returns the current cache statistics.
+
+        Returns:
+            dict[str, int]: Version, hit and miss counter of the cache
+        """
+        return {"version": self.version, "hits": self.hits, "misses": self.misses}
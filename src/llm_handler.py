@@ -3,15 +3,10 @@ This module contains the function to handle requests to the OpenAI API.
 """
 
 import sys
-from openai import (
-    OpenAI,
-    OpenAIError,
-    APIConnectionError,
-    RateLimitError,
-    AuthenticationError,
-    InternalServerError,
-)
+import asyncio
+import importlib
 from .configuration import Configuration
+from .metrics import trace_span, SPAN_LLM
 
 
 class OpenAiContext:
@@ -39,28 +34,39 @@ async def request_openai(config: Configuration, messages: list) -> OpenAiContext
     Returns:
         OpenAiContext: The OpenAI response context
     """
+    # The OpenAI client takes most of the import time of the application, so it is
+    # imported with the first request instead of at startup.
+    import openai  # pylint: disable=import-outside-toplevel
+
     try:
-        client = OpenAI(
+        async with trace_span(config.metrics, SPAN_LLM), openai.AsyncOpenAI(
             base_url=config.env.base_url,
             api_key=config.env.api_key,
-        )
-
-        response = client.chat.completions.create(
-            model=config.env.model, reasoning_effort="high", messages=messages
-        )
+        ) as client:
+            response = await client.chat.completions.create(
+                model=config.env.model, reasoning_effort="high", messages=messages
+            )
         return OpenAiContext(response=response.choices[0].message.content)
-    except AuthenticationError:
+    except openai.AuthenticationError:
         config.logger.error("API key invalid or expired")
         return OpenAiContext(response="", error="API key invalid or expired")
-    except RateLimitError:
+    except openai.RateLimitError:
         config.logger.error("Rate limit reached, retry later")
         return OpenAiContext(response="", error="Rate limit reached, retry later")
-    except APIConnectionError:
+    except openai.APIConnectionError:
         config.logger.error("Failed to connect to API")
         return OpenAiContext(response="", error="Failed to connect to API")
-    except InternalServerError:
+    except openai.InternalServerError:
         config.logger.opt(exception=sys.exc_info()).error("OpenAI server error.")
         return OpenAiContext(response="", error="OpenAI server error")
-    except OpenAIError:
+    except openai.OpenAIError:
         config.logger.opt(exception=sys.exc_info()).error("OpenAI error.")
         return OpenAiContext(response="", error="OpenAI error")
+
+
+async def preload_openai() -> None:
+    """
+    This function imports the OpenAI client in a worker thread after the start, so the
+    first request does not block the event loop with the import.
+    """
+    await asyncio.to_thread(importlib.import_module, "openai")
@@ -0,0 +1,187 @@
+"""
+This module contains the watchdog of the event loop. The lag coroutine of the sampling
+profiler measures continuously how much later than planned the event loop wakes it up.
+A thread watches the heartbeat of the coroutine and records the stack of the event loop
+thread while it is blocked, so the synchronous call which blocked the loop is logged
+with the lag.
+"""
+
+import sys
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from time import perf_counter
+import environ
+from loguru import logger
+from .metrics import Metrics
+from .sampling_profiler import fold_stack, measure_lag
+
+LOGGED_FRAMES = 12
+
+
+@environ.config(prefix="LOOP")
+class LoopWatchdogConfiguration:
+    """
+    Configuration model for the watchdog of the event loop
+    """
+
+    watchdog: bool = environ.bool_var(True)
+    interval: float = environ.var(0.1, converter=float)
+    threshold_ms: int = environ.var(250, converter=int)
+    window: int = environ.var(3000, converter=int)
+
+
+@dataclass
+class BlockingCall:
+    """
+    Class with a blocking of the event loop and the stack of the loop thread during
+    the blocking.
+    """
+
+    time: datetime
+    lag: float
+    stack: list[str]
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """
+    Function returns the percentile of the values with the nearest rank method.
+
+    Args:
+        values (list[float]): Measured values
+        percent (float): Percentile between 0 and 100
+
+    Returns:
+        float: Value at the percentile or 0.0 without values
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class LoopWatchdog:  # pylint: disable=too-many-instance-attributes
+    """
+    Class to measure the scheduling lag of the event loop and to detect blocking calls.
+    """
+
+    def __init__(self, settings: LoopWatchdogConfiguration, metrics: Metrics | None = None):
+        self.settings = settings
+        self.metrics = metrics
+        self.lags: deque[float] = deque(maxlen=settings.window)
+        self.blocking: deque[BlockingCall] = deque(maxlen=10)
+        self.heartbeat = perf_counter()
+        self.blocked_stack: tuple[float, list[str]] | None = None
+        self._stop = threading.Event()
+
+    @property
+    def threshold(self) -> float:
+        """
+        Lag in seconds from which the event loop counts as blocked.
+        """
+        return self.settings.threshold_ms / 1000
+
+    def percentiles(self) -> dict[str, float]:
+        """
+        Function returns the percentiles of the measured lags in seconds.
+
+        Returns:
+            dict[str, float]: p50, p95, p99 and max of the lags
+        """
+        lags = list(self.lags)
+        return {
+            "p50": percentile(lags, 50),
+            "p95": percentile(lags, 95),
+            "p99": percentile(lags, 99),
+            "max": max(lags, default=0.0),
+        }
+
+    def report(self) -> str:
+        """
+        Function returns the percentiles of the lag and the last blocking calls.
+
+        Returns:
+            str: Report with one line per blocking call
+        """
+        lines = [
+            f"Loop lag of the last {len(self.lags)} measurements: "
+            + ", ".join(
+                f"{name} {value * 1000:.1f} ms" for name, value in self.percentiles().items()
+            )
+        ]
+        for call in reversed(self.blocking):
+            leaf = call.stack[-1] if call.stack else "unknown"
+            lines.append(f"{call.time:%Y-%m-%d %H:%M:%S} {call.lag * 1000:.0f} ms in {leaf}")
+        return "\n".join(lines)
+
+    def watch_thread(self, thread_id: int) -> None:
+        """
+        Function checks the heartbeat of the event loop until the watchdog is stopped.
+        If the heartbeat is overdue, the stack of the blocked event loop thread is
+        recorded once per blocking.
+
+        Args:
+            thread_id (int): Id of the event loop thread
+        """
+        captured = None
+        while not self._stop.wait(self.threshold / 4):
+            heartbeat = self.heartbeat
+            if heartbeat == captured:
+                continue
+            if perf_counter() - heartbeat < self.settings.interval + self.threshold / 2:
+                continue
+            frame = sys._current_frames().get(thread_id)  # pylint: disable=protected-access
+            if frame is not None:
+                self.blocked_stack = (heartbeat, fold_stack(frame))
+                captured = heartbeat
+            del frame
+
+    def record(self, lag: float) -> None:
+        """
+        Function stores a measured lag and logs a blocking of the event loop with the
+        recorded stack.
+
+        Args:
+            lag (float): Lag of the event loop in seconds
+        """
+        self.lags.append(lag)
+        if self.metrics is not None:
+            self.metrics.loop_lag_seconds.observe((), lag)
+        blocked, self.blocked_stack = self.blocked_stack, None
+        if lag < self.threshold:
+            return
+        stack = blocked[1] if blocked is not None and blocked[0] == self.heartbeat else None
+        self.blocking.append(BlockingCall(datetime.now(), lag, stack or []))
+        frames = "\n".join(f"  {name}" for name in (stack or ["unknown"])[-LOGGED_FRAMES:])
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms in:\n{frames}")
+
+    def beat(self, lag: float) -> None:
+        """
+        Function records a measured lag and renews the heartbeat for the watch thread.
+
+        Args:
+            lag (float): Lag of the event loop in seconds
+        """
+        self.record(lag)
+        self.heartbeat = perf_counter()
+
+    async def run(self) -> None:
+        """
+        Function measures the lag of the event loop until it is cancelled.
+        """
+        self._stop.clear()
+        self.heartbeat = perf_counter()
+        watcher = threading.Thread(
+            target=self.watch_thread,
+            args=(threading.get_ident(),),
+            name="loop-watchdog",
+            daemon=True,
+        )
+        watcher.start()
+        try:
+            await measure_lag(self.settings.interval, self.beat)
+        finally:
+            self._stop.set()
@@ -0,0 +1,362 @@
+"""
+This module contains the optional instrumentation of the slash commands. Each command is
+a trace with nested spans for the database transactions, the LLM requests and the
+Discord API calls. The durations are collected as histograms and counters and exported
+in the Prometheus text format on a local HTTP endpoint. The instrumentation is only
+installed if it is enabled, otherwise no command, engine or client is wrapped.
+"""
+
+import asyncio
+from bisect import bisect_left
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
+from time import perf_counter
+from typing import AsyncContextManager, AsyncIterator, Iterable
+import environ
+from aiohttp import web
+from discord.http import HTTPClient
+from discord.webhook.async_ import AsyncWebhookAdapter, async_context
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BACKGROUND_COMMAND = "background"
+SPAN_DB = "db"
+SPAN_LLM = "llm"
+SPAN_DISCORD = "discord"
+
+
+@environ.config(prefix="METRICS")
+class MetricsConfiguration:
+    """
+    Configuration model for the command metrics and the Prometheus endpoint
+    """
+
+    enabled: bool = environ.bool_var(False)
+    host: str = environ.var("127.0.0.1", converter=str)
+    port: int = environ.var(9464, converter=int)
+
+
+def format_labels(names: tuple[str, ...], values: tuple[str, ...], **extra: str) -> str:
+    """
+    Function formats the labels of a sample in the Prometheus text format.
+
+    Args:
+        names (tuple[str, ...]): Label names of the metric
+        values (tuple[str, ...]): Label values of the sample
+        **extra (str): Additional labels like the bucket bound
+
+    Returns:
+        str: Formatted labels with braces or an empty string
+    """
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Counter:
+    """
+    Class for a counter metric with labels.
+    """
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, labels: tuple[str, ...], amount: float = 1) -> None:
+        """
+        Function increases the counter of the handed over labels.
+        """
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        """
+        Function returns the lines of the metric in the Prometheus text format.
+        """
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{format_labels(self.label_names, labels)} {value:g}"
+
+
+class Histogram:
+    """
+    Class for a histogram metric with labels and fixed bucket bounds in seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self.counts: dict[tuple[str, ...], list[int]] = {}
+        self.sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        """
+        Function adds a measured value to the histogram of the handed over labels.
+        """
+        counts = self.counts.setdefault(labels, [0] * (len(self.buckets) + 1))
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[labels] = self.sums.get(labels, 0.0) + value
+
+    def count(self, labels: tuple[str, ...]) -> int:
+        """
+        Function returns the number of observed values of the handed over labels.
+        """
+        return sum(self.counts.get(labels, []))
+
+    def render(self) -> Iterable[str]:
+        """
+        Function returns the lines of the metric in the Prometheus text format with
+        cumulative buckets.
+        """
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, counts in sorted(self.counts.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                yield (
+                    f"{self.name}_bucket{format_labels(self.label_names, labels, le=le)} "
+                    + f"{cumulative}"
+                )
+            yield f"{self.name}_sum{format_labels(self.label_names, labels)} {self.sums[labels]:g}"
+            yield f"{self.name}_count{format_labels(self.label_names, labels)} {cumulative}"
+
+
+class CommandTrace:
+    """
+    Class to collect the spans of one command execution.
+    """
+
+    def __init__(self, command: str):
+        self.command = command
+        self.start = perf_counter()
+        self.duration = 0.0
+        self.spans: dict[str, list[float]] = {}
+
+    def add(self, kind: str, seconds: float) -> None:
+        """
+        Function adds a finished span to the trace.
+        """
+        total = self.spans.setdefault(kind, [0.0, 0])
+        total[0] += seconds
+        total[1] += 1
+
+    def summary(self) -> str:
+        """
+        Function returns the duration of the command split by span kind.
+        """
+        spans = ", ".join(
+            f"{kind} {seconds:.3f} s ({count})"
+            for kind, (seconds, count) in sorted(self.spans.items())
+        )
+        return f"{self.duration:.3f} s" + (f": {spans}" if spans else "")
+
+
+current_trace: ContextVar[CommandTrace | None] = ContextVar("current_trace", default=None)
+
+
+class TracedWebhookAdapter(AsyncWebhookAdapter):
+    """
+    Webhook adapter which measures the interaction responses and followup messages
+    as Discord spans.
+    """
+
+    def __init__(self, metrics: "Metrics"):
+        super().__init__()
+        self.metrics = metrics
+
+    async def request(self, *args, **kwargs):
+        async with self.metrics.span(SPAN_DISCORD):
+            return await super().request(*args, **kwargs)
+
+
+class Metrics:
+    """
+    Class with all metrics of the application and the functions to instrument the
+    database engine, the Discord client and the commands.
+    """
+
+    def __init__(self, settings: MetricsConfiguration):
+        self.settings = settings
+        self.command_seconds = Histogram(
+            "tales_command_duration_seconds",
+            "Duration of slash commands including the deferred work.",
+            ("command",),
+        )
+        self.span_seconds = Histogram(
+            "tales_span_duration_seconds",
+            "Duration of database transactions, LLM requests and Discord API calls.",
+            ("command", "span"),
+        )
+        self.db_queries = Counter(
+            "tales_db_queries_total", "Executed SQL statements.", ("command",)
+        )
+        self.loop_lag_seconds = Histogram(
+            "tales_loop_lag_seconds",
+            "Scheduling lag of the event loop.",
+            (),
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+        )
+        self.webhook_adapter = TracedWebhookAdapter(self)
+
+    def render(self) -> str:
+        """
+        Function returns all metrics in the Prometheus text format.
+        """
+        lines = []
+        for metric in (
+            self.command_seconds,
+            self.span_seconds,
+            self.db_queries,
+            self.loop_lag_seconds,
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def observe_span(self, kind: str, seconds: float) -> None:
+        """
+        Function stores a finished span for the running command.
+
+        Args:
+            kind (str): Kind of the span like db, llm or discord
+            seconds (float): Duration of the span
+        """
+        trace = current_trace.get()
+        command = trace.command if trace is not None else BACKGROUND_COMMAND
+        self.span_seconds.observe((command, kind), seconds)
+        if trace is not None:
+            trace.add(kind, seconds)
+
+    @asynccontextmanager
+    async def span(self, kind: str) -> AsyncIterator[None]:
+        """
+        Context manager to measure a span of the running command.
+
+        Args:
+            kind (str): Kind of the span like db, llm or discord
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_span(kind, perf_counter() - start)
+
+    @asynccontextmanager
+    async def trace_command(self, command: str) -> AsyncIterator[CommandTrace]:
+        """
+        Context manager to measure a command. All spans inside the context and in
+        tasks started from it belong to the command.
+
+        Args:
+            command (str): Qualified name of the command
+
+        Yields:
+            CommandTrace: Trace of the command
+        """
+        trace = CommandTrace(command)
+        trace_token = current_trace.set(trace)
+        adapter_token = async_context.set(self.webhook_adapter)
+        try:
+            yield trace
+        finally:
+            async_context.reset(adapter_token)
+            current_trace.reset(trace_token)
+            trace.duration = perf_counter() - trace.start
+            self.command_seconds.observe((command,), trace.duration)
+
+    def instrument_engine(self, engine: AsyncEngine) -> None:
+        """
+        Function measures every transaction of the engine as database span and counts
+        the executed SQL statements per command.
+
+        Args:
+            engine (AsyncEngine): Database engine of the application
+        """
+
+        def begin(conn) -> None:
+            conn.info["metrics_begin"] = perf_counter()
+
+        def end(conn) -> None:
+            start = conn.info.pop("metrics_begin", None)
+            if start is not None:
+                self.observe_span(SPAN_DB, perf_counter() - start)
+
+        def count_query(*_) -> None:
+            trace = current_trace.get()
+            self.db_queries.inc((trace.command if trace is not None else BACKGROUND_COMMAND,))
+
+        event.listen(engine.sync_engine, "begin", begin)
+        event.listen(engine.sync_engine, "commit", end)
+        event.listen(engine.sync_engine, "rollback", end)
+        event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+
+    def instrument_http(self, http: HTTPClient) -> None:
+        """
+        Function measures every request of the Discord client as Discord span.
+
+        Args:
+            http (HTTPClient): HTTP client of the Discord bot
+        """
+        request = http.request
+
+        async def traced_request(*args, **kwargs):
+            async with self.span(SPAN_DISCORD):
+                return await request(*args, **kwargs)
+
+        http.request = traced_request
+
+    async def serve(self) -> None:
+        """
+        Function serves the metrics on the configured host and port until it is
+        cancelled.
+        """
+
+        async def handle(_: web.Request) -> web.Response:
+            return web.Response(
+                body=self.render().encode("utf-8"),
+                headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+            )
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.settings.host, self.settings.port).start()
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+
+def trace_span(metrics: Metrics | None, kind: str) -> AsyncContextManager:
+    """
+    Function returns the context manager to measure a span, which does nothing if the
+    metrics are disabled.
+
+    Args:
+        metrics (Metrics | None): Metrics of the application or None if disabled
+        kind (str): Kind of the span like db, llm or discord
+
+    Returns:
+        AsyncContextManager: Context manager of the span
+    """
+    if metrics is None:
+        return nullcontext()
+    return metrics.span(kind)
@@ -0,0 +1,125 @@
+"""
+This module contains the keyset pagination used for select menus. Discord limits a
+select menu to 25 options, so large lists are loaded page by page ordered by id and
+optionally filtered by a name prefix.
+"""
+
+from enum import Enum
+from typing import Any, Sequence
+from sqlalchemy import Select
+from .constants import DC_MAX_SELECT_OPTIONS
+
+
+class PageDirection(Enum):
+    """
+    Enum to define the direction to load the next page.
+    """
+
+    FIRST = 0
+    NEXT = 1
+    PREV = 2
+
+
+class PageContext:
+    """
+    Class to specify the pagination context of a select menu. The ids of the first
+    and last entry of the current page are the keys for the next and previous page.
+    """
+
+    def __init__(self, page_size: int = DC_MAX_SELECT_OPTIONS):
+        self.page_size: int = page_size
+        self.first_id: int | None = None
+        self.last_id: int | None = None
+        self.has_prev: bool = False
+        self.has_next: bool = False
+        self.name_prefix: str = ""
+
+
+def keyset_statement(
+    statement: Select, model: Any, page: PageContext, direction: PageDirection
+) -> Select:
+    """
+    Function extends a select statement with the name filter, key condition, order
+    and limit for the requested page. One more entry than the page size is requested
+    to know whether a further page exists.
+
+    Args:
+        statement (Select): Select statement with all filters of the list
+        model (Any): Database class with the columns id and name
+        page (PageContext): Pagination context
+        direction (PageDirection): Direction of the requested page
+
+    Returns:
+        Select: Statement for the requested page
+    """
+    if page.name_prefix:
+        statement = statement.where(
+            model.name.startswith(page.name_prefix, autoescape=True)
+        )
+    if direction is PageDirection.PREV and page.first_id is not None:
+        statement = statement.where(model.id < page.first_id).order_by(model.id.desc())
+    elif direction is PageDirection.NEXT and page.last_id is not None:
+        statement = statement.where(model.id > page.last_id).order_by(model.id)
+    else:
+        statement = statement.order_by(model.id)
+    return statement.limit(page.page_size + 1)
+
+
+def apply_page_result(
+    items: Sequence, page: PageContext, direction: PageDirection
+) -> list:
+    """
+    Function cuts the result of a keyset statement to the page size, restores the
+    ascending order and updates the pagination context.
+
+    Args:
+        items (Sequence): Result of the keyset statement
+        page (PageContext): Pagination context
+        direction (PageDirection): Direction of the requested page
+
+    Returns:
+        list: Entries of the page in ascending id order
+    """
+    more = len(items) > page.page_size
+    items = list(items[: page.page_size])
+    if direction is PageDirection.PREV and page.first_id is not None:
+        items.reverse()
+        page.has_prev = more
+        page.has_next = True
+    elif direction is PageDirection.NEXT and page.last_id is not None:
+        page.has_prev = True
+        page.has_next = more
+    else:
+        page.has_prev = False
+        page.has_next = more
+    if items:
+        page.first_id = items[0].id
+        page.last_id = items[-1].id
+    return items
+
+
+def paginate_items(
+    items: Sequence, page: PageContext, direction: PageDirection
+) -> list:
+    """
+    Function applies the keyset pagination to a list in memory, for example the
+    cached genre catalog.
+
+    Args:
+        items (Sequence): All entries sorted by id
+        page (PageContext): Pagination context
+        direction (PageDirection): Direction of the requested page
+
+    Returns:
+        list: Entries of the page in ascending id order
+    """
+    if page.name_prefix:
+        prefix = page.name_prefix.lower()
+        items = [item for item in items if item.name.lower().startswith(prefix)]
+    if direction is PageDirection.PREV and page.first_id is not None:
+        result = [item for item in items if item.id < page.first_id][::-1]
+    elif direction is PageDirection.NEXT and page.last_id is not None:
+        result = [item for item in items if item.id > page.last_id]
+    else:
+        result = list(items)
+    return apply_page_result(result[: page.page_size + 1], page, direction)
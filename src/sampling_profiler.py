@@ -0,0 +1,288 @@
+"""
+This module contains the time-boxed sampling profiler for the diagnosis of the running
+bot. A thread samples the stack of the event loop thread in a fixed interval, while the
+event loop takes snapshots of the stacks of all pending tasks and measures its own
+scheduling lag. The stacks are written in the collapsed format of flamegraph tools.
+"""
+
+import sys
+import asyncio
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from types import FrameType
+from typing import Callable
+
+PROFILE_DIRECTORY = "files/profiles"
+SAMPLE_INTERVAL = 0.005
+TASK_SNAPSHOT_INTERVAL = 0.25
+LAG_INTERVAL = 0.05
+IDLE_MODULE = "selectors:"
+
+
+def frame_name(frame: FrameType) -> str:
+    """
+    Function returns the name of a frame as module and qualified function name.
+
+    Args:
+        frame (FrameType): Stack frame
+
+    Returns:
+        str: Name like game_telling:keep_telling_schedule
+    """
+    code = frame.f_code
+    return f"{Path(code.co_filename).stem}:{code.co_qualname}".replace(";", ",")
+
+
+def fold_stack(frame: FrameType | None) -> list[str]:
+    """
+    Function returns the names of the frames from the outermost to the innermost frame.
+
+    Args:
+        frame (FrameType | None): Innermost frame of the stack
+
+    Returns:
+        list[str]: Names of the frames, outermost first
+    """
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return names[::-1]
+
+
+def task_stack(task: asyncio.Task) -> list[str]:
+    """
+    Function returns the names of the suspended coroutine frames of a task with the task
+    name as root.
+
+    Args:
+        task (asyncio.Task): Pending task
+
+    Returns:
+        list[str]: Task name and frame names, outermost first
+    """
+    return [f"task:{task.get_name()}".replace(";", ",")] + [
+        frame_name(frame) for frame in task.get_stack()
+    ]
+
+
+async def measure_lag(interval: float, record: Callable[[float], None]) -> None:
+    """
+    Function measures how much later than planned the event loop wakes up a sleeping
+    coroutine and hands every lag to the callback until it is cancelled. It is shared by
+    the profiler and the watchdog of the event loop.
+
+    Args:
+        interval (float): Planned sleep between two measurements in seconds
+        record (Callable[[float], None]): Callback for the lag in seconds
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        record(max(loop.time() - expected, 0.0))
+
+
+@dataclass
+class LoopLag:
+    """
+    Class with the measured scheduling lag of the event loop in seconds.
+    """
+
+    samples: list[float] = field(default_factory=list)
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean lag of all measurements.
+        """
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    @property
+    def max(self) -> float:
+        """
+        Highest lag of all measurements.
+        """
+        return max(self.samples, default=0.0)
+
+
+@dataclass
+class ProfileResult:  # pylint: disable=too-many-instance-attributes
+    """
+    Class with the result of a sampling profile.
+    """
+
+    duration: float = 0.0
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+    task_snapshots: int = 0
+    task_stacks: Counter = field(default_factory=Counter)
+    lag: LoopLag = field(default_factory=LoopLag)
+    stack_file: Path | None = None
+    task_file: Path | None = None
+
+    @property
+    def idle_samples(self) -> int:
+        """
+        Number of samples in which the event loop waited in the selector for I/O.
+        """
+        return sum(
+            count
+            for stack, count in self.stacks.items()
+            if stack.rsplit(";", 1)[-1].startswith(IDLE_MODULE)
+        )
+
+    def hotspots(self, limit: int = 10) -> list[tuple[str, int]]:
+        """
+        Function returns the functions with the most samples as innermost frame, the
+        waiting of the event loop for I/O is left out.
+
+        Args:
+            limit (int, optional): Number of functions. Defaults to 10.
+
+        Returns:
+            list[tuple[str, int]]: Function names with their number of samples
+        """
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            if not leaf.startswith(IDLE_MODULE):
+                leaves[leaf] += count
+        return leaves.most_common(limit)
+
+    def report(self, limit: int = 10) -> str:
+        """
+        Function returns a summary with the hotspots and the loop lag.
+
+        Args:
+            limit (int, optional): Number of hotspots. Defaults to 10.
+
+        Returns:
+            str: Summary with one line per hotspot
+        """
+        lines = [
+            f"{self.samples} samples in {self.duration:.1f} s, "
+            + f"{self.task_snapshots} task snapshots, loop lag mean "
+            + f"{self.lag.mean * 1000:.1f} ms max {self.lag.max * 1000:.1f} ms",
+            f"Idle: {self.idle_samples / max(self.samples, 1):.1%}, hotspots:",
+        ]
+        for name, count in self.hotspots(limit):
+            lines.append(f"{count / max(self.samples, 1):6.1%} {name}")
+        return "\n".join(lines)
+
+
+def write_folded(stacks: Counter, file_path: Path) -> None:
+    """
+    Function writes the stacks in the collapsed format, one stack with its count per
+    line.
+
+    Args:
+        stacks (Counter): Folded stacks with their counts
+        file_path (Path): Destination file
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with file_path.open("w", encoding="utf-8") as file:
+        for stack, count in sorted(stacks.items()):
+            file.write(f"{stack} {count}\n")
+
+
+class SamplingProfiler:
+    """
+    Class to profile the event loop thread and the pending tasks for a fixed duration.
+    Only one profile can run at the same time.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIRECTORY, interval: float = SAMPLE_INTERVAL):
+        self.directory = Path(directory)
+        self.interval = interval
+        self.running = False
+
+    def sample_thread(
+        self, thread_id: int, result: ProfileResult, stop: threading.Event
+    ) -> None:
+        """
+        Function samples the stack of the thread until the stop event is set. It runs
+        in its own thread, so it also sees callbacks which block the event loop.
+
+        Args:
+            thread_id (int): Id of the event loop thread
+            result (ProfileResult): Result to store the samples
+            stop (threading.Event): Event to end the sampling
+        """
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)  # pylint: disable=protected-access
+            if frame is None:
+                continue
+            result.stacks[";".join(fold_stack(frame))] += 1
+            result.samples += 1
+            del frame
+
+    async def snapshot_tasks(self, result: ProfileResult) -> None:
+        """
+        Function takes snapshots of the stacks of all pending tasks until it is
+        cancelled.
+
+        Args:
+            result (ProfileResult): Result to store the snapshots
+        """
+        current = asyncio.current_task()
+        while True:
+            for task in asyncio.all_tasks():
+                if task is not current and not task.done():
+                    result.task_stacks[";".join(task_stack(task))] += 1
+            result.task_snapshots += 1
+            await asyncio.sleep(TASK_SNAPSHOT_INTERVAL)
+
+    async def profile(self, duration: float) -> ProfileResult:
+        """
+        Function profiles the running process for the handed over duration and writes
+        the thread samples and the task snapshots as collapsed stacks.
+
+        Args:
+            duration (float): Duration of the profile in seconds
+
+        Raises:
+            RuntimeError: A profile is already running
+
+        Returns:
+            ProfileResult: Result with the stacks and the written files
+        """
+        if self.running:
+            raise RuntimeError("A profile is already running.")
+        self.running = True
+        result = ProfileResult()
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self.sample_thread,
+            args=(threading.get_ident(), result, stop),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        helpers = [
+            asyncio.create_task(self.snapshot_tasks(result), name="profile-tasks"),
+            asyncio.create_task(
+                measure_lag(LAG_INTERVAL, result.lag.samples.append), name="profile-lag"
+            ),
+        ]
+        start = perf_counter()
+        sampler.start()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            stop.set()
+            for helper in helpers:
+                helper.cancel()
+            await asyncio.gather(*helpers, return_exceptions=True)
+            await asyncio.to_thread(sampler.join)
+            result.duration = perf_counter() - start
+            self.running = False
+        name = datetime.now().strftime("profile-%Y%m%d-%H%M%S")
+        result.stack_file = self.directory / f"{name}.folded"
+        result.task_file = self.directory / f"{name}-tasks.folded"
+        await asyncio.to_thread(write_folded, result.stacks, result.stack_file)
+        await asyncio.to_thread(write_folded, result.task_stacks, result.task_file)
+        return result
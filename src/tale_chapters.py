@@ -0,0 +1,285 @@
+"""
+This module contains the chapters of a finished tale. The told stories are divided into
+chapters and the title and the summary of every chapter are written by the LLM. The
+chapters are requested in parallel, but limited by a semaphore shared by all games, so
+the turns of the running games still get their requests through.
+"""
+
+import sys
+import asyncio
+from dataclasses import dataclass
+from typing import Iterable
+from sqlalchemy import select, delete
+from sqlalchemy.exc import SQLAlchemyError
+
+from .configuration import Configuration, DelimitedTemplate
+from .unit_of_work import db_session
+from .db_classes import CHAPTER, STORY, StoryType
+from .llm_handler import request_openai
+from .constants import (
+    CHAPTER_REQUEST_PROMPT,
+    PROMPT_MAX_WORDS_CHAPTER_SUMMARY,
+    PROMPT_MAX_WORDS_CHAPTER_TITLE,
+)
+
+TITLE_PREFIX = "titel:"
+SUMMARY_PREFIX = "zusammenfassung:"
+
+
+@dataclass(frozen=True)
+class ChapterSegment:
+    """
+    Class with the number and the range of the stories of a chapter.
+    """
+
+    number: int
+    first_story_id: int
+    last_story_id: int
+    stories: int
+
+
+def segment_stories(
+    stories: Iterable[tuple[int, StoryType]], min_stories: int, max_stories: int
+) -> list[ChapterSegment]:
+    """
+    Function divides the told stories into chapters. An event starts a new chapter if
+    the current chapter has the minimum number of stories, a chapter with the maximum
+    number of stories is closed in any case.
+
+    Args:
+        stories (Iterable[tuple[int, StoryType]]): Id and type of the stories in told order
+        min_stories (int): Minimum number of stories before an event starts a new chapter
+        max_stories (int): Maximum number of stories of a chapter
+
+    Returns:
+        list[ChapterSegment]: Chapters of the tale
+    """
+    segments = []
+    story_ids: list[int] = []
+
+    def close_chapter():
+        segments.append(
+            ChapterSegment(len(segments) + 1, story_ids[0], story_ids[-1], len(story_ids))
+        )
+        story_ids.clear()
+
+    for story_id, story_type in stories:
+        if story_ids and (
+            len(story_ids) >= max_stories
+            or (story_type is StoryType.EVENT and len(story_ids) >= min_stories)
+        ):
+            close_chapter()
+        story_ids.append(story_id)
+    if story_ids:
+        close_chapter()
+    return segments
+
+
+def parse_chapter_response(response: str) -> tuple[str, str]:
+    """
+    Function reads the title and the summary from the response of the LLM. If the
+    response has not the requested format, the first line is used as title and the rest
+    as summary.
+
+    Args:
+        response (str): Response of the LLM
+
+    Returns:
+        tuple[str, str]: Title and summary of the chapter
+    """
+    lines = [line.strip() for line in response.strip().splitlines() if line.strip()]
+    title = next((line for line in lines if line.lower().startswith(TITLE_PREFIX)), None)
+    summary = [line for line in lines if line.lower().startswith(SUMMARY_PREFIX)]
+    if title is None or not summary:
+        return (lines[0].strip("#* ") if lines else ""), " ".join(lines[1:])
+    summary_index = lines.index(summary[0])
+    return (
+        title[len(TITLE_PREFIX):].strip(" *\""),
+        " ".join([summary[0][len(SUMMARY_PREFIX):].strip()] + lines[summary_index + 1:]),
+    )
+
+
+async def get_story_types(config: Configuration, tale_id: int) -> list[tuple[int, StoryType]]:
+    """
+    Function returns the id and the type of the not discarded stories with a response of
+    a tale in the told order.
+
+    Args:
+        config (Configuration): App configuration
+        tale_id (int): Id of the tale
+
+    Returns:
+        list[tuple[int, StoryType]]: Id and type of the stories
+    """
+    try:
+        async with db_session(config) as session:
+            statement = (
+                select(STORY.id, STORY.story_type)
+                .where(STORY.tale_id == tale_id)
+                .where(STORY.discarded.is_(False))
+                .where(STORY.response.is_not(None))
+                .order_by(STORY.id)
+            )
+            return [tuple(row) for row in (await session.execute(statement)).all()]
+    except (AttributeError, SQLAlchemyError, TypeError):
+        config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
+        return []
+
+
+async def get_chapter_text(
+    config: Configuration, tale_id: int, segment: ChapterSegment
+) -> str | None:
+    """
+    Function returns the told text of the stories of a chapter.
+
+    Args:
+        config (Configuration): App configuration
+        tale_id (int): Id of the tale
+        segment (ChapterSegment): Chapter with the range of its stories
+
+    Returns:
+        str | None: Text of the chapter or None if the text could not be loaded
+    """
+    try:
+        async with db_session(config) as session:
+            statement = (
+                select(STORY.response)
+                .where(STORY.tale_id == tale_id)
+                .where(STORY.discarded.is_(False))
+                .where(STORY.response.is_not(None))
+                .where(STORY.id.between(segment.first_story_id, segment.last_story_id))
+                .order_by(STORY.id)
+            )
+            return "\n\n".join((await session.scalars(statement)).all())
+    except (AttributeError, SQLAlchemyError, TypeError):
+        config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
+        return None
+
+
+async def write_chapter(
+    config: Configuration, tale_id: int, segment: ChapterSegment, finish_prompt: str = ""
+) -> CHAPTER:
+    """
+    Function requests the title and the summary of a chapter. The text of the chapter is
+    loaded after the semaphore is acquired, so only the texts of the running requests
+    are kept in memory. If the text or the request fails, the chapter is kept without title.
+
+    Args:
+        config (Configuration): App configuration
+        tale_id (int): Id of the tale
+        segment (ChapterSegment): Chapter with the range of its stories
+        finish_prompt (str, optional): Additional instruction of the historian.
+            Defaults to "".
+
+    Returns:
+        CHAPTER: Chapter with title and summary
+    """
+    chapter = CHAPTER(
+        tale_id=tale_id,
+        number=segment.number,
+        title="",
+        first_story_id=segment.first_story_id,
+        last_story_id=segment.last_story_id,
+    )
+    async with config.chapter_limit:
+        chapter_text = await get_chapter_text(config, tale_id, segment)
+        if chapter_text is None:
+            config.logger.warning(
+                f"Chapter {segment.number} of tale {tale_id} without title: text not loaded"
+            )
+            return chapter
+        prompt = DelimitedTemplate(CHAPTER_REQUEST_PROMPT).substitute(
+            Number=segment.number,
+            ChapterText=chapter_text,
+            MaxTitleWords=PROMPT_MAX_WORDS_CHAPTER_TITLE,
+            MaxWords=PROMPT_MAX_WORDS_CHAPTER_SUMMARY,
+        )
+        if finish_prompt:
+            prompt += f"\n{finish_prompt}"
+        response = await request_openai(config, [{"role": "user", "content": prompt}])
+    if not await response.error_free():
+        config.logger.warning(
+            f"Chapter {segment.number} of tale {tale_id} without title: {response.error}"
+        )
+        return chapter
+    title, chapter.summary = parse_chapter_response(response.response)
+    chapter.title = title[: CHAPTER.title.type.length]
+    config.logger.trace(f"Chapter {segment.number} of tale {tale_id}: {chapter.title}")
+    return chapter
+
+
+async def store_chapters(config: Configuration, tale_id: int, chapters: list[CHAPTER]) -> bool:
+    """
+    Function replaces the stored chapters of a tale.
+
+    Args:
+        config (Configuration): App configuration
+        tale_id (int): Id of the tale
+        chapters (list[CHAPTER]): New chapters of the tale
+
+    Returns:
+        bool: Chapters are stored
+    """
+    try:
+        async with db_session(config, write=True) as session:
+            await session.execute(delete(CHAPTER).where(CHAPTER.tale_id == tale_id))
+            session.add_all(chapters)
+        return True
+    except (AttributeError, SQLAlchemyError, TypeError):
+        config.logger.opt(exception=sys.exc_info()).error("Error in sql insert.")
+        return False
+
+
+async def get_chapters(config: Configuration, tale_id: int) -> list[CHAPTER]:
+    """
+    Function returns the stored chapters of a tale in order.
+
+    Args:
+        config (Configuration): App configuration
+        tale_id (int): Id of the tale
+
+    Returns:
+        list[CHAPTER]: Chapters of the tale, empty if no chapters are written
+    """
+    try:
+        async with db_session(config) as session:
+            statement = (
+                select(CHAPTER).where(CHAPTER.tale_id == tale_id).order_by(CHAPTER.number)
+            )
+            return list((await session.scalars(statement)).all())
+    except (AttributeError, SQLAlchemyError, TypeError):
+        config.logger.opt(exception=sys.exc_info()).error("Error in sql select.")
+        return []
+
+
+async def create_chapters(
+    config: Configuration, tale_id: int, finish_prompt: str = ""
+) -> list[CHAPTER]:
+    """
+    Function divides a tale into chapters, writes the titles and summaries in parallel
+    and stores the chapters.
+
+    Args:
+        config (Configuration): App configuration
+        tale_id (int): Id of the tale
+        finish_prompt (str, optional): Additional instruction of the historian.
+            Defaults to "".
+
+    Returns:
+        list[CHAPTER]: Stored chapters, empty if the tale has no stories or an error
+            occurred
+    """
+    segments = segment_stories(
+        await get_story_types(config, tale_id),
+        config.env.chapter.min_stories,
+        config.env.chapter.max_stories,
+    )
+    config.logger.debug(f"Write {len(segments)} chapters of tale {tale_id}.")
+    chapters = list(
+        await asyncio.gather(
+            *(write_chapter(config, tale_id, segment, finish_prompt) for segment in segments)
+        )
+    )
+    if not chapters or not await store_chapters(config, tale_id, chapters):
+        return []
+    return chapters
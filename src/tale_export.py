@@ -0,0 +1,417 @@
+"""
+This module contains the export of a tale as Markdown, HTML or PDF file. The stories are
+streamed from the database in batches in the told order and every batch is rendered and
+written to disk before the next one is fetched, so the memory stays flat also for tales
+with thousands of stories. The tale is divided by the stored chapters if they are written,
+otherwise into chapters of a fixed number of stories. The PDF is written by a small
+writer without dependencies, which only keeps the lines of the current page.
+"""
+
+import html
+import textwrap
+from contextlib import aclosing
+from enum import Enum
+from pathlib import Path
+from typing import AsyncIterator
+import aiofiles
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .configuration import Configuration
+from .unit_of_work import db_session
+from .db_archive import unpack_stories
+from .db_classes import CHAPTER, GAME, STORY, TALEARCHIVE
+from .tale_chapters import get_chapters
+
+EXPORT_DIRECTORY = "files/exports"
+STORY_BATCH_SIZE = 200
+STORIES_PER_CHAPTER = 10
+"""Stories per chapter of a tale without stored chapters."""
+
+
+class ExportFormat(Enum):
+    """
+    Enum with the file formats of the tale export.
+    """
+
+    PDF = "pdf"
+    MARKDOWN = "md"
+    HTML = "html"
+
+
+def chapter_heading(number: int, title: str) -> str:
+    """
+    Function returns the heading of a chapter with the title if it is written.
+
+    Args:
+        number (int): Number of the chapter
+        title (str): Title of the chapter, can be empty
+
+    Returns:
+        str: Heading of the chapter
+    """
+    return f"Chapter {number}: {title}" if title else f"Chapter {number}"
+
+
+class MarkdownWriter:
+    """
+    Writer to render a tale as Markdown.
+    """
+
+    def begin(self, title: str, description: str | None) -> bytes:
+        """
+        Function renders the start of the document.
+        """
+        text = f"# {title}\n\n" + (f"*{description}*\n\n" if description else "")
+        return text.encode("utf-8")
+
+    def chapter(self, number: int, title: str = "", summary: str = "") -> bytes:
+        """
+        Function renders the heading and the summary of a chapter.
+        """
+        text = f"## {chapter_heading(number, title)}\n\n" + (f"*{summary}*\n\n" if summary else "")
+        return text.encode("utf-8")
+
+    def story(self, text: str) -> bytes:
+        """
+        Function renders a story as paragraph.
+        """
+        return f"{text.strip()}\n\n".encode("utf-8")
+
+    def end(self) -> bytes:
+        """
+        Function renders the end of the document.
+        """
+        return b""
+
+
+class HtmlWriter:
+    """
+    Writer to render a tale as HTML page.
+    """
+
+    def begin(self, title: str, description: str | None) -> bytes:
+        """
+        Function renders the start of the document.
+        """
+        text = (
+            '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+            + f"<title>{html.escape(title)}</title>\n</head>\n<body>\n"
+            + f"<h1>{html.escape(title)}</h1>\n"
+            + (f"<p><em>{html.escape(description)}</em></p>\n" if description else "")
+        )
+        return text.encode("utf-8")
+
+    def chapter(self, number: int, title: str = "", summary: str = "") -> bytes:
+        """
+        Function renders the heading and the summary of a chapter.
+        """
+        text = f"<h2>{html.escape(chapter_heading(number, title))}</h2>\n" + (
+            f"<p><em>{html.escape(summary)}</em></p>\n" if summary else ""
+        )
+        return text.encode("utf-8")
+
+    def story(self, text: str) -> bytes:
+        """
+        Function renders a story with a paragraph per line break.
+        """
+        return "".join(
+            f"<p>{html.escape(paragraph)}</p>\n"
+            for paragraph in text.strip().split("\n")
+            if paragraph.strip()
+        ).encode("utf-8")
+
+    def end(self) -> bytes:
+        """
+        Function renders the end of the document.
+        """
+        return b"</body>\n</html>\n"
+
+
+class PdfWriter:  # pylint: disable=too-many-instance-attributes
+    """
+    Writer to render a tale as PDF with the standard fonts Helvetica and Helvetica-Bold.
+    The objects of every full page are rendered immediately, the page tree, the catalog
+    and the cross-reference table at the end.
+    """
+
+    width = 595
+    height = 842
+    margin = 56
+    leading = 15
+    line_chars = 90
+    body_font = ("F1", 11)
+    heading_font = ("F2", 13)
+    title_font = ("F2", 16)
+
+    def __init__(self):
+        self.offset = 0
+        self.offsets: dict[int, int] = {}
+        self.page_ids: list[int] = []
+        self.next_id = 5
+        self.lines: list[tuple[tuple[str, int], str]] = []
+        self.lines_per_page = (self.height - 2 * self.margin) // self.leading
+
+    def emit(self, data: bytes) -> bytes:
+        """
+        Function counts the bytes of the rendered data for the cross-reference table.
+        """
+        self.offset += len(data)
+        return data
+
+    def pdf_object(self, object_id: int, body: bytes) -> bytes:
+        """
+        Function renders an indirect object and stores its position.
+        """
+        self.offsets[object_id] = self.offset
+        return self.emit(f"{object_id} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+
+    @staticmethod
+    def pdf_string(text: str) -> bytes:
+        """
+        Function encodes a text as literal PDF string with the WinAnsi encoding.
+        """
+        data = text.encode("cp1252", errors="replace")
+        for char in (b"\\", b"(", b")"):
+            data = data.replace(char, b"\\" + char)
+        return b"(" + data + b")"
+
+    def add_lines(self, font: tuple[str, int], text: str) -> bytes:
+        """
+        Function wraps a text into lines and renders every page which is full. The wrap
+        width is scaled from the body font, so larger fonts get fewer characters per line.
+        """
+        width = int(self.line_chars * self.body_font[1] / font[1])
+        data = b""
+        for paragraph in text.split("\n"):
+            for line in textwrap.wrap(paragraph, width) or [""]:
+                self.lines.append((font, line))
+                if len(self.lines) == self.lines_per_page:
+                    data += self.flush_page()
+        return data
+
+    def flush_page(self) -> bytes:
+        """
+        Function renders the collected lines as page with its content stream.
+        """
+        if not self.lines:
+            return b""
+        commands = [
+            f"BT\n{self.leading} TL\n{self.margin} {self.height - self.margin} Td\n".encode("ascii")
+        ]
+        for (font, size), line in self.lines:
+            commands.append(
+                f"/{font} {size} Tf ".encode("ascii") + self.pdf_string(line) + b" Tj T*\n"
+            )
+        commands.append(b"ET")
+        stream = b"".join(commands)
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        self.page_ids.append(page_id)
+        self.lines = []
+        return self.pdf_object(
+            content_id,
+            f"<< /Length {len(stream)} >>\nstream\n".encode("ascii") + stream + b"\nendstream",
+        ) + self.pdf_object(
+            page_id,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.width} {self.height}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> "
+            f"/Contents {content_id} 0 R >>".encode("ascii"),
+        )
+
+    def begin(self, title: str, description: str | None) -> bytes:
+        """
+        Function renders the header of the file and the title.
+        """
+        data = self.emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        data += self.add_lines(self.title_font, title)
+        if description:
+            data += self.add_lines(self.body_font, description)
+        return data + self.add_lines(self.body_font, "")
+
+    def chapter(self, number: int, title: str = "", summary: str = "") -> bytes:
+        """
+        Function renders the heading and the summary of a chapter.
+        """
+        data = self.add_lines(self.heading_font, chapter_heading(number, title))
+        if summary:
+            data += self.add_lines(self.body_font, summary)
+        return data + self.add_lines(self.body_font, "")
+
+    def story(self, text: str) -> bytes:
+        """
+        Function renders a story followed by an empty line.
+        """
+        return self.add_lines(self.body_font, text.strip()) + self.add_lines(self.body_font, "")
+
+    def end(self) -> bytes:
+        """
+        Function renders the last page, the fonts, the page tree, the catalog and the
+        cross-reference table.
+        """
+        data = self.flush_page()
+        data += self.pdf_object(
+            3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+        )
+        data += self.pdf_object(
+            4,
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold "
+            + b"/Encoding /WinAnsiEncoding >>",
+        )
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        data += self.pdf_object(
+            2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode("ascii")
+        )
+        data += self.pdf_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref_offset = self.offset
+        entries = "".join(
+            f"{self.offsets[object_id]:010d} 00000 n \n" for object_id in range(1, self.next_id)
+        )
+        data += self.emit(
+            f"xref\n0 {self.next_id}\n0000000000 65535 f \n{entries}"
+            f"trailer\n<< /Size {self.next_id} /Root 1 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode("ascii")
+        )
+        return data
+
+
+WRITERS = {
+    ExportFormat.MARKDOWN: MarkdownWriter,
+    ExportFormat.HTML: HtmlWriter,
+    ExportFormat.PDF: PdfWriter,
+}
+
+
+def render_chapter(writer: MarkdownWriter | HtmlWriter | PdfWriter, chapter: CHAPTER) -> bytes:
+    """
+    Function renders the heading of a stored chapter.
+
+    Args:
+        writer (MarkdownWriter | HtmlWriter | PdfWriter): Writer of the export
+        chapter (CHAPTER): Stored chapter
+
+    Returns:
+        bytes: Rendered heading and summary
+    """
+    return writer.chapter(chapter.number, chapter.title, chapter.summary or "")
+
+
+def render_batch(
+    writer: MarkdownWriter | HtmlWriter | PdfWriter,
+    chapters: list[CHAPTER],
+    batch: list[tuple[int, str]],
+    next_chapter: int,
+    stories: int,
+) -> tuple[bytes, int, int]:
+    """
+    Function renders a batch of stories with the headings of the chapters, which start
+    in the batch.
+
+    Args:
+        writer (MarkdownWriter | HtmlWriter | PdfWriter): Writer of the export
+        chapters (list[CHAPTER]): Stored chapters of the tale, can be empty
+        batch (list[tuple[int, str]]): Id and text of the stories
+        next_chapter (int): Index of the next stored chapter
+        stories (int): Number of the already rendered stories
+
+    Returns:
+        tuple[bytes, int, int]: Rendered batch, index of the next stored chapter and
+            number of the rendered stories
+    """
+    data = b""
+    for story_id, text in batch:
+        while next_chapter < len(chapters) and (
+            story_id >= chapters[next_chapter].first_story_id
+        ):
+            data += render_chapter(writer, chapters[next_chapter])
+            next_chapter += 1
+        if not chapters and stories % STORIES_PER_CHAPTER == 0:
+            data += writer.chapter(stories // STORIES_PER_CHAPTER + 1)
+        data += writer.story(text)
+        stories += 1
+    return data, next_chapter, stories
+
+
+async def iter_story_batches(
+    session: AsyncSession, tale_id: int, batch_size: int = STORY_BATCH_SIZE
+) -> AsyncIterator[list[tuple[int, str]]]:
+    """
+    Function yields the id and the text of the not discarded stories of a tale in the
+    told order in batches. The stories are streamed from the database with a server-side cursor,
+    archived tales are read from the archive. The session is owned by the caller, so the
+    cursor is closed with the session also if the export stops early.
+
+    Args:
+        session (AsyncSession): Open session of the export
+        tale_id (int): Id of the tale
+        batch_size (int, optional): Stories per batch. Defaults to STORY_BATCH_SIZE.
+
+    Yields:
+        list[tuple[int, str]]: Id and text of the next stories
+    """
+    data = await session.scalar(
+        select(TALEARCHIVE.data).where(TALEARCHIVE.tale_id == tale_id)
+    )
+    if data is not None:
+        texts = [
+            (story.id, story.response)
+            for story in unpack_stories(data, tale_id)
+            if not story.discarded and story.response is not None
+        ]
+        for start in range(0, len(texts), batch_size):
+            yield texts[start:start + batch_size]
+        return
+    result = await session.stream(
+        select(STORY.id, STORY.response)
+        .where(STORY.tale_id == tale_id)
+        .where(STORY.discarded.is_(False))
+        .where(STORY.response.is_not(None))
+        .order_by(STORY.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+
+async def export_tale(
+    config: Configuration,
+    game: GAME,
+    export_format: ExportFormat,
+    directory: str = EXPORT_DIRECTORY,
+) -> Path:
+    """
+    Function exports the tale of a game chapter by chapter to a file. Every batch of
+    stories is written before the next one is fetched. The stored chapters of the tale
+    are used with their titles and summaries, otherwise the tale is divided into
+    chapters of STORIES_PER_CHAPTER stories.
+
+    Args:
+        config (Configuration): App configuration
+        game (GAME): Game with the tale to export
+        export_format (ExportFormat): Format of the file
+        directory (str, optional): Directory of the file. Defaults to EXPORT_DIRECTORY.
+
+    Returns:
+        Path: Path of the written file
+    """
+    file_path = Path(directory) / f"tale_{game.id}.{export_format.value}"
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = WRITERS[export_format]()
+    chapters = await get_chapters(config, game.tale_id)
+    if not chapters:
+        config.logger.debug(f"Tale {game.tale_id} has no chapters, use fixed chapters.")
+    next_chapter = 0
+    stories = 0
+    async with aiofiles.open(file_path, mode="wb") as file:
+        await file.write(writer.begin(game.name, game.description))
+        async with db_session(config) as session, aclosing(
+            iter_story_batches(session, game.tale_id)
+        ) as batches:
+            async for batch in batches:
+                data, next_chapter, stories = render_batch(
+                    writer, chapters, batch, next_chapter, stories
+                )
+                await file.write(data)
+        await file.write(writer.end())
+    config.logger.debug(f"Exported {stories} stories of game {game.id} to {file_path}.")
+    return file_path
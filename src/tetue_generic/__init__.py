@@ -3,21 +3,10 @@ This module initializes the package and provides central variables and configura
 - Defines generic standard variables that can be used throughout the package.
 - Imports variables from the parent module if they are already defined to avoid redundancy.
 - Enables centralized management and reusability of shared resources.
+- Has no side effects, the log file is created by the logger in `init_logging`.
 
 Note:
 - Parent variables are only imported if they are explicitly defined in the parent module.
 - Variables from higher-level take precedence.
 """
-import os
-from pathlib import Path
-
 __gen_version__ = "v0.4.0"
-
-cwd = Path.cwd()
-file_path = os.path.join(cwd, "files")
-
-if os.path.exists(file_path):
-    new_file_path = os.path.join(file_path, "app.log")
-    if not os.path.exists(new_file_path):
-        with open(new_file_path, 'w', encoding='utf-8') as f:
-            f.write("")
@@ -29,12 +29,18 @@ def init_logging(config) -> None:
     Note:
         - This function modifies the global `logger` object from Loguru.
         - Log files are rotated when they reach 100 MB in size.
+        - Log messages are written to the file by a worker thread, so the event loop
+          is not blocked by the file writes.
+        - The log file and its directory are created by Loguru if they do not exist.
         - Console output is colorized for better readability.
 
     """
     logger.remove()
     logger.add(
-        config.env.watcher.log_file_path, rotation="100 MB", level=config.env.watcher.log_level
+        config.env.watcher.log_file_path,
+        rotation="100 MB",
+        level=config.env.watcher.log_level,
+        enqueue=True,
     )
     logger.add(sys.stdout, colorize=True, level=config.env.watcher.log_level)
     config.logger = logger
@@ -0,0 +1,93 @@
+"""
+This module contains the unit of work for database access. A command handler opens one
+unit of work and all database helpers called inside reuse its session and transaction
+instead of opening their own.
+"""
+
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession
+from .configuration import Configuration
+
+
+class UnitOfWork:
+    """
+    Class to hold the shared session of a unit of work and the information whether
+    the global write lock is acquired by it.
+    """
+
+    def __init__(self, config: Configuration):
+        self.config = config
+        self.session: AsyncSession = None
+        self.write_locked: bool = False
+        self.session_requests: int = 0
+
+
+_current_unit_of_work: ContextVar[UnitOfWork | None] = ContextVar(
+    "current_unit_of_work", default=None
+)
+
+
+@asynccontextmanager
+async def unit_of_work(config: Configuration) -> AsyncIterator[UnitOfWork]:
+    """
+    Context manager to open a unit of work with one session and one transaction. The
+    transaction is committed when the context is left without exception. If a helper
+    inside requests write access, the global write lock is acquired once and released
+    after the commit. Nested calls reuse the outer unit of work.
+
+    Args:
+        config (Configuration): App configuration
+
+    Yields:
+        UnitOfWork: The active unit of work
+    """
+    current = _current_unit_of_work.get()
+    if current is not None and current.config is config:
+        yield current
+        return
+    uow = UnitOfWork(config)
+    token = _current_unit_of_work.set(uow)
+    try:
+        async with config.session() as session, session.begin():
+            uow.session = session
+            yield uow
+        config.logger.trace(
+            f"Unit of work committed after {uow.session_requests} session requests."
+        )
+    finally:
+        _current_unit_of_work.reset(token)
+        if uow.write_locked:
+            config.write_lock.release()
+
+
+@asynccontextmanager
+async def db_session(
+    config: Configuration, write: bool = False
+) -> AsyncIterator[AsyncSession]:
+    """
+    Context manager to get a session with an open transaction. Inside a unit of work
+    the shared session is returned, otherwise a new session and transaction is opened.
+
+    Args:
+        config (Configuration): App configuration
+        write (bool, optional): Acquire the global write lock. Defaults to False.
+
+    Yields:
+        AsyncSession: Session with an open transaction
+    """
+    uow = _current_unit_of_work.get()
+    if uow is not None and uow.config is config:
+        if write and not uow.write_locked:
+            await config.write_lock.acquire()
+            uow.write_locked = True
+        uow.session_requests += 1
+        yield uow.session
+        return
+    if write:
+        async with config.write_lock, config.session() as session, session.begin():
+            yield session
+    else:
+        async with config.session() as session, session.begin():
+            yield session
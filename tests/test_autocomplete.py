@@ -0,0 +1,63 @@
+"""
+This file contains unit tests for verifying the in-memory name index of the autocomplete.
+"""
+from datetime import datetime, timezone
+import src
+from src.autocomplete import NameIndex, AutocompleteIndex
+from src.discord_bot import name_autocomplete
+
+
+def test_name_index_prefix_search():
+    """
+    Tests the case insensitive prefix search, the id lookup, the tag filter and updates.
+    """
+    index = NameIndex()
+    index.upsert(3, "Zombie Town", True)
+    index.upsert(1, "zombie camp", False)
+    index.upsert(2, "Space", True)
+    index.upsert(12, "Zoo", True)
+
+    assert index.search("zo") == [(1, "zombie camp"), (3, "Zombie Town"), (12, "Zoo")]
+    assert index.search("ZOMBIE", bool) == [(3, "Zombie Town")]
+    assert index.search("2") == [(2, "Space")]
+    assert index.search("", limit=2) == [(2, "Space"), (1, "zombie camp")]
+
+    index.upsert(3, "Abandoned", False)
+    index.remove(12)
+    assert index.search("zo") == [(1, "zombie camp")]
+    assert index.get(3) == ("Abandoned", False)
+    assert len(index) == 3
+
+
+async def test_autocomplete_without_queries(config, statements):
+    """
+    Tests that the index is loaded once, kept in sync with writes and answers the
+    autocomplete without database queries.
+    """
+    game = src.GAME(
+        name="Night of fog",
+        start_date=datetime.now(timezone.utc),
+        tale=src.TALE(genre_id=1),
+    )
+    await src.update_db_objs(config, [game])
+    config.name_index = AutocompleteIndex()
+    game_autocomplete = name_autocomplete(
+        config, "games", [src.GameStatus.CREATED].__contains__
+    )
+    assert [choice.value for choice in await game_autocomplete(None, "night")] == [game.id]
+
+    character = src.CHARACTER(
+        name="Ann", age=30, background="-", description="-", summary="-"
+    )
+    await src.update_db_objs(config, [character])
+    game.status = src.GameStatus.RUNNING
+    await src.update_db_objs(config, [game])
+    statements.clear()
+
+    character_autocomplete = name_autocomplete(config, "characters", bool)
+    choices = await character_autocomplete(None, "a")
+    assert [(choice.name, choice.value) for choice in choices] == [
+        (f"{character.id}: Ann", character.id)
+    ]
+    assert await game_autocomplete(None, "night") == []
+    assert not statements
@@ -0,0 +1,27 @@
+"""
+This file contains a smoke test for the end-to-end benchmark with fake Discord and
+the local LLM stub.
+"""
+from benchmarks.harness import run_level, format_report
+
+
+async def test_benchmark_single_game(record_property):
+    """
+    Tests that one game is played through all commands and every command executes
+    SQL statements and Discord API calls.
+    """
+    report = await run_level(games=1, latency=0.0, turns=2)
+    record_property("benchmark_report", format_report(report))
+    assert report.verified_games == 1
+    assert report.llm_requests == 6
+    commands = {command.command: command for command in report.commands}
+    assert set(commands) == {
+        "create_game",
+        "select_character",
+        "setup_game",
+        "info_game",
+        "reset_game",
+        "keep_telling",
+    }
+    assert commands["keep_telling"].count == 2
+    assert all(command.queries > 0 and command.api_calls > 0 for command in commands.values())
@@ -0,0 +1,93 @@
+"""
+This file contains unit tests for verifying the deferred execution of slash commands.
+"""
+import asyncio
+from src.command_runner import run_deferred
+
+
+class FakeResponse:
+    """
+    Fake interaction response which records the deferral.
+    """
+
+    def __init__(self):
+        self.deferred = False
+
+    def is_done(self) -> bool:
+        """
+        Returns whether the interaction is already answered.
+        """
+        return self.deferred
+
+    async def defer(self, **_):
+        """
+        Marks the interaction as deferred.
+        """
+        self.deferred = True
+
+
+class FakeFollowup:
+    """
+    Fake followup webhook which records the sent messages.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, content=None, **_):
+        """
+        Records the sent message.
+        """
+        self.messages.append(content)
+
+
+class FakeInteraction:
+    """
+    Fake Discord interaction with response and followup.
+    """
+
+    def __init__(self):
+        self.id = 1
+        self.command = None
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+
+
+async def test_run_deferred_continues_in_background(config):
+    """
+    Tests that the interaction is deferred before the handler runs and the handler
+    is tracked until it is finished.
+    """
+    interaction = FakeInteraction()
+    calls = []
+
+    async def handler(inter, _, value):
+        calls.append((inter.response.is_done(), value))
+
+    task = await run_deferred(config, interaction, handler, 42)
+    assert interaction.response.deferred
+    assert len(config.background_tasks) == 1
+    await task
+    assert calls == [(True, 42)]
+    assert len(config.background_tasks) == 0
+
+
+async def test_run_deferred_timeout_and_cancel(config):
+    """
+    Tests that a slow handler is cancelled after the timeout with a message to the user
+    and that running commands are cancelled on shutdown.
+    """
+    config.env.dc.command_timeout = 0.01
+    interaction = FakeInteraction()
+
+    async def slow_handler(*_):
+        await asyncio.sleep(10)
+
+    await (await run_deferred(config, interaction, slow_handler))
+    assert interaction.followup.messages == ["The command took too long and was cancelled."]
+
+    config.env.dc.command_timeout = 10
+    task = await run_deferred(config, FakeInteraction(), slow_handler)
+    await asyncio.sleep(0)
+    await config.background_tasks.cancel_all()
+    assert task.cancelled()
@@ -0,0 +1,61 @@
+"""
+This file contains unit tests for verifying the watcher of the content directory.
+"""
+from src.content_watcher import ContentWatcher, content_kind, scan_directory
+from src.db_genre import get_genre_catalog
+
+
+def test_scan_content_files(tmp_path):
+    """
+    Tests that only genre and character YAML files are watched.
+    """
+    for name in ("genre_zombie.yml", "Character.yaml", "notes.yml", "genre.txt"):
+        (tmp_path / name).write_text("- name: x\n", encoding="utf-8")
+    assert sorted(path.rsplit("/", 1)[-1] for path in scan_directory(str(tmp_path))) == [
+        "Character.yaml",
+        "genre_zombie.yml",
+    ]
+    assert content_kind("notes.yml") is None
+    assert not scan_directory(str(tmp_path / "missing"))
+
+
+async def test_debounced_import(config, tmp_path, genre_yaml):
+    """
+    Tests that a file is imported after its fingerprint did not change between two
+    polls, a file which is still written is not imported and a changed file is
+    imported incrementally.
+    """
+    config.env.content.directory = str(tmp_path)
+    config.env.content.debounce = 0.0
+    watcher = ContentWatcher(config)
+    pack = tmp_path / "genre_pack.yml"
+    pack.write_text(genre_yaml("Zombie", ["Rain"]), encoding="utf-8")
+    assert await watcher.poll() == []
+    pack.write_text(
+        genre_yaml("Zombie", ["Rain"]) + genre_yaml("Space", ["Meteor"]), encoding="utf-8"
+    )
+    assert await watcher.poll() == []
+
+    results = await watcher.poll()
+    assert [result.summary for result in results] == [
+        "genre_pack.yml: 2 new, 0 changed, 0 unchanged, 0 removed."
+    ]
+    assert await watcher.poll() == []
+    assert {genre.name for genre in (await get_genre_catalog(config)).values()} == {
+        "Zombie",
+        "Space",
+    }
+
+    pack.write_text(
+        genre_yaml("Zombie", ["Rain", "Fog"]) + genre_yaml("Space", ["Meteor"]),
+        encoding="utf-8",
+    )
+    assert await watcher.poll() == []
+    results = await watcher.poll()
+    assert [result.summary for result in results] == [
+        "genre_pack.yml: 0 new, 1 changed, 1 unchanged, 0 removed."
+    ]
+    zombie = next(
+        genre for genre in (await get_genre_catalog(config)).values() if genre.name == "Zombie"
+    )
+    assert sorted(event.text for event in zombie.events) == ["Fog", "Rain"]
@@ -0,0 +1,100 @@
+"""
+This file contains unit tests for verifying the cold archive of finished games.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select, func
+import src
+from src import db_archive
+from src.db_archive import archive_finished_games, get_tale_stories
+from src.db_game import recount_game_counters
+from src.unit_of_work import db_session
+
+
+async def create_finished_game(config, finished_days_ago: int) -> src.GAME:
+    """
+    Function creates a finished game with told stories and Discord messages.
+    """
+    game = src.GAME(
+        name=f"Finished {finished_days_ago}",
+        start_date=datetime.now(timezone.utc) - timedelta(days=100),
+        end_date=datetime.now(timezone.utc) - timedelta(days=finished_days_ago),
+        status=src.GameStatus.FINISHED,
+        tale=src.TALE(genre_id=1),
+    )
+    await src.update_db_objs(config, [game])
+    stories = []
+    for index in range(20):
+        stories.append(src.STORY(request=f"Prompt {index}", tale_id=game.tale_id))
+        stories.append(
+            src.STORY(
+                response=f"The fog is rising over the town for the {index}. time. " * 20,
+                tale_id=game.tale_id,
+                messages=[src.MESSAGE(message_id=index * 10 + part) for part in range(2)],
+            )
+        )
+    await src.update_db_objs(config, stories)
+    return game
+
+
+async def count_stories(config, tale_id: int) -> int:
+    """
+    Function counts the stories of a tale in the story table.
+    """
+    async with db_session(config) as session:
+        return await session.scalar(
+            select(func.count(src.STORY.id))  # pylint: disable=not-callable
+            .where(src.STORY.tale_id == tale_id)
+        )
+
+
+async def test_archive_finished_games(config):
+    """
+    Tests that only games finished before the time span are archived, the stories are
+    removed from the story table and are read unchanged and compressed from the archive.
+    """
+    old_game = await create_finished_game(config, finished_days_ago=40)
+    recent_game = await create_finished_game(config, finished_days_ago=5)
+    told_stories = await get_tale_stories(config, old_game.tale_id)
+
+    assert await archive_finished_games(config, timedelta(days=30)) == 1
+    assert await archive_finished_games(config, timedelta(days=30)) == 0
+
+    assert await count_stories(config, old_game.tale_id) == 0
+    assert await count_stories(config, recent_game.tale_id) == 40
+    archived_stories = await get_tale_stories(config, old_game.tale_id)
+    assert [
+        (story.id, story.request, story.response, story.story_type) for story in archived_stories
+    ] == [(story.id, story.request, story.response, story.story_type) for story in told_stories]
+    assert [
+        [message.message_id for message in story.messages] for story in archived_stories
+    ] == [[message.message_id for message in story.messages] for story in told_stories]
+
+    async with db_session(config) as session:
+        archive = (await session.execute(select(src.TALEARCHIVE))).scalar_one()
+    assert archive.story_count == 40
+    assert len(archive.data) < sum(len(story.response or "") for story in told_stories) / 5
+
+    await recount_game_counters(config)
+    assert (await src.get_object_by_id(config, src.GAME, old_game.id)).stories_told == 20
+
+
+async def test_archive_schedule_survives_errors(config, monkeypatch):
+    """
+    Tests that an unexpected error of an archive run is logged and the schedule goes on.
+    """
+    runs = []
+
+    async def failing_archive(*_):
+        runs.append(1)
+        if len(runs) == 1:
+            raise ValueError("broken archive")
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(db_archive, "archive_finished_games", failing_archive)
+    monkeypatch.setattr(config.env.db, "archive_after_days", 30)
+    monkeypatch.setattr(config.env.db, "archive_interval", 0)
+    with pytest.raises(asyncio.CancelledError):
+        await db_archive.archive_schedule(config)
+    assert len(runs) == 2
@@ -0,0 +1,106 @@
+"""
+This file contains unit tests for verifying the versioned schema migrations.
+"""
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, MetaData, Table, inspect, text
+import src
+from src.db_migrations import (
+    SCHEMA_VERSION,
+    add_column,
+    migrate_db,
+    read_schema_version,
+    write_schema_version,
+)
+
+
+async def downgrade_to_initial_schema(config) -> None:
+    """
+    Function turns the test database into the initial schema without the indexes
+    of the select menus, the game counters and the unique Discord id of the users and
+    stores the schema version 1.
+    """
+
+    def drop_indexes(conn):
+        for table in (
+            src.GENRE.__table__,
+            src.GAME.__table__,
+            src.CHARACTER.__table__,
+            src.USER.__table__,
+        ):
+            for index in table.indexes:
+                index.drop(conn)
+        for column in ("stories_told", "registered_characters", "last_activity"):
+            conn.execute(text(f"ALTER TABLE games DROP COLUMN {column}"))
+
+    async with config.engine.begin() as conn:
+        await conn.run_sync(drop_indexes)
+        await conn.run_sync(write_schema_version, 1)
+
+
+async def index_names(config, table: str) -> set[str]:
+    """
+    Function returns the names of all indexes of the handed over table.
+    """
+    async with config.engine.connect() as conn:
+        indexes = await conn.run_sync(
+            lambda sync_conn: inspect(sync_conn).get_indexes(table)
+        )
+    return {index["name"] for index in indexes}
+
+
+async def test_upgrade_populated_database(config):
+    """
+    Tests that a populated database of the initial schema is upgraded with the
+    indexes, the computed game counters and merged duplicate users, keeps its data
+    and is skipped on the next start.
+    """
+    game = src.GAME(
+        name="Night of fog",
+        start_date=datetime.now(timezone.utc),
+        tale=src.TALE(genre_id=1),
+    )
+    await src.update_db_objs(config, [game])
+    await src.update_db_objs(
+        config, [src.STORY(response="Once upon a time", tale_id=game.tale_id)]
+    )
+    user = src.USER(name="Player", dc_id="42")
+    await src.update_db_objs(config, [user])
+    await downgrade_to_initial_schema(config)
+    assert "ix_games_status_id" not in await index_names(config, "games")
+    duplicate = src.USER(name="Player", dc_id="42")
+    character = src.CHARACTER(
+        name="Ann", age=30, background="-", description="-", summary="-", user=duplicate
+    )
+    await src.update_db_objs(config, [duplicate, character])
+
+    assert await src.sync_db(config.engine)
+
+    assert {"ix_games_status_id", "ix_games_name"} <= await index_names(config, "games")
+    assert "ix_characters_name" in await index_names(config, "characters")
+    async with config.engine.connect() as conn:
+        assert await conn.run_sync(read_schema_version) == SCHEMA_VERSION
+    stored = await src.get_object_by_id(config, src.GAME, game.id)
+    assert stored.name == "Night of fog" and stored.stories_told == 1
+    assert "ix_users_dc_id" in await index_names(config, "users")
+    assert await src.get_object_by_id(config, src.USER, duplicate.id) is None
+    stored = await src.get_object_by_id(config, src.CHARACTER, character.id)
+    assert stored.user_id == user.id
+    assert not await src.sync_db(config.engine)
+
+    result = await migrate_db(config.engine, repair=True)
+    assert result.applied == list(range(1, SCHEMA_VERSION + 1))
+
+
+async def test_add_column_is_idempotent(config):
+    """
+    Tests that a column is only added if it does not exist yet.
+    """
+    column = Column("test_counter", Integer, nullable=False, server_default="0")
+    Table("games", MetaData(), column)
+    async with config.engine.begin() as conn:
+        assert await conn.run_sync(add_column, column)
+        assert not await conn.run_sync(add_column, column)
+        columns = await conn.run_sync(
+            lambda sync_conn: inspect(sync_conn).get_columns("games")
+        )
+    assert "test_counter" in {item["name"] for item in columns}
@@ -0,0 +1,52 @@
+"""
+This file contains unit tests for verifying the profiling of SQL statements with the
+slow query log.
+"""
+import src
+from src.db_profiler import QueryProfiler, normalize_statement, parameter_shape, profile_command
+
+
+def test_normalize_statement_and_parameter_shape():
+    """
+    Tests that IN lists of different length are one statement and the parameters are
+    described only by their types.
+    """
+    assert normalize_statement("SELECT id FROM users\n WHERE dc_id IN (?, ?, ?)") == (
+        "SELECT id FROM users WHERE dc_id IN (...)"
+    )
+    assert normalize_statement("SELECT id FROM users WHERE dc_id IN (%s, %s)") == (
+        "SELECT id FROM users WHERE dc_id IN (...)"
+    )
+    assert parameter_shape(("a", "b", "c", 1, None)) == "(str x 3, int, NoneType)"
+    assert parameter_shape({"id": 1}) == "{id: int}"
+    assert parameter_shape([(1, "a"), (2, "b")], executemany=True) == "2 x (int, str)"
+
+
+async def test_profile_command_logs_slow_queries(config):
+    """
+    Tests that the statements of a command are counted and slow statements are logged
+    with their query plan.
+    """
+    config.env.db.slow_query_ms = 0
+    config.env.db.explain_slow_queries = True
+    profiler = QueryProfiler(config.env.db)
+    profiler.instrument(config.engine)
+    messages = []
+    handler_id = src.logger.add(messages.append, level="WARNING", format="{message}")
+    try:
+        async with profile_command(profiler, config.engine, "game info") as profile:
+            await src.get_object_by_id(config, src.GENRE, 1)
+            await src.get_object_by_id(config, src.GENRE, 2)
+    finally:
+        src.logger.remove(handler_id)
+
+    assert profile.stats.count == 2
+    assert profiler.commands["game info"].count == 2
+    assert [stats.count for stats in profiler.statements.values()] == [2]
+    assert sum("Slow query in game info" in message for message in messages) == 2
+    assert sum("Query plan of slow query" in message for message in messages) == 1
+    assert not profiler.pending_explain
+    assert "game info: 2 statements" in profiler.report()
+
+    async with profile_command(None, config.engine, "game info") as nothing:
+        assert nothing is None
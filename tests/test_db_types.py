@@ -0,0 +1,95 @@
+"""
+This file contains unit tests for verifying the compressed story texts and the shared
+prompt texts.
+"""
+import random
+from datetime import datetime, timezone
+from sqlalchemy import func, select, text
+import src
+from src.db_types import COMPRESSED_PREFIX, CompressedText
+from src.unit_of_work import db_session
+
+WORDS = (
+    "fog night town survivor zombie shelter radio water road forest silence door "
+    + "light fire hunger group bridge storm winter car church field hospital map"
+).split()
+
+
+def prose(rng: random.Random, number_words: int) -> str:
+    """
+    Function creates a random text of the handed over number of words.
+    """
+    sentences = []
+    while number_words > 0:
+        length = min(number_words, rng.randint(6, 16))
+        sentences.append(" ".join(rng.choice(WORDS) for _ in range(length)).capitalize())
+        number_words -= length
+    return ". ".join(sentences) + "."
+
+
+def test_compressed_text_round_trip():
+    """
+    Tests that long texts are compressed, short texts are kept and texts with the
+    marker are always encoded.
+    """
+    column_type = CompressedText(min_length=10)
+    long_text = "The fog is rising. " * 20
+    stored = column_type.process_bind_param(long_text, None)
+    assert stored.startswith(COMPRESSED_PREFIX) and len(stored) < len(long_text)
+    assert column_type.process_result_value(stored, None) == long_text
+    assert column_type.process_bind_param("Fog", None) == "Fog"
+    assert column_type.process_result_value("Fog", None) == "Fog"
+    marked = column_type.process_bind_param(COMPRESSED_PREFIX, None)
+    assert column_type.process_result_value(marked, None) == COMPRESSED_PREFIX
+
+
+async def test_story_size_reduction(config, record_property):
+    """
+    Tests that 100 games with shared INIT prompts and long responses need less than
+    half of the plain text size and are read back unchanged.
+    """
+    rng = random.Random(42)
+    init_prompts = {genre_id: prose(rng, 400) for genre_id in (1, 2)}
+    plain_size = 0
+    for index in range(100):
+        genre_id = index % 2 + 1
+        game = src.GAME(
+            name=f"Game {index}",
+            start_date=datetime.now(timezone.utc),
+            tale=src.TALE(genre_id=genre_id),
+        )
+        await src.update_db_objs(config, [game])
+        stories = [
+            src.STORY(
+                request=init_prompts[genre_id],
+                story_type=src.StoryType.INIT,
+                tale_id=game.tale_id,
+            )
+        ]
+        stories.extend(
+            src.STORY(response=prose(rng, 250), tale_id=game.tale_id) for _ in range(5)
+        )
+        await src.update_db_objs(config, stories)
+        plain_size += sum(len(story.request or story.response) for story in stories)
+
+    async with db_session(config) as session:
+        stored_size = (
+            await session.execute(
+                text(
+                    "SELECT (SELECT COALESCE(SUM(LENGTH(request)), 0) "
+                    + "+ COALESCE(SUM(LENGTH(response)), 0) FROM stories) "
+                    + "+ (SELECT COALESCE(SUM(LENGTH(text)), 0) FROM prompt_texts)"
+                )
+            )
+        ).scalar_one()
+        prompt_count = await session.scalar(
+            select(func.count()).select_from(src.PROMPTTEXT)  # pylint: disable=not-callable
+        )
+    record_property("story_plain_chars", plain_size)
+    record_property("story_stored_chars", stored_size)
+    assert prompt_count == 2
+    assert stored_size < plain_size / 2
+
+    messages = await src.get_stories_messages_for_ai(config, game.tale_id)
+    assert messages[0] == {"role": "user", "content": init_prompts[2]}
+    assert messages[1]["content"] == stories[1].response
@@ -0,0 +1,37 @@
+"""
+This file contains unit tests for verifying the slash command synchronization of the bot.
+"""
+import discord
+import src
+from src.discord_bot import command_tree_hash
+
+
+async def test_sync_only_changed_command_tree(config, tmp_path, monkeypatch):
+    """
+    Tests that the command tree is only synchronized if its hash changed or the
+    synchronization is forced.
+    """
+    config.env.dc.command_hash_file = str(tmp_path / "command_tree.hash")
+    discord_bot = src.DiscordBot(config)
+    synced = []
+
+    async def fake_sync():
+        synced.append(1)
+        return discord_bot.bot.tree.get_commands()
+
+    monkeypatch.setattr(discord_bot.bot.tree, "sync", fake_sync)
+
+    assert await discord_bot.sync_commands() == 5
+    assert await discord_bot.sync_commands() is None
+    assert await discord_bot.sync_commands(force=True) == 5
+    assert len(synced) == 2
+
+    tree_hash = command_tree_hash(discord_bot.bot.tree, None)
+
+    @discord_bot.bot.tree.command(name="ping", description="Ping the bot.")
+    async def ping(interaction: discord.Interaction):  # pylint: disable=unused-argument
+        pass
+
+    assert command_tree_hash(discord_bot.bot.tree, None) != tree_hash
+    assert await discord_bot.sync_commands() == 6
+    assert len(synced) == 3
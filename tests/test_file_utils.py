@@ -0,0 +1,216 @@
+"""
+This file contains unit tests for verifying the parsing and validation of the imported
+yml files.
+"""
+import pytest
+from sqlalchemy import select
+import src
+from src.db_genre import (
+    create_genre_from_input,
+    get_genre_catalog,
+    get_genre_double_cond,
+    get_loaded_genre_from_id,
+)
+from src.db_content import update_characters_from_input, update_genres_from_input
+from src.unit_of_work import db_session
+from src.file_utils import (
+    CHARACTER_SCHEMA,
+    GENRE_SCHEMA,
+    import_content_file,
+    load_yaml,
+    parse_yaml_file,
+    validate_entry,
+)
+from benchmarks.yaml_import import run_benchmark
+
+
+def test_parse_templates():
+    """
+    Tests that the shipped templates are valid.
+    """
+    genres, genre_errors = parse_yaml_file("files/template_genre.yml", GENRE_SCHEMA)
+    characters, character_errors = parse_yaml_file(
+        "files/template_character.yml", CHARACTER_SCHEMA
+    )
+    assert [genre["name"] for genre in genres] == [
+        "Zombie Apokalypse",
+        "Weltraum Alien Liebesgeschichte",
+    ]
+    assert len(characters) == 6
+    assert not genre_errors and not character_errors
+
+
+def test_validate_entry_reports_fields():
+    """
+    Tests that every invalid field of an entry is reported with its path.
+    """
+    errors = validate_entry(
+        {
+            "name": "x" * 101,
+            "storytelling-type": None,
+            "atmosphere": "dark",
+            "events": [{"chance": "often", "event": ["Rain", 3]}],
+        },
+        GENRE_SCHEMA,
+    )
+    assert errors == [
+        "name is longer than 100 characters",
+        "language is missing",
+        "events[0].chance must be int, not str",
+        "events[0].event[1] must be str, not int",
+    ]
+    assert validate_entry({"age": True}, {"age": CHARACTER_SCHEMA["age"]}) == [
+        "age must be int, not bool"
+    ]
+
+
+@pytest.mark.usefixtures("loop_watchdog")
+async def test_load_multi_document_pack(config, tmp_path):
+    """
+    Tests that every document of a pack is imported, invalid entries are skipped with
+    their line and a broken document is reported with its position.
+    """
+    pack = tmp_path / "character.yml"
+    pack.write_text(
+        "- name: Anna\n  age: 28\n  background: Nurse\n  description: Calm\n"
+        + "  pos_trait:\n  neg_trait:\n  summary: Helps\n"
+        + "---\n"
+        + "name: Lena\nage: young\nbackground: Climber\ndescription: Quiet\n"
+        + "pos_trait:\nneg_trait:\nsummary: Scouts\n",
+        encoding="utf-8",
+    )
+    result = src.ImportResult(data=None, file_path=str(pack))
+    await load_yaml(config, result, CHARACTER_SCHEMA)
+    assert [character["name"] for character in result.data] == ["Anna"]
+    assert result.errors == ["character.yml line 9 (Lena): age must be int, not str"]
+
+    pack.write_text("- name: Anna\n  age: [28\n", encoding="utf-8")
+    broken = src.ImportResult(data=None, file_path=str(pack))
+    await load_yaml(config, broken, CHARACTER_SCHEMA)
+    assert broken.data is None
+    assert "line 3" in broken.errors[0]
+
+
+async def import_genre_file(config, file_path) -> src.ImportResult:
+    """
+    Function imports the genre file incrementally.
+    """
+    result = src.ImportResult(data=None, file_path=str(file_path))
+    await import_content_file(
+        config, result, GENRE_SCHEMA, create_genre_from_input, update_genres_from_input
+    )
+    return result
+
+
+async def test_incremental_import(config, tmp_path, statements, genre_yaml):
+    """
+    Tests that an unchanged file is skipped without parsing, only new and changed
+    entries are imported and the difference is reported.
+    """
+    pack = tmp_path / "genre.yml"
+    pack.write_text(
+        genre_yaml("Zombie", ["Rain"]) + genre_yaml("Space", ["Meteor"]), encoding="utf-8"
+    )
+    first = await import_genre_file(config, pack)
+    assert first.summary == "genre.yml: 2 new, 0 changed, 0 unchanged, 0 removed."
+    assert first.import_number == 2
+
+    statements.clear()
+    unchanged = await import_genre_file(config, pack)
+    assert unchanged.summary == "genre.yml is unchanged."
+    assert unchanged.success and unchanged.data is None
+    assert len(statements) == 1
+
+    pack.write_text(
+        genre_yaml("Zombie", ["Rain", "Fog"])
+        + genre_yaml("Space", ["Meteor"])
+        + genre_yaml("Western", ["Duel"])
+        + genre_yaml("Western", ["Train"]),
+        encoding="utf-8",
+    )
+    changed = await import_genre_file(config, pack)
+    assert changed.summary == "genre.yml: 1 new, 1 changed, 1 unchanged, 0 removed."
+    assert changed.import_number == 1
+    assert changed.errors == ["genre.yml (Western): duplicate name, entry skipped"]
+    genres = {genre.name: genre for genre in (await get_genre_catalog(config)).values()}
+    assert set(genres) == {"Zombie", "Space", "Western"}
+    assert sorted(event.text for event in genres["Zombie"].events) == ["Fog", "Rain"]
+
+    pack.write_text(genre_yaml("Space", ["Meteor"]), encoding="utf-8")
+    removed = await import_genre_file(config, pack)
+    assert removed.summary == "genre.yml: 0 new, 0 changed, 1 unchanged, 2 removed."
+    assert (await import_genre_file(config, pack)).summary == "genre.yml is unchanged."
+
+
+async def test_yaml_import_benchmark():
+    """
+    Tests that the import benchmark parses a small pack with every loader.
+    """
+    reports = await run_benchmark(size_mb=0.05)
+    assert len({report.entries for report in reports}) == 1
+    assert reports[0].entries > 0
+    assert {report.off_loop for report in reports} == {False, True}
+
+
+async def test_changed_genre_settings_keep_running_games(config, tmp_path, genre_yaml):
+    """
+    Tests that a genre entry with changed settings is imported as new version and a
+    running game keeps the settings and events of its genre.
+    """
+    pack = tmp_path / "genre.yml"
+    pack.write_text(genre_yaml("Zombie", ["Rain"]), encoding="utf-8")
+    await import_genre_file(config, pack)
+    old_genre = await get_genre_double_cond(config, 0, "Zombie")
+    game = src.GAME(
+        name="Running", status=src.GameStatus.RUNNING, tale=src.TALE(genre_id=old_genre.id)
+    )
+    await src.update_db_objs(config, [game])
+
+    pack.write_text(
+        genre_yaml("Zombie", ["Rain", "Fog"]).replace("english", "german"), encoding="utf-8"
+    )
+    changed = await import_genre_file(config, pack)
+    assert changed.import_number == 1
+
+    running = await get_loaded_genre_from_id(config, game.tale.genre_id)
+    assert running.id == old_genre.id
+    assert running.language == "english"
+    assert [event.text for event in running.events] == ["Rain"]
+    newest = await get_genre_double_cond(config, 0, "Zombie")
+    assert newest.id != old_genre.id
+    assert newest.language == "german"
+    assert sorted(event.text for event in newest.events) == ["Fog", "Rain"]
+
+
+async def test_changed_claimed_character_is_new_row(config):
+    """
+    Tests that a changed entry of a character claimed by a player creates a new
+    character and an unclaimed character is updated in place.
+    """
+    user = src.USER(name="Player", dc_id="42")
+    claimed = src.CHARACTER(
+        name="Anna", age=28, background="Nurse", description="Calm", summary="Helps", user=user
+    )
+    free = src.CHARACTER(
+        name="Lena", age=30, background="Climber", description="Quiet", summary="Scouts"
+    )
+    await src.update_db_objs(config, [user, claimed, free])
+    fields = {"pos_trait": None, "neg_trait": None}
+    entries = [
+        {"name": "Anna", "age": 29, "background": "Doctor", "description": "Calm",
+         "summary": "Heals"} | fields,
+        {"name": "Lena", "age": 31, "background": "Climber", "description": "Loud",
+         "summary": "Scouts"} | fields,
+    ]
+    assert await update_characters_from_input(config, entries) == []
+
+    async with db_session(config) as session:
+        characters = (
+            await session.scalars(select(src.CHARACTER).order_by(src.CHARACTER.id))
+        ).all()
+    assert [(c.name, c.background, c.user_id) for c in characters] == [
+        ("Anna", "Nurse", user.id),
+        ("Lena", "Climber", None),
+        ("Anna", "Doctor", None),
+    ]
+    assert characters[1].description == "Loud"
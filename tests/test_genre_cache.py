@@ -0,0 +1,79 @@
+"""
+This file contains unit tests for verifying the read-through cache of the genre catalog.
+"""
+import src
+from src.db_genre import (
+    get_all_active_genre,
+    get_genre_double_cond,
+    get_loaded_genre_from_id,
+    deactivate_genre_with_id,
+    add_genre_content,
+)
+
+
+async def add_genre(config, name: str) -> None:
+    """
+    Function creates a genre with one event and one inspirational word.
+    """
+    genre = src.GENRE(name=name, storytelling_style="dark", atmosphere="cold", language="de")
+    genre.events.append(src.EVENT(text="Storm", chance=10))
+    genre.inspirational_words.append(src.INSPIRATIONALWORD(text="Fog", chance=5))
+    await src.update_db_objs(config, [genre])
+
+
+async def test_genre_cache_serves_without_queries(config, statements):
+    """
+    Tests that after the first load all genre requests are served without DB queries.
+    """
+    await add_genre(config, "Zombie")
+    statements.clear()
+
+    genres = await get_all_active_genre(config)
+    assert [genre.name for genre in genres] == ["Zombie"]
+    number_first_load = len(statements)
+    assert number_first_load > 0
+
+    genre = await get_loaded_genre_from_id(config, genres[0].id)
+    assert genre.events[0].text == "Storm"
+    assert genre.inspirational_words[0].text == "Fog"
+    assert (await get_genre_double_cond(config, str(genres[0].id))).id == genre.id
+    assert (await get_genre_double_cond(config, 0, "Zombie")).id == genre.id
+    assert len(statements) == number_first_load
+    assert config.genre_cache.misses == 1
+    assert config.genre_cache.hits == 3
+
+
+async def test_genre_cache_invalidation(config):
+    """
+    Tests that a genre deactivation invalidates the cache and the next access reloads it.
+    """
+    await add_genre(config, "Zombie")
+    genres = await get_all_active_genre(config)
+    version = config.genre_cache.version
+
+    await deactivate_genre_with_id(config, genres[0].id)
+
+    assert config.genre_cache.version == version + 1
+    assert await get_all_active_genre(config) == []
+    assert config.genre_cache.misses == 2
+
+
+async def test_add_genre_content_keeps_cached_genre(config):
+    """
+    Tests that new events and words are inserted without changing the cached genre and
+    the reloaded genre contains them.
+    """
+    await add_genre(config, "Zombie")
+    genre = (await get_all_active_genre(config))[0]
+
+    assert await add_genre_content(
+        config,
+        genre.id,
+        [src.EVENT(text="Flood", chance=20), src.INSPIRATIONALWORD(text="Ash", chance=5)],
+    )
+
+    assert [event.text for event in genre.events] == ["Storm"]
+    reloaded = await get_loaded_genre_from_id(config, genre.id)
+    assert reloaded is not genre
+    assert sorted(event.text for event in reloaded.events) == ["Flood", "Storm"]
+    assert sorted(word.text for word in reloaded.inspirational_words) == ["Ash", "Fog"]
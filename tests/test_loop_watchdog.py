@@ -0,0 +1,54 @@
+"""
+This file contains unit tests for verifying the watchdog of the event loop.
+"""
+import time
+import asyncio
+import src
+from src.db_genre import get_all_active_genre
+from src.loop_watchdog import LoopWatchdog, LoopWatchdogConfiguration
+from src.metrics import Metrics, MetricsConfiguration
+
+
+def blocking_yaml_parse(seconds: float) -> None:
+    """
+    Function blocks the event loop like a synchronous parser.
+    """
+    time.sleep(seconds)
+
+
+async def test_blocking_call_is_recorded_with_stack():
+    """
+    Tests that a blocking call is logged with its stack and the lag is exported as
+    percentiles and as metric.
+    """
+    metrics = Metrics(MetricsConfiguration(enabled=True))
+    watchdog = LoopWatchdog(LoopWatchdogConfiguration(interval=0.02, threshold_ms=100), metrics)
+    messages = []
+    handler_id = src.logger.add(messages.append, level="WARNING", format="{message}")
+    task = asyncio.create_task(watchdog.run())
+    try:
+        await asyncio.sleep(0.1)
+        blocking_yaml_parse(0.4)
+        await asyncio.sleep(0.1)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        src.logger.remove(handler_id)
+
+    assert len(watchdog.blocking) == 1
+    assert watchdog.blocking[0].lag >= 0.3
+    assert watchdog.blocking[0].stack[-1] == "test_loop_watchdog:blocking_yaml_parse"
+    assert "test_loop_watchdog:blocking_yaml_parse" in messages[0]
+    assert watchdog.percentiles()["max"] >= 0.3
+    assert "ms in test_loop_watchdog:blocking_yaml_parse" in watchdog.report()
+    assert metrics.loop_lag_seconds.count(()) == len(watchdog.lags)
+
+
+async def test_database_queries_do_not_block(config, loop_watchdog):
+    """
+    Tests that the database queries run without blocking the event loop.
+    """
+    for _ in range(20):
+        await get_all_active_genre(config)
+    await asyncio.sleep(0.05)
+    assert len(loop_watchdog.lags) > 0
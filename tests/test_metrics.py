@@ -0,0 +1,122 @@
+"""
+This file contains unit tests for verifying the command traces and the Prometheus
+endpoint of the metrics.
+"""
+import socket
+import asyncio
+import aiohttp
+from discord.webhook.async_ import async_context
+import src
+from src.db_genre import get_all_active_genre
+from src.llm_handler import request_openai
+from src.metrics import Metrics, MetricsConfiguration, Histogram, Counter
+from benchmarks.fake_discord import FakeChannel, FakeGuild, FakeInteraction, FakeMember
+from benchmarks.fake_llm import FakeLlmServer
+
+
+def enable_metrics(config, port: int = 9464) -> Metrics:
+    """
+    Function enables the metrics for the test configuration.
+    """
+    config.metrics = Metrics(MetricsConfiguration(enabled=True, port=port))
+    config.metrics.instrument_engine(config.engine)
+    return config.metrics
+
+
+def test_render_prometheus_format():
+    """
+    Tests that histograms are rendered with cumulative buckets and counters with
+    escaped labels.
+    """
+    histogram = Histogram("duration_seconds", "Duration.", ("command",), buckets=(0.1, 1))
+    histogram.observe(("game info",), 0.05)
+    histogram.observe(("game info",), 0.5)
+    histogram.observe(("game info",), 5)
+    counter = Counter("queries_total", "Queries.", ("command",))
+    counter.inc(('say "hi"',), 3)
+    assert list(histogram.render())[2:] == [
+        'duration_seconds_bucket{command="game info",le="0.1"} 1',
+        'duration_seconds_bucket{command="game info",le="1"} 2',
+        'duration_seconds_bucket{command="game info",le="+Inf"} 3',
+        'duration_seconds_sum{command="game info"} 5.55',
+        'duration_seconds_count{command="game info"} 3',
+    ]
+    assert list(counter.render())[2] == 'queries_total{command="say \\"hi\\""} 3'
+
+
+async def test_metrics_disabled(config):
+    """
+    Tests that without enabled metrics the commands are not wrapped.
+    """
+    discord_bot = src.DiscordBot(config)
+    assert config.metrics is None
+    command = discord_bot.bot.tree.get_command("game").get_command("info")
+    assert command.callback.__name__ == "wrapped_info_game"
+
+
+async def test_traced_command_spans(config):
+    """
+    Tests that a command is traced until its deferred task is finished and the
+    database transactions, LLM requests and Discord API calls are nested spans.
+    """
+    metrics = enable_metrics(config)
+    discord_bot = src.DiscordBot(config)
+    http_requests = []
+
+    async def request(route, **_):
+        http_requests.append(route)
+
+    discord_bot.bot.http.request = request
+    metrics.instrument_http(discord_bot.bot.http)
+    command = discord_bot.bot.tree.get_command("game").get_command("info")
+    interaction = FakeInteraction(FakeMember("player"), FakeChannel(), FakeGuild())
+    await command.callback(interaction, game=None)
+
+    assert metrics.command_seconds.count(("game info",)) == 1
+    assert metrics.span_seconds.count(("game info", "db")) >= 1
+    assert metrics.db_queries.values[("game info",)] >= 1
+
+    llm = FakeLlmServer(latency=0.05)
+    await llm.start()
+    config.env.base_url = llm.base_url
+    try:
+        async with metrics.trace_command("keep_telling") as trace:
+            assert async_context.get() is metrics.webhook_adapter
+            response = await request_openai(config, [{"role": "user", "content": "Go"}])
+            await discord_bot.bot.http.request("route")
+    finally:
+        await llm.stop()
+    assert await response.error_free()
+    assert http_requests == ["route"]
+    assert trace.spans["llm"][0] >= 0.05
+    assert trace.spans["discord"][1] == 1
+    assert async_context.get() is not metrics.webhook_adapter
+
+
+async def test_metrics_endpoint(config):
+    """
+    Tests that the metrics are served in the Prometheus text format.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    metrics = enable_metrics(config, port)
+    async with metrics.trace_command("game info"):
+        await get_all_active_genre(config)
+    server = asyncio.create_task(metrics.serve())
+    try:
+        async with aiohttp.ClientSession() as session:
+            for _ in range(50):
+                try:
+                    async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                        body = await response.text()
+                        content_type = response.headers["Content-Type"]
+                    break
+                except aiohttp.ClientConnectionError:
+                    await asyncio.sleep(0.02)
+    finally:
+        server.cancel()
+        await asyncio.gather(server, return_exceptions=True)
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert 'tales_command_duration_seconds_count{command="game info"} 1' in body
+    assert 'tales_span_duration_seconds_count{command="game info",span="db"} 1' in body
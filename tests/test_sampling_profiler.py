@@ -0,0 +1,64 @@
+"""
+This file contains unit tests for verifying the sampling profiler of the event loop and
+the pending tasks.
+"""
+import time
+import asyncio
+import pytest
+from src.sampling_profiler import SamplingProfiler
+
+
+def block_loop(seconds: float) -> None:
+    """
+    Function blocks the event loop like a synchronous call.
+    """
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def waiting_game_task() -> None:
+    """
+    Function waits like a pending command.
+    """
+    await asyncio.sleep(10)
+
+
+async def test_profile_finds_blocking_call(tmp_path):
+    """
+    Tests that a blocking callback is the hotspot of the profile, the loop lag is
+    measured and the stacks of the thread and the tasks are written in the collapsed
+    format.
+    """
+    profiler = SamplingProfiler(str(tmp_path), interval=0.002)
+    waiting = asyncio.create_task(waiting_game_task(), name="waiting-game")
+    loop = asyncio.get_running_loop()
+    loop.call_later(0.1, block_loop, 0.3)
+    try:
+        result = await profiler.profile(0.6)
+    finally:
+        waiting.cancel()
+
+    assert result.samples > 0
+    assert result.hotspots(1)[0][0] == "test_sampling_profiler:block_loop"
+    assert result.lag.max >= 0.2
+    assert "Idle: " in result.report()
+    assert not profiler.running
+    lines = result.stack_file.read_text(encoding="utf-8").splitlines()
+    assert any(
+        line.rsplit(" ", 1)[0].endswith(";test_sampling_profiler:block_loop") for line in lines
+    )
+    tasks = result.task_file.read_text(encoding="utf-8")
+    assert "task:waiting-game;test_sampling_profiler:waiting_game_task " in tasks
+
+
+async def test_only_one_profile_at_a_time(tmp_path):
+    """
+    Tests that a second profile is rejected while a profile is running.
+    """
+    profiler = SamplingProfiler(str(tmp_path))
+    running = asyncio.create_task(profiler.profile(0.1))
+    await asyncio.sleep(0)
+    with pytest.raises(RuntimeError):
+        await profiler.profile(0.1)
+    await running
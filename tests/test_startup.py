@@ -0,0 +1,85 @@
+"""
+This file contains the startup benchmark of the application. It checks that importing
+the package stays lazy and measures the time until the bot is ready.
+"""
+import sys
+import time
+import subprocess
+from pathlib import Path
+import src
+
+ROOT_PATH = Path(__file__).resolve().parent.parent
+
+
+def import_report(code: str) -> tuple[dict[str, int], float]:
+    """
+    Function runs the handed over code with `python -X importtime` and returns the
+    cumulative import time in microseconds of each imported module and the duration
+    of the code in seconds.
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import time; start = time.perf_counter(); {code}; "
+            + "print(time.perf_counter() - start)",
+        ],
+        cwd=ROOT_PATH,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.removeprefix("import time:").split("|")
+        report[module.strip()] = int(cumulative)
+    return report, float(result.stdout)
+
+
+def test_import_is_lazy(record_property):
+    """
+    Tests that importing the package does not load the heavy subsystems and the
+    configuration does not load the OpenAI client.
+    """
+    report, duration = import_report("import src")
+    record_property("import_package_s", duration)
+    assert not {"discord", "sqlalchemy", "openai", "yaml"} & report.keys()
+
+    report, duration = import_report("import src; src.DiscordBot")
+    record_property("import_bot_s", duration)
+    assert "discord" in report
+    assert "openai" not in report
+
+
+async def test_time_to_ready(config, statements, tmp_path, monkeypatch, record_property):
+    """
+    Tests that a restart with an unchanged schema and command tree skips the table
+    creation and the command synchronization against a fake gateway.
+    """
+    statements.clear()
+    assert not await src.sync_db(config.engine)
+    assert not any("CREATE" in statement for statement in statements)
+
+    config.env.dc.command_hash_file = str(tmp_path / "command_tree.hash")
+    synced = []
+
+    async def fake_sync():
+        synced.append(1)
+        return []
+
+    async def fake_change_presence(**_):
+        pass
+
+    for _ in range(2):
+        start = time.perf_counter()
+        discord_bot = src.DiscordBot(config)
+        monkeypatch.setattr(discord_bot.bot.tree, "sync", fake_sync)
+        monkeypatch.setattr(discord_bot.bot, "change_presence", fake_change_presence)
+        await discord_bot.on_ready()
+        record_property("time_to_ready_s", time.perf_counter() - start)
+    await config.background_tasks.cancel_all()
+    assert len(synced) == 1
@@ -0,0 +1,113 @@
+"""
+This file contains unit tests for verifying the chapters of a finished tale.
+"""
+import asyncio
+import src
+from src import tale_chapters
+from src.llm_handler import OpenAiContext
+from src.tale_chapters import (
+    create_chapters,
+    get_chapters,
+    parse_chapter_response,
+    segment_stories,
+)
+from src.tale_export import ExportFormat, export_tale
+
+EVENT = src.StoryType.EVENT
+FICTION = src.StoryType.FICTION
+
+
+def test_segment_stories():
+    """
+    Tests that an event starts a chapter after the minimum number of stories and a
+    chapter is closed after the maximum number of stories.
+    """
+    types = [EVENT, FICTION, EVENT, FICTION, FICTION, EVENT] + [FICTION] * 7
+    segments = segment_stories(enumerate(types, start=1), min_stories=2, max_stories=5)
+    assert [(s.first_story_id, s.last_story_id, s.stories) for s in segments] == [
+        (1, 2, 2),
+        (3, 5, 3),
+        (6, 10, 5),
+        (11, 13, 3),
+    ]
+    assert [segment.number for segment in segments] == [1, 2, 3, 4]
+    assert not segment_stories([], 2, 5)
+
+
+def test_parse_chapter_response():
+    """
+    Tests that title and summary are read from the requested format and from a free
+    response.
+    """
+    assert parse_chapter_response(
+        "Titel: **Der Nebel**\nZusammenfassung: Die Gruppe\nflieht."
+    ) == ("Der Nebel", "Die Gruppe flieht.")
+    assert parse_chapter_response("# Der Nebel\nDie Gruppe flieht.") == (
+        "Der Nebel",
+        "Die Gruppe flieht.",
+    )
+    assert parse_chapter_response("") == ("", "")
+
+
+async def test_create_chapters(config, monkeypatch, tmp_path, told_game):
+    """
+    Tests that the chapters are requested in parallel up to the limit, stored and used
+    by the export.
+    """
+    config.env.chapter.min_stories = 2
+    config.env.chapter.max_stories = 10
+    config.chapter_limit = asyncio.Semaphore(2)
+    running = []
+    prompts = []
+
+    async def request(_, messages):
+        running.append(2 - config.chapter_limit._value)  # pylint: disable=protected-access
+        prompt = messages[0]["content"]
+        prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        if "Kapitel 2 " in prompt:
+            return OpenAiContext(response="", error="OpenAI error")
+        number = prompt.split("Kapitel ")[1].split(" ")[0]
+        return OpenAiContext(response=f"Titel: Nebel {number}\nZusammenfassung: Flucht.")
+
+    monkeypatch.setattr(tale_chapters, "request_openai", request)
+    chapters = await create_chapters(config, told_game.tale_id, "Sei dramatisch.")
+    assert [chapter.title for chapter in chapters] == ["Nebel 1", "", "Nebel 3"]
+    assert max(running) == 2
+    assert all(prompt.endswith("\nSei dramatisch.") for prompt in prompts)
+    assert "Story 10:" in next(prompt for prompt in prompts if "Kapitel 2 " in prompt)
+
+    stored = await get_chapters(config, told_game.tale_id)
+    assert [(chapter.number, chapter.summary) for chapter in stored] == [
+        (1, "Flucht."),
+        (2, None),
+        (3, "Flucht."),
+    ]
+    file_path = await export_tale(config, told_game, ExportFormat.MARKDOWN, str(tmp_path))
+    markdown = file_path.read_text(encoding="utf-8")
+    assert "## Chapter 1: Nebel 1\n\n*Flucht.*\n\nStory 0:" in markdown
+    assert "## Chapter 2\n\nStory 10:" in markdown
+
+
+async def test_create_chapters_without_text(config, monkeypatch, told_game):
+    """
+    Tests that a chapter, whose text could not be loaded, is kept without title and the
+    other chapters are written.
+    """
+    config.env.chapter.min_stories = 2
+    config.env.chapter.max_stories = 10
+    load_text = tale_chapters.get_chapter_text
+
+    async def get_chapter_text(config, tale_id, segment):
+        if segment.number == 2:
+            return None
+        return await load_text(config, tale_id, segment)
+
+    async def request(_, messages):
+        number = messages[0]["content"].split("Kapitel ")[1].split(" ")[0]
+        return OpenAiContext(response=f"Titel: Nebel {number}\nZusammenfassung: Flucht.")
+
+    monkeypatch.setattr(tale_chapters, "get_chapter_text", get_chapter_text)
+    monkeypatch.setattr(tale_chapters, "request_openai", request)
+    chapters = await create_chapters(config, told_game.tale_id)
+    assert [chapter.title for chapter in chapters] == ["Nebel 1", "", "Nebel 3"]
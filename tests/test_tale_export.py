@@ -0,0 +1,131 @@
+"""
+This file contains unit tests for verifying the streamed export of a tale.
+"""
+import re
+from datetime import timedelta
+from functools import partial
+from types import SimpleNamespace
+from src import game
+from src.db_archive import archive_finished_games
+from src.tale_export import ExportFormat, PdfWriter, export_tale, iter_story_batches
+from src.unit_of_work import db_session
+
+
+async def test_iter_story_batches(config, told_game):
+    """
+    Tests that the stories are streamed in batches in the told order without the
+    discarded stories, also after the tale is archived.
+    """
+    async with db_session(config) as session:
+        batches = [batch async for batch in iter_story_batches(session, told_game.tale_id, 10)]
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert [text.split(":")[0] for batch in batches for _, text in batch] == [
+        f"Story {index}" for index in range(25)
+    ]
+    assert await archive_finished_games(config, timedelta(days=30)) == 1
+    async with db_session(config) as session:
+        archived = [batch async for batch in iter_story_batches(session, told_game.tale_id, 10)]
+    assert archived == batches
+
+
+async def test_export_markdown_and_html(config, tmp_path, told_game):
+    """
+    Tests that the tale is divided into chapters and the HTML is escaped.
+    """
+    file_path = await export_tale(config, told_game, ExportFormat.MARKDOWN, str(tmp_path))
+    markdown = file_path.read_text(encoding="utf-8")
+    assert markdown.startswith("# Foggy (Town)\n\n*A <dark> tale*\n\n## Chapter 1\n\nStory 0:")
+    assert markdown.count("## Chapter") == 3
+    assert "Discarded" not in markdown
+
+    page = (await export_tale(config, told_game, ExportFormat.HTML, str(tmp_path))).read_text(
+        encoding="utf-8"
+    )
+    assert "<p><em>A &lt;dark&gt; tale</em></p>" in page
+    assert page.count("<h2>Chapter") == 3
+    assert page.endswith("</body>\n</html>\n")
+
+
+async def test_export_pdf(config, tmp_path, told_game):
+    """
+    Tests that the PDF has pages, escaped strings and a valid cross-reference table.
+    """
+    data = (await export_tale(config, told_game, ExportFormat.PDF, str(tmp_path))).read_bytes()
+    assert data.startswith(b"%PDF-1.4") and data.endswith(b"%%EOF\n")
+    assert b"(Foggy \\(Town\\))" in data
+    assert "Über".encode("cp1252") in data
+    pages = int(re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", data).group(1))
+    assert pages > 1
+    xref_offset = int(re.search(rb"startxref\n(\d+)\n", data).group(1))
+    assert data[xref_offset:].startswith(b"xref\n")
+    for object_id, offset in enumerate(
+        re.findall(rb"(\d{10}) 00000 n", data[xref_offset:]), start=1
+    ):
+        assert data[int(offset):].startswith(f"{object_id} 0 obj".encode("ascii"))
+
+
+def test_pdf_wraps_larger_fonts_shorter():
+    """
+    Tests that the title is wrapped with fewer characters per line than the body.
+    """
+    writer = PdfWriter()
+    writer.add_lines(writer.title_font, "word " * 40)
+    writer.add_lines(writer.body_font, "word " * 40)
+    title_lines = [line for font, line in writer.lines if font == writer.title_font]
+    body_lines = [line for font, line in writer.lines if font == writer.body_font]
+    assert max(len(line) for line in title_lines) <= writer.line_chars * 11 // 16
+    assert len(title_lines) > len(body_lines)
+
+
+class FakeFollowup:
+    """
+    Followup of a deferred interaction, which collects the sent messages.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, content=None, **kwargs):
+        """
+        Function collects the message with its parameters.
+        """
+        self.messages.append((content, kwargs))
+
+
+class FakeInteraction:
+    """
+    Deferred interaction of a command.
+    """
+
+    def __init__(self):
+        self.followup = FakeFollowup()
+        self.response = SimpleNamespace(is_done=lambda: True)
+
+
+async def test_publish_tale_reports_to_user_and_channel(config, monkeypatch, tmp_path, told_game):
+    """
+    Tests that a game without channel gets the file with the interaction and that a
+    failed upload in the background is posted to the game channel.
+    """
+    monkeypatch.setattr(game, "export_tale", partial(export_tale, directory=str(tmp_path)))
+    interaction = FakeInteraction()
+    await game.publish_tale(config, told_game, ExportFormat.MARKDOWN, interaction)
+    content, kwargs = interaction.followup.messages[0]
+    assert content == "The story of the game Foggy (Town) is finished."
+    assert kwargs["file"].filename == f"tale_{told_game.id}.md"
+
+    channel_messages = []
+
+    async def failed_upload(*_):
+        return None
+
+    async def send_message(_, channel_id, message):
+        channel_messages.append((channel_id, message))
+        return [1]
+
+    monkeypatch.setattr(game, "send_channel_file", failed_upload)
+    monkeypatch.setattr(game, "send_channel_message", send_message)
+    told_game.channel_id = 42
+    await game.publish_tale(config, told_game, ExportFormat.MARKDOWN)
+    assert channel_messages[0][0] == 42
+    assert channel_messages[0][1].startswith("The upload failed, the story is saved as ")